@@ -17,6 +17,8 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from flask_caching import Cache
+from flask_compress import Compress
 import os
 
 # Initialize extensions
@@ -28,6 +30,8 @@ limiter = Limiter(
     key_func=get_remote_address,
     default_limits=[]
 )
+cache = Cache()
+compress = Compress()
 
 
 def load_config(app, config_name=None):
@@ -56,6 +60,12 @@ def init_extensions(app):
     jwt.init_app(app)
     cors.init_app(app)
     limiter.init_app(app)
+    cache.init_app(app)
+    compress.init_app(app)
+    
+    # Flask-Compress gắn hậu tố ":br"/":gzip" vào ETag; bỏ hậu tố ở If-None-Match để 304 vẫn khớp
+    from app.utils.compression import ETagCodingMiddleware
+    app.wsgi_app = ETagCodingMiddleware(app.wsgi_app)
 
 
 def register_routers(app):
@@ -87,6 +97,18 @@ def register_routers(app):
         app.register_blueprint(router, url_prefix=url_prefix)
 
 
+# Health check của app và từng blueprint (trả lời bởi HealthProbeMiddleware)
+_HEALTH_ENDPOINTS = frozenset((
+    'health_check', 'enrollments.health', 'courses.health_check', 'cart.cart_health_check',
+    'payments.health', 'progress.health', 'qa.health',
+))
+
+# Endpoint không cần track activity (auth flow, health check)
+_ACTIVITY_SKIP_ENDPOINTS = _HEALTH_ENDPOINTS | frozenset((
+    'auth.login', 'auth.register', 'auth.confirm_email', 'auth.resend_confirmation',
+))
+
+
 def setup_middleware(app):
     """Setup application middleware"""
     
@@ -95,16 +117,14 @@ def setup_middleware(app):
         """Track user activity for session management"""
         from flask import request, jsonify
         from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-        from app.models.user import User
+        from app.utils.auth import load_user, has_jwt_credentials
         
         # Skip activity tracking for certain endpoints
-        skip_endpoints = [
-            'auth.login', 'auth.register', 'auth.confirm_email', 
-            'auth.resend_confirmation', 'health_check',
-            'enrollments.health', 'enrollments.debug_my_courses'
-        ]
+        if request.endpoint in _ACTIVITY_SKIP_ENDPOINTS:
+            return
         
-        if request.endpoint in skip_endpoints:
+        # Request anonymous: không có token để verify
+        if not has_jwt_credentials():
             return
         
         try:
@@ -114,7 +134,7 @@ def setup_middleware(app):
             
             if user_id:
                 try:
-                    user = User.query.get(int(user_id))
+                    user = load_user(user_id)
                     if user and user.is_active:
                         # Check if session has expired
                         if user.is_session_expired():
@@ -143,32 +163,43 @@ def setup_middleware(app):
 
 def setup_error_handlers(app):
     """Setup global error handlers"""
-    from app.utils.response import error_response
+    from app.utils.response import prebuilt_error_response
+    
+    not_found_response = prebuilt_error_response('Resource not found', 404)
+    internal_error_response = prebuilt_error_response('Internal server error', 500)
+    too_large_response = prebuilt_error_response('Request entity too large', 413)
     
     @app.errorhandler(404)
     def not_found(error):
-        return error_response('Resource not found', 404)
+        return not_found_response()
     
     @app.errorhandler(500)
     def internal_error(error):
         app.logger.error(f"Internal server error: {str(error)}")
-        return error_response('Internal server error', 500)
+        return internal_error_response()
     
     @app.errorhandler(413)
     def request_entity_too_large(error):
-        return error_response('Request entity too large', 413)
+        return too_large_response()
 
 
 def setup_health_check(app):
     """Setup health check endpoint"""
+    from app.utils.response import prebuilt_response
+    
+    health_response = prebuilt_response({
+        'status': 'healthy',
+        'message': 'Online Learning System API is running',
+        'version': '1.0.0'
+    })
     
     @app.route('/health')
     def health_check():
-        return {
-            'status': 'healthy', 
-            'message': 'Online Learning System API is running',
-            'version': '1.0.0'
-        }
+        return health_response()
+    
+    # Probe /health, /api/*/health trả bytes dựng sẵn ngay ở tầng WSGI
+    from app.utils.health import install_health_probes
+    install_health_probes(app, _HEALTH_ENDPOINTS)
 
 
 def create_app(config_name=None):
@@ -190,9 +221,21 @@ def create_app(config_name=None):
     """
     app = Flask(__name__)
     
+    # JSON encode/decode bằng orjson
+    from app.utils.json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
+    
+    # URL converters phải có trước khi đăng ký routes
+    from app.utils.request import UUIDStringConverter
+    app.url_map.converters['uuid'] = UUIDStringConverter
+    
     # Load configuration
     load_config(app, config_name)
     
+    # Logging qua queue, không chặn request thread
+    from app.utils.log import setup_logging
+    setup_logging(app)
+    
     # Initialize extensions
     init_extensions(app)
     
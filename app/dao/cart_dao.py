@@ -222,26 +222,32 @@ class CartDAO(BaseDAO):
             Updated user cart
         """
         try:
-            guest_cart = self.session.query(Cart).options(joinedload(Cart.items)).get(guest_cart_id)
-            user_cart = self.session.query(Cart).options(joinedload(Cart.items)).get(user_cart_id)
+            # Course IDs đã có trong user cart
+            existing_course_ids = [
+                course_id for (course_id,) in
+                self.session.query(CartItem.course_id).filter(CartItem.cart_id == user_cart_id)
+            ]
+            
+            # Chuyển item của guest cart sang user cart bằng một UPDATE
+            # (bỏ qua course đã có để giữ unique_cart_course)
+            move_items = self.session.query(CartItem).filter(CartItem.cart_id == guest_cart_id)
+            if existing_course_ids:
+                move_items = move_items.filter(CartItem.course_id.notin_(existing_course_ids))
+            move_items.update({CartItem.cart_id: user_cart_id}, synchronize_session=False)
             
-            if not guest_cart or not user_cart:
-                raise ValueError("Cart not found")
-            
-            # Get existing course IDs in user cart
-            existing_course_ids = {item.course_id for item in user_cart.items}
+            # Mark guest cart as converted
+            converted = self.session.query(Cart).filter(Cart.id == guest_cart_id).update(
+                {Cart.status: CartStatus.CONVERTED, Cart.updated_at: datetime.utcnow()},
+                synchronize_session=False
+            )
             
-            # Move items from guest cart to user cart (avoid duplicates)
-            for item in guest_cart.items:
-                if item.course_id not in existing_course_ids:
-                    item.cart_id = user_cart_id
-                    existing_course_ids.add(item.course_id)
+            # Reload user cart (kèm items mới) để tính lại totals
+            user_cart = self.session.query(Cart).options(joinedload(Cart.items)) \
+                .populate_existing().filter(Cart.id == user_cart_id).first()
             
-            # Mark guest cart as converted
-            guest_cart.status = CartStatus.CONVERTED
-            guest_cart.updated_at = datetime.utcnow()
+            if not converted or not user_cart:
+                raise ValueError("Cart not found")
             
-            # Update user cart totals
             user_cart.calculate_totals()
             
             self.session.commit()
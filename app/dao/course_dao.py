@@ -3,14 +3,54 @@ Course Data Access Object
 Handles database operations for course catalog browsing
 """
 
-from sqlalchemy import and_, or_, desc, asc, func
+import re
+
+from sqlalchemy import and_, or_, desc, asc, func, select, text
 from app.dao.base_dao import BaseDAO
-from app.models.course import Course, Category, DifficultyLevel, CourseStatus
+from app.utils.pagination import paginate_with_window_count, keyset_page
+from app.models.course import Course, Category, DifficultyLevel, CourseStatus, Module, COURSE_SEARCH_COLUMNS
 from app import db
 
+# Ký tự toán tử của MySQL boolean full-text, bỏ khỏi từ khóa người dùng
+_FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+# innodb_ft_min_token_size mặc định: từ ngắn hơn không có trong FULLTEXT index
+_FULLTEXT_MIN_TOKEN = 3
+
+# MATCH ... AGAINST trên FULLTEXT index ft_courses_search (MySQL)
+_COURSE_FULLTEXT_MATCH = text(
+    'MATCH (%s) AGAINST (:fulltext_query IN BOOLEAN MODE)'
+    % ', '.join(f'courses.{column}' for column in COURSE_SEARCH_COLUMNS)
+)
+
+
 class CourseDAO(BaseDAO):
     model = Course
     
+    # sort_by hỗ trợ cursor pagination → (column, descending)
+    KEYSET_SORTS = {
+        'newest': (Course.published_at, True),
+        'oldest': (Course.published_at, False),
+        'popularity': (Course.total_enrollments, True),
+    }
+    
+    @classmethod
+    def _published_query(cls):
+        """
+        Query course đã publish, eager load category + instructor
+        
+        Format catalog đọc course.category/course.instructor cho từng course;
+        selectinload gom thành một SELECT ... WHERE id IN (...) mỗi relationship
+        thay vì một query lazy load cho mỗi course.
+        """
+        return cls.model.query.options(
+            db.selectinload(cls.model.category),
+            db.selectinload(cls.model.instructor)
+        ).filter(
+            cls.model.is_published == True,
+            cls.model.status == CourseStatus.PUBLISHED
+        )
+    
     @classmethod
     def get_published_courses(cls, page=1, per_page=12, filters=None, sort_by='newest'):
         """
@@ -25,10 +65,7 @@ class CourseDAO(BaseDAO):
         Returns:
             dict: Paginated course results with metadata
         """
-        query = cls.model.query.filter(
-            cls.model.is_published == True,
-            cls.model.status == CourseStatus.PUBLISHED
-        )
+        query = cls._published_query()
         
         # Apply filters
         if filters:
@@ -37,23 +74,51 @@ class CourseDAO(BaseDAO):
         # Apply sorting
         query = cls._apply_sorting(query, sort_by)
         
-        # Execute pagination
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        # Execute pagination (rows + total trong một query)
+        pagination = paginate_with_window_count(query, page, per_page)
         
         return {
-            'courses': pagination.items,
-            'total': pagination.total,
-            'pages': pagination.pages,
+            'courses': pagination['items'],
+            'total': pagination['total'],
+            'pages': pagination['pages'],
             'current_page': page,
             'per_page': per_page,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev,
-            'next_page': pagination.next_num if pagination.has_next else None,
-            'prev_page': pagination.prev_num if pagination.has_prev else None
+            'has_next': pagination['has_next'],
+            'has_prev': pagination['has_prev'],
+            'next_page': pagination['next_num'],
+            'prev_page': pagination['prev_num']
+        }
+    
+    @classmethod
+    def get_published_courses_after(cls, cursor=None, per_page=12, filters=None, sort_by='newest'):
+        """
+        Get published courses with keyset (cursor) pagination
+        
+        Args:
+            cursor (str): Cursor từ trang trước, None cho trang đầu
+            per_page (int): Number of courses per page
+            filters (dict): Filter criteria
+            sort_by (str): One of KEYSET_SORTS
+        
+        Returns:
+            dict: courses, per_page, next_cursor, has_next
+        """
+        sort_column, descending = cls.KEYSET_SORTS[sort_by]
+        # keyset_page cần cột sort không NULL: (NULL, id) < (value, id) không bao giờ đúng
+        query = cls._published_query().filter(sort_column.isnot(None))
+        
+        if filters:
+            query = cls._apply_filters(query, filters)
+        
+        courses, next_cursor = keyset_page(
+            query, sort_column, cls.model.id, cursor, per_page, descending=descending
+        )
+        
+        return {
+            'courses': courses,
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
         }
     
     @classmethod
@@ -148,97 +213,137 @@ class CourseDAO(BaseDAO):
     @classmethod
     def get_course_by_slug(cls, slug):
         """Get course by slug"""
-        return cls.model.query.filter_by(slug=slug, is_published=True).first()
+        return cls.model.query.options(
+            db.joinedload(cls.model.category),
+            db.joinedload(cls.model.instructor)
+        ).filter_by(slug=slug, is_published=True).first()
     
     @classmethod
     def get_courses_by_category(cls, category_id, limit=6):
         """Get courses by category (for related courses)"""
-        return cls.model.query.filter(
-            cls.model.category_id == category_id,
+        return cls._published_query().filter(
+            cls.model.category_id == category_id
+        ).order_by(desc(cls.model.total_enrollments)).limit(limit).all()
+    
+    @classmethod
+    def get_similar_courses(cls, course_id, limit=6):
+        """
+        Course cùng category với course_id (trừ chính nó), một query
+        
+        category/instructor là quan hệ to-one nên joinedload an toàn với LIMIT.
+        """
+        category_id = select(cls.model.category_id).where(cls.model.id == course_id).scalar_subquery()
+        return cls.model.query.options(
+            db.joinedload(cls.model.category),
+            db.joinedload(cls.model.instructor)
+        ).filter(
             cls.model.is_published == True,
-            cls.model.status == CourseStatus.PUBLISHED
+            cls.model.status == CourseStatus.PUBLISHED,
+            cls.model.category_id == category_id,
+            cls.model.id != course_id
         ).order_by(desc(cls.model.total_enrollments)).limit(limit).all()
     
     @classmethod
     def get_popular_courses(cls, limit=10):
         """Get most popular courses"""
-        return cls.model.query.filter(
-            cls.model.is_published == True,
-            cls.model.status == CourseStatus.PUBLISHED
-        ).order_by(desc(cls.model.total_enrollments)).limit(limit).all()
+        return cls._published_query().order_by(desc(cls.model.total_enrollments)).limit(limit).all()
     
     @classmethod
     def get_top_rated_courses(cls, limit=10):
         """Get top rated courses (with enough ratings)"""
-        return cls.model.query.filter(
-            cls.model.is_published == True,
-            cls.model.status == CourseStatus.PUBLISHED,
+        return cls._published_query().filter(
             cls.model.total_ratings >= 5
         ).order_by(desc(cls.model.average_rating)).limit(limit).all()
     
     @classmethod
-    def get_free_courses(cls, limit=10):
+    def get_free_courses(cls, offset=0, limit=10):
         """Get free courses"""
-        return cls.model.query.filter(
-            cls.model.is_published == True,
-            cls.model.status == CourseStatus.PUBLISHED,
+        return cls._published_query().filter(
             cls.model.is_free == True
-        ).order_by(desc(cls.model.total_enrollments)).limit(limit).all()
+        ).order_by(desc(cls.model.total_enrollments), desc(cls.model.id)).offset(offset).limit(limit).all()
     
     @classmethod
     def get_courses_by_instructor(cls, instructor_id, page=1, per_page=12):
         """Get courses by instructor with pagination"""
-        pagination = cls.model.query.filter(
-            cls.model.instructor_id == instructor_id,
-            cls.model.is_published == True,
-            cls.model.status == CourseStatus.PUBLISHED
-        ).order_by(desc(cls.model.published_at)).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        query = cls._published_query().filter(
+            cls.model.instructor_id == instructor_id
+        ).order_by(desc(cls.model.published_at))
+        pagination = paginate_with_window_count(query, page, per_page)
         
         return {
-            'courses': pagination.items,
-            'total': pagination.total,
-            'pages': pagination.pages,
+            'courses': pagination['items'],
+            'total': pagination['total'],
+            'pages': pagination['pages'],
             'current_page': page,
             'per_page': per_page,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
+            'has_next': pagination['has_next'],
+            'has_prev': pagination['has_prev']
         }
     
+    @classmethod
+    def _fulltext_query(cls, search_term):
+        """
+        Boolean-mode query (mọi từ bắt buộc, khớp tiền tố) cho FULLTEXT index
+        
+        Trả về None khi không dùng được full-text: DB không phải MySQL, hoặc
+        có từ ngắn hơn min token size (sẽ không bao giờ khớp index).
+        """
+        if db.session.get_bind().dialect.name != 'mysql':
+            return None
+        words = _FULLTEXT_OPERATORS.sub(' ', search_term).split()
+        if not words or any(len(word) < _FULLTEXT_MIN_TOKEN for word in words):
+            return None
+        return ' '.join(f'+{word}*' for word in words)
+    
     @classmethod
     def search_courses(cls, search_term, page=1, per_page=12):
-        """Search courses by title, description"""
-        search_pattern = f"%{search_term}%"
+        """
+        Search courses by title, description
         
-        pagination = cls.model.query.filter(
-            cls.model.is_published == True,
-            cls.model.status == CourseStatus.PUBLISHED,
-            or_(
-                cls.model.title.ilike(search_pattern),
-                cls.model.description.ilike(search_pattern),
-                cls.model.short_description.ilike(search_pattern),
-                cls.model.instructor_name.ilike(search_pattern)
+        MySQL: FULLTEXT index, sắp theo relevance rồi số học viên.
+        Fallback ILIKE '%term%' (SQLite, từ khóa quá ngắn).
+        """
+        fulltext_query = cls._fulltext_query(search_term)
+        
+        if fulltext_query:
+            relevance = _COURSE_FULLTEXT_MATCH.bindparams(fulltext_query=fulltext_query)
+            query = cls._published_query().filter(relevance).order_by(
+                desc(relevance), desc(cls.model.total_enrollments)
             )
-        ).order_by(desc(cls.model.total_enrollments)).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        else:
+            search_pattern = f"%{search_term}%"
+            query = cls._published_query().filter(
+                or_(
+                    cls.model.title.ilike(search_pattern),
+                    cls.model.description.ilike(search_pattern),
+                    cls.model.short_description.ilike(search_pattern),
+                    cls.model.instructor_name.ilike(search_pattern)
+                )
+            ).order_by(desc(cls.model.total_enrollments))
+        pagination = paginate_with_window_count(query, page, per_page)
         
         return {
-            'courses': pagination.items,
-            'total': pagination.total,
-            'pages': pagination.pages,
+            'courses': pagination['items'],
+            'total': pagination['total'],
+            'pages': pagination['pages'],
             'current_page': page,
             'per_page': per_page,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev,
+            'has_next': pagination['has_next'],
+            'has_prev': pagination['has_prev'],
             'search_term': search_term
         }
     
+    @classmethod
+    def get_published_version(cls):
+        """(MAX(updated_at), COUNT(*)) của course đã publish, dùng làm version cho ETag"""
+        return db.session.query(
+            func.max(cls.model.updated_at),
+            func.count(cls.model.id)
+        ).filter(
+            cls.model.is_published == True,
+            cls.model.status == CourseStatus.PUBLISHED
+        ).one()
+    
     @classmethod
     def get_course_statistics(cls):
         """Get course catalog statistics"""
@@ -275,7 +380,7 @@ class CourseDAO(BaseDAO):
         return cls.model.query.options(
             db.joinedload(cls.model.category),
             db.joinedload(cls.model.instructor),
-            db.joinedload(cls.model.modules).joinedload('lessons')
+            db.selectinload(cls.model.modules).selectinload(Module.lessons)
         ).filter_by(id=course_id, is_published=True).first()
 
 class CategoryDAO(BaseDAO):
@@ -289,6 +394,14 @@ class CategoryDAO(BaseDAO):
             cls.model.name
         ).all()
     
+    @classmethod
+    def get_active_categories_version(cls):
+        """(MAX(updated_at), COUNT(*)) của category active, dùng làm version cho ETag"""
+        return db.session.query(
+            func.max(cls.model.updated_at),
+            func.count(cls.model.id)
+        ).filter(cls.model.is_active == True).one()
+    
     @classmethod
     def get_category_by_slug(cls, slug):
         """Get category by slug"""
@@ -3,11 +3,12 @@ Enrollment DAO (Data Access Object)
 Provides data access methods for enrollment operations
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy import and_, or_, desc
 from app.dao.base_dao import BaseDAO
+from app.utils.pagination import paginate_with_window_count, keyset_page
 from app.models.enrollment import Enrollment, EnrollmentStatus, PaymentStatus
 from app.models.course import Course
 from app.models.user import User
@@ -86,70 +87,29 @@ class EnrollmentDAO(BaseDAO):
             if limit < 1 or limit > 100:
                 limit = 10
             
-            # Build base query with safer relationship loading
-            query = self.session.query(Enrollment).filter(
+            # Enrollment.to_dict chỉ đọc course (full_name/email là cột của enrollment),
+            # nên chỉ selectinload course: 1 query cho page + 1 query cho course
+            query = self.session.query(Enrollment).options(
+                selectinload(Enrollment.course)
+            ).filter(
                 Enrollment.user_id == user_id
             )
             
-            # Use selectinload instead of joinedload for better performance and error handling
-            try:
-                from sqlalchemy.orm import selectinload
-                query = query.options(
-                    selectinload(Enrollment.course),
-                    selectinload(Enrollment.user)
-                )
-            except ImportError:
-                # Fallback to joinedload if selectinload is not available
-                query = query.options(
-                    joinedload(Enrollment.course),
-                    joinedload(Enrollment.user)
-                )
-            
             # Apply status filter if provided
             if status_filter:
                 try:
                     status_enum = EnrollmentStatus(status_filter)
-                    query = query.filter(Enrollment.status == status_enum)
                 except ValueError:
                     # Invalid status, return empty result
                     return [], 0
+                query = query.filter(Enrollment.status == status_enum)
             
-            # Get total count before pagination with error handling
-            try:
-                total_count = query.count()
-            except SQLAlchemyError as e:
-                # If count fails, try simpler query
-                simple_query = self.session.query(Enrollment).filter(
-                    Enrollment.user_id == user_id
-                )
-                if status_filter:
-                    try:
-                        status_enum = EnrollmentStatus(status_filter)
-                        simple_query = simple_query.filter(Enrollment.status == status_enum)
-                    except ValueError:
-                        return [], 0
-                total_count = simple_query.count()
-            
-            # Apply pagination
-            offset = (page - 1) * limit
-            
-            try:
-                enrollments = query.order_by(desc(Enrollment.enrollment_date)).offset(offset).limit(limit).all()
-            except SQLAlchemyError as e:
-                # If complex query fails, try simpler one without relationships
-                simple_query = self.session.query(Enrollment).filter(
-                    Enrollment.user_id == user_id
-                )
-                if status_filter:
-                    try:
-                        status_enum = EnrollmentStatus(status_filter)
-                        simple_query = simple_query.filter(Enrollment.status == status_enum)
-                    except ValueError:
-                        return [], 0
-                
-                enrollments = simple_query.order_by(desc(Enrollment.enrollment_date)).offset(offset).limit(limit).all()
+            # Page + total trong cùng một SELECT (COUNT(*) OVER ())
+            pagination = paginate_with_window_count(
+                query.order_by(desc(Enrollment.enrollment_date)), page, limit
+            )
             
-            return enrollments or [], total_count or 0
+            return pagination['items'], pagination['total']
             
         except SQLAlchemyError as e:
             import logging
@@ -162,6 +122,66 @@ class EnrollmentDAO(BaseDAO):
             logger.error(f"Unexpected error in get_user_enrollments for user {user_id}: {str(e)}")
             raise SQLAlchemyError(f"Error retrieving user enrollments: {str(e)}")
     
+    def get_user_enrollments_after(self, user_id: int, status_filter: Optional[str] = None,
+                                   cursor: Optional[str] = None, limit: int = 10) -> tuple[List[Enrollment], Optional[str]]:
+        """
+        Get user's enrollments with keyset (cursor) pagination, mới nhất trước
+        
+        Args:
+            user_id: User ID
+            status_filter: Optional enrollment status filter
+            cursor: Cursor từ trang trước, None/'' cho trang đầu
+            limit: Number of items per page
+            
+        Returns:
+            tuple[List[Enrollment], Optional[str]]: (enrollments list, next cursor)
+            
+        Raises:
+            ValueError: Cursor không hợp lệ
+        """
+        query = self.session.query(Enrollment).options(
+            selectinload(Enrollment.course)
+        ).filter(
+            Enrollment.user_id == user_id
+        )
+        
+        if status_filter:
+            try:
+                status_enum = EnrollmentStatus(status_filter)
+            except ValueError:
+                return [], None
+            query = query.filter(Enrollment.status == status_enum)
+        
+        return keyset_page(query, Enrollment.enrollment_date, Enrollment.id, cursor, limit)
+    
+    def iter_user_enrollments(self, user_id: int, status_filter: Optional[str] = None,
+                              batch_size: int = 200) -> Iterator[Enrollment]:
+        """
+        Duyệt toàn bộ enrollments của user theo batch (yield_per), mới nhất trước
+        
+        Args:
+            user_id: User ID
+            status_filter: Optional enrollment status filter
+            batch_size: Số row fetch mỗi batch
+            
+        Returns:
+            Iterator[Enrollment]
+        """
+        query = self.session.query(Enrollment).options(
+            selectinload(Enrollment.course)
+        ).filter(
+            Enrollment.user_id == user_id
+        )
+        
+        if status_filter:
+            try:
+                status_enum = EnrollmentStatus(status_filter)
+            except ValueError:
+                return iter(())
+            query = query.filter(Enrollment.status == status_enum)
+        
+        return iter(query.order_by(desc(Enrollment.enrollment_date), desc(Enrollment.id)).yield_per(batch_size))
+    
     def check_user_access(self, user_id: int, course_id: int) -> Optional[Enrollment]:
         """
         Check if user has access to a specific course
@@ -34,7 +34,7 @@ class UserDAO(BaseDAO):
         """
         try:
             return self.session.query(User).filter(
-                User.email == email.lower().strip()
+                User.email == User.normalize_email(email)
             ).first()
         except SQLAlchemyError as e:
             raise e
@@ -5,7 +5,7 @@ Implements course catalog browsing functionality
 
 from enum import Enum
 from datetime import datetime
-from sqlalchemy import Numeric
+from sqlalchemy import DDL, Numeric, event
 from app import db
 
 class DifficultyLevel(Enum):
@@ -80,6 +80,22 @@ class Course(db.Model):
     category = db.relationship('Category', backref='courses')
     instructor = db.relationship('User', backref='taught_courses')
     
+    __table_args__ = (
+        # Keyset pagination: WHERE (sort_col, id) < (...) ORDER BY sort_col, id
+        db.Index('idx_courses_published_at_id', 'published_at', 'id'),
+        db.Index('idx_courses_enrollments_id', 'total_enrollments', 'id'),
+        # Covering index cho aggregate của catalog: COUNT theo category
+        # (/categories/with-count), version MAX(updated_at)/COUNT cho ETag, top-rated
+        db.Index('idx_courses_category_published', 'category_id', 'is_published', 'status'),
+        db.Index('idx_courses_published_updated', 'is_published', 'status', 'updated_at'),
+        db.Index('idx_courses_rating', 'average_rating', 'total_ratings'),
+        # Danh sách course của instructor: WHERE instructor_id [AND status] ORDER BY <sort_by>
+        db.Index('idx_courses_instructor_updated', 'instructor_id', 'updated_at'),
+        db.Index('idx_courses_instructor_status_updated', 'instructor_id', 'status', 'updated_at'),
+        db.Index('idx_courses_instructor_status_created', 'instructor_id', 'status', 'created_at'),
+        db.Index('idx_courses_instructor_status_title', 'instructor_id', 'status', 'title'),
+    )
+    
     def __init__(self, title, instructor_id, category_id, price=0.00, **kwargs):
         self.title = title
         self.instructor_id = instructor_id
@@ -123,6 +139,18 @@ class Course(db.Model):
             total_score += new_rating
             self.total_ratings += 1
             self.average_rating = total_score / self.total_ratings
+
+# Cột tham gia full-text search khóa học (FULLTEXT index trên MySQL)
+COURSE_SEARCH_COLUMNS = ('title', 'short_description', 'description', 'instructor_name')
+
+# db.create_all() trên MySQL cũng tạo FULLTEXT index (migration 5f2a9c4d7e31 cho DB có sẵn)
+event.listen(
+    Course.__table__,
+    'after_create',
+    DDL(
+        'CREATE FULLTEXT INDEX ft_courses_search ON courses (%s)' % ', '.join(COURSE_SEARCH_COLUMNS)
+    ).execute_if(dialect='mysql')
+)
         
 class Category(db.Model):
     __tablename__ = 'categories'
@@ -166,6 +194,11 @@ class Module(db.Model):
     # Relationships
     course = db.relationship('Course', backref='modules')
     
+    __table_args__ = (
+        # Danh sách module của course theo thứ tự
+        db.Index('idx_modules_course_order', 'course_id', 'sort_order'),
+    )
+    
     def __init__(self, course_id, title, **kwargs):
         self.course_id = course_id
         self.title = title
@@ -197,6 +230,11 @@ class Lesson(db.Model):
     # Relationships
     module = db.relationship('Module', backref='lessons')
     
+    __table_args__ = (
+        # Danh sách lesson của module theo thứ tự
+        db.Index('idx_lessons_module_order', 'module_id', 'sort_order'),
+    )
+    
     def __init__(self, module_id, title, content_type, **kwargs):
         self.module_id = module_id
         self.title = title
@@ -226,6 +264,11 @@ class Content(db.Model):
     # Relationships
     lesson = db.relationship('Lesson', backref='contents')
     
+    __table_args__ = (
+        # Preload contents theo lesson_id IN (...)
+        db.Index('idx_content_lesson_order', 'lesson_id', 'sort_order'),
+    )
+    
     def __init__(self, lesson_id, title, **kwargs):
         self.lesson_id = lesson_id
         self.title = title
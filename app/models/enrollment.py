@@ -77,6 +77,8 @@ class Enrollment(db.Model):
     # Unique constraint to prevent duplicate enrollments
     __table_args__ = (
         db.UniqueConstraint('user_id', 'course_id', name='unique_user_course_enrollment'),
+        # My-courses: WHERE user_id = ? ORDER BY enrollment_date DESC, id DESC (keyset)
+        db.Index('idx_enrollments_user_date_id', 'user_id', 'enrollment_date', 'id'),
     )
     
     def __init__(self, user_id, course_id, full_name, email, payment_amount=0.00, discount_code=None, discount_applied=0.00):
@@ -6,8 +6,18 @@ Implements User Stories: OLS-US-001, OLS-US-002, OLS-US-003
 from datetime import datetime, timedelta
 from enum import Enum
 from werkzeug.security import generate_password_hash, check_password_hash
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 from app import db
+from app.utils.serialization import build_dict_serializer
+
+
+def _password_hash_method():
+    """Get password hash method từ config (PASSWORD_HASH_METHOD)"""
+    if has_app_context():
+        return current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    return 'pbkdf2:sha256:260000'
 
 
 class UserRole(Enum):
@@ -17,6 +27,10 @@ class UserRole(Enum):
     ADMIN = 'admin'
 
 
+# Role được quản lý course (route instructor, tạo course)
+INSTRUCTOR_ROLES = frozenset((UserRole.INSTRUCTOR, UserRole.ADMIN))
+
+
 class User(db.Model):
     """
     User model cho authentication và profile management
@@ -56,6 +70,16 @@ class User(db.Model):
     confirmation_token = db.Column(db.String(255), nullable=True)
     confirmed_at = db.Column(db.DateTime, nullable=True)
     
+    __table_args__ = (
+        # Token lookup khi confirm email; partial index trên DB hỗ trợ (PostgreSQL/SQLite),
+        # MySQL bỏ qua điều kiện WHERE và tạo unique index thường (cho phép nhiều NULL)
+        db.Index('idx_users_confirmation_token', 'confirmation_token', unique=True,
+                 postgresql_where=text('confirmation_token IS NOT NULL'),
+                 sqlite_where=text('confirmation_token IS NOT NULL')),
+        # Session-expiry sweeps: WHERE is_active AND last_activity_at < cutoff
+        db.Index('idx_users_active_last_activity', 'is_active', 'last_activity_at'),
+    )
+    
     # Relationships (commented out for now as related models may not exist)
     # courses = db.relationship('Course', backref='instructor', lazy='dynamic')
     # enrollments = db.relationship('Enrollment', backref='user', lazy='dynamic')
@@ -64,7 +88,7 @@ class User(db.Model):
     
     def __init__(self, email, password, first_name, last_name, role=UserRole.STUDENT):
         """Initialize user với required fields"""
-        self.email = email.lower().strip()
+        self.email = User.normalize_email(email)
         self.set_password(password)
         self.first_name = first_name.strip()
         self.last_name = last_name.strip()
@@ -77,7 +101,7 @@ class User(db.Model):
         """
         if len(password) < 8:
             raise ValueError("Password must be at least 8 characters long")
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=_password_hash_method())
     
     def check_password(self, password):
         """Verify password"""
@@ -100,7 +124,7 @@ class User(db.Model):
     
     def can_create_courses(self):
         """Check if user can create courses"""
-        return self.role in [UserRole.INSTRUCTOR, UserRole.ADMIN] and self.is_verified
+        return self.role in INSTRUCTOR_ROLES and self.is_verified
     
     def update_last_login(self):
         """Update last login timestamp"""
@@ -232,31 +256,17 @@ class User(db.Model):
     
     def to_dict(self, include_sensitive=False):
         """Convert user to dictionary for API responses"""
-        data = {
-            'id': self.id,
-            'email': self.email,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'full_name': self.full_name,
-            'profile_image': self.profile_image,
-            'profile_image_url': self.get_avatar_url(),
-            'role': self.role.value,
-            'is_active': self.is_active,
-            'is_verified': self.is_verified,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login_at': self.last_login_at.isoformat() if self.last_login_at else None,
-            'last_activity_at': self.last_activity_at.isoformat() if self.last_activity_at else None,
-            'confirmed_at': self.confirmed_at.isoformat() if self.confirmed_at else None
-        }
-        
         if include_sensitive:
-            data.update({
-                'failed_login_attempts': self.failed_login_attempts,
-                'is_locked': self.is_locked,
-                'has_confirmation_token': bool(self.confirmation_token)
-            })
-        
-        return data
+            return _user_to_dict_sensitive(self)
+        return _user_to_dict(self)
+    
+    @staticmethod
+    def normalize_email(email):
+        """
+        Normalize email cho lưu trữ và lookup
+        Business Rule: Email không phân biệt hoa thường
+        """
+        return email.strip().lower()
     
     @staticmethod
     def validate_email(email):
@@ -274,14 +284,27 @@ class User(db.Model):
         if len(password) < 8:
             return False, "Password must be at least 8 characters long"
         
-        import re
-        if not re.search(r'[A-Z]', password):
+        # Một lần duyệt: gom flags (1=hoa, 2=thường, 4=số), dừng sớm khi đủ
+        flags = 0
+        for char in password:
+            if 'A' <= char <= 'Z':
+                flags |= 1
+            elif 'a' <= char <= 'z':
+                flags |= 2
+            elif char.isdecimal():
+                flags |= 4
+            else:
+                continue
+            if flags == 7:
+                break
+        
+        if not flags & 1:
             return False, "Password must contain at least one uppercase letter"
         
-        if not re.search(r'[a-z]', password):
+        if not flags & 2:
             return False, "Password must contain at least one lowercase letter"
         
-        if not re.search(r'\d', password):
+        if not flags & 4:
             return False, "Password must contain at least one number"
         
         return True, "Password is strong"
@@ -310,4 +333,32 @@ class User(db.Model):
         return True, "Valid name"
     
     def __repr__(self):
-        return f'<User {self.email}>'
\ No newline at end of file
+        return f'<User {self.email}>'
+
+
+# Serializers cho User.to_dict, được sinh một lần khi import module
+_USER_DICT_FIELDS = (
+    ('id', 'obj.id'),
+    ('email', 'obj.email'),
+    ('first_name', 'obj.first_name'),
+    ('last_name', 'obj.last_name'),
+    ('full_name', 'obj.full_name'),
+    ('profile_image', 'obj.profile_image'),
+    ('profile_image_url', 'obj.get_avatar_url()'),
+    ('role', 'obj.role.value'),
+    ('is_active', 'obj.is_active'),
+    ('is_verified', 'obj.is_verified'),
+    ('created_at', 'iso_or_none(obj.created_at)'),
+    ('last_login_at', 'iso_or_none(obj.last_login_at)'),
+    ('last_activity_at', 'iso_or_none(obj.last_activity_at)'),
+    ('confirmed_at', 'iso_or_none(obj.confirmed_at)'),
+)
+
+_USER_SENSITIVE_FIELDS = _USER_DICT_FIELDS + (
+    ('failed_login_attempts', 'obj.failed_login_attempts'),
+    ('is_locked', 'obj.is_locked'),
+    ('has_confirmation_token', 'bool(obj.confirmation_token)'),
+)
+
+_user_to_dict = build_dict_serializer('_user_to_dict', _USER_DICT_FIELDS)
+_user_to_dict_sensitive = build_dict_serializer('_user_to_dict_sensitive', _USER_SENSITIVE_FIELDS)
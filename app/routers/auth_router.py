@@ -8,19 +8,24 @@ Business Requirements:
 - Account security với failed login tracking
 """
 
-from flask import Blueprint, request, current_app
-from flask_jwt_extended import create_refresh_token, jwt_required, get_jwt_identity
+from flask import Blueprint, request, current_app, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required
 from marshmallow import ValidationError
 
 from app import limiter
 from app.services.auth_service import AuthService
-from app.services.user_service import UserService
-from app.validators.auth import UserRegistrationSchema, UserLoginSchema
+from app.services.user_service import UserService, get_cached_user_dict
+from app.validators.auth import UserRegistrationSchema, UserLoginSchema, EmailConfirmationSchema
+from app.utils.auth import current_user_id
+from app.utils.errors import api_handler
+from app.utils.request import fast_json
 from app.utils.response import (
     success_response, 
     error_response, 
     validation_error_response,
-    created_response
+    created_response,
+    body_required_response,
+    prebuilt_error_response
 )
 from app.exceptions.base import (
     ValidationException,
@@ -31,8 +36,19 @@ from app.exceptions.base import (
 
 auth_router = Blueprint('auth', __name__)
 
+# Schema instances dùng chung (stateless khi load), tránh khởi tạo lại mỗi request
+_REGISTRATION_SCHEMA = UserRegistrationSchema()
+_LOGIN_SCHEMA = UserLoginSchema()
+_EMAIL_CONFIRMATION_SCHEMA = EmailConfirmationSchema()
 
+# resend-confirmation chỉ nhận {"email": "..."}; body lớn hơn là bất thường
+_RESEND_MAX_BODY = 1024
 
+# Body lỗi 500 cố định theo endpoint, serialize sẵn
+_REGISTRATION_FAILED = prebuilt_error_response('Registration failed. Please try again.', 500)
+_LOGIN_FAILED = prebuilt_error_response('Login failed. Please try again.', 500)
+_CONFIRMATION_FAILED = prebuilt_error_response('Email confirmation failed. Please try again.', 500)
+_RESEND_FAILED = prebuilt_error_response('Failed to resend confirmation. Please try again.', 500)
 
 
 @auth_router.route('/register', methods=['POST'])
@@ -54,14 +70,13 @@ def register():
     """
     try:
         # Get JSON data
-        data = request.get_json()
+        data = fast_json()
         if not data:
-            return validation_error_response('No data provided', {'general': ['Request body is required']})
+            return body_required_response()
         
         # Validate input using schema
-        schema = UserRegistrationSchema()
         try:
-            validated_data = schema.load(data)
+            validated_data = _REGISTRATION_SCHEMA.load(data)
         except ValidationError as err:
             return validation_error_response('Validation failed', err.messages)
         
@@ -107,7 +122,7 @@ def register():
         )
     except Exception as e:
         current_app.logger.error(f"Registration error: {e}")
-        return error_response('Registration failed. Please try again.', 500)
+        return _REGISTRATION_FAILED()
 
 
 @auth_router.route('/login', methods=['POST'])
@@ -129,14 +144,13 @@ def login():
     """
     try:
         # Get JSON data
-        data = request.get_json()
+        data = fast_json()
         if not data:
-            return validation_error_response('No data provided', {'general': ['Request body is required']})
+            return body_required_response()
         
         # Validate input using schema
-        schema = UserLoginSchema()
         try:
-            validated_data = schema.load(data)
+            validated_data = _LOGIN_SCHEMA.load(data)
         except ValidationError as err:
             return validation_error_response('Validation failed', err.messages)
         
@@ -161,11 +175,12 @@ def login():
         return error_response(e.message, status_code)
     except Exception as e:
         current_app.logger.error(f"Login error: {e}")
-        return error_response('Login failed. Please try again.', 500)
+        return _LOGIN_FAILED()
 
 
 @auth_router.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
+@api_handler('Token refresh failed. Please try again.')
 def refresh():
     """
     Token Refresh Endpoint
@@ -177,33 +192,28 @@ def refresh():
     - Generate new access token
     - Maintain user session
     """
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or not user.is_active:
-            return error_response('User not found or inactive', 404)
-        
-        # Create new access token
-        new_access_token = create_access_token(identity=str(user.id))
-        
-        return success_response(
-            message='Token refreshed successfully',
-            data={
-                'access_token': new_access_token,
-                'user': {
-                    'id': user.id,
-                    'email': user.email,
-                    'full_name': user.full_name,
-                    'role': user.role.value,
-                    'avatar_url': user.get_avatar_url()
-                }
+    # Đọc thẳng DB (bỏ qua cache 30s của /me): user vừa bị khóa không được cấp token mới
+    user = get_cached_user_dict.uncached(current_user_id())
+    
+    if not user or not user['is_active']:
+        return error_response('User not found or inactive', 404)
+    
+    # Create new access token
+    new_access_token = create_access_token(identity=str(user['id']))
+    
+    return success_response(
+        message='Token refreshed successfully',
+        data={
+            'access_token': new_access_token,
+            'user': {
+                'id': user['id'],
+                'email': user['email'],
+                'full_name': user['full_name'],
+                'role': user['role'],
+                'avatar_url': user['profile_image_url']
             }
-        )
-        
-    except Exception as e:
-        current_app.logger.error(f"Token refresh error: {e}")
-        return error_response('Token refresh failed. Please try again.', 500)
+        }
+    )
 
 
 @auth_router.route('/logout', methods=['POST'])
@@ -243,7 +253,7 @@ def confirm_email(token):
         )
         
     except ValidationException as e:
-        return validation_error_response(e.message, {'token': [e.message]})
+        return validation_error_response(e.message, field='token')
     except BusinessLogicException as e:
         # Handle already confirmed case
         if 'already confirmed' in e.message.lower():
@@ -254,7 +264,7 @@ def confirm_email(token):
         return error_response(e.message, 400)
     except Exception as e:
         current_app.logger.error(f"Email confirmation error: {e}")
-        return error_response('Email confirmation failed. Please try again.', 500)
+        return _CONFIRMATION_FAILED()
 
 
 @auth_router.route('/resend-confirmation', methods=['POST'])
@@ -274,14 +284,21 @@ def resend_confirmation():
     Rate Limiting: 3 requests per minute per IP
     """
     try:
-        data = request.get_json()
+        # Từ chối body quá lớn trước khi đọc / parse
+        if (request.content_length or 0) > _RESEND_MAX_BODY:
+            return error_response('Request entity too large', 413)
+        
+        data = fast_json()
         if not data or 'email' not in data:
-            return validation_error_response('Email is required', {'email': ['Email is required']})
+            return validation_error_response('Email is required', field='email')
         
-        email = data['email'].lower().strip()
+        try:
+            validated_data = _EMAIL_CONFIRMATION_SCHEMA.load(data)
+        except ValidationError as err:
+            return validation_error_response('Validation failed', err.messages)
         
-        # Resend confirmation using service
-        result = AuthService.resend_confirmation_email(email)
+        # Email đã được schema normalize (pre_load)
+        result = AuthService.resend_confirmation_email(validated_data['email'])
         
         return success_response(
             message='If the email exists, a confirmation link has been sent',
@@ -292,7 +309,7 @@ def resend_confirmation():
         return error_response(e.message, 400)
     except Exception as e:
         current_app.logger.error(f"Resend confirmation error: {e}")
-        return error_response('Failed to resend confirmation. Please try again.', 500)
+        return _RESEND_FAILED()
 
 
 @auth_router.route('/me', methods=['GET'])
@@ -304,8 +321,7 @@ def get_current_user():
     Returns the current authenticated user's profile
     """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
+        user = get_cached_user_dict(current_user_id())
         
         if not user:
             return jsonify({
@@ -315,7 +331,7 @@ def get_current_user():
         
         return jsonify({
             'success': True,
-            'user': user.to_dict()
+            'user': user
         }), 200
         
     except Exception as e:
@@ -3,13 +3,85 @@ Cart Router
 API endpoints for cart operations
 """
 
-from flask import Blueprint, request, session
+from functools import wraps
+
+from flask import Blueprint, session, g, current_app
+from werkzeug.exceptions import HTTPException
+from marshmallow import Schema, fields, validate, EXCLUDE
+from app import cache
+from app.services import app_service
 from app.services.cart_service import CartService
-from app.utils.response import success_response, error_response
+from app.utils.response import (
+    error_response, is_ok_response, make_responder,
+    prebuilt_response, prebuilt_error_response
+)
 from app.utils.auth import get_current_user_optional, get_session_id
+from app.utils.locks import cache_lock, LockTimeout
+from app.utils.request import fast_json, validate_query
+from app.exceptions.base import BusinessLogicException
 from app.exceptions.validation_exception import ValidationException
 
 cart_router = Blueprint('cart', __name__)
+cart_service = app_service('cart_service', CartService)
+
+
+class CouponListQuerySchema(Schema):
+    """Query params của GET /coupons"""
+    
+    class Meta:
+        unknown = EXCLUDE
+    
+    limit = fields.Int(load_default=10, validate=validate.Range(
+        min=1, max=50, error='Limit must be between 1 and 50'
+    ))
+
+
+_COUPON_LIST_QUERY = CouponListQuerySchema()
+
+# Response cố định, serialize sẵn một lần
+_INTERNAL_ERROR = prebuilt_error_response("Internal server error", 500)
+_AUTH_REQUIRED = prebuilt_error_response("Authentication required", 401)
+_SESSION_ID_REQUIRED = prebuilt_error_response("Session ID required", 400)
+_INVALID_ITEM_ID = prebuilt_error_response("Invalid item ID", 400)
+_INVALID_COURSE_ID = prebuilt_error_response("Invalid course_id", 400)
+_COURSE_ID_REQUIRED = prebuilt_error_response("course_id is required", 400)
+_COUPON_CODE_REQUIRED = prebuilt_error_response("coupon_code is required", 400)
+_COUPON_CODE_EMPTY = prebuilt_error_response("coupon_code cannot be empty", 400)
+_CART_BUSY = prebuilt_error_response("Cart is being updated, please retry", 409)
+
+# Success responder theo route, message serialize sẵn
+_CART_RETRIEVED = make_responder("Cart retrieved successfully")
+_ITEM_ADDED = make_responder("Item added to cart successfully")
+_ITEM_REMOVED = make_responder("Item removed from cart successfully")
+_COUPON_APPLIED = make_responder("Coupon applied successfully")
+_COUPON_REMOVED = make_responder("Coupon removed successfully")
+_CART_MERGED = make_responder("Guest cart merged successfully")
+_CART_CLEARED = make_responder("Cart cleared successfully")
+_COUPONS_RETRIEVED = make_responder("Available coupons retrieved successfully")
+
+_CART_HEALTHY = prebuilt_response({
+    'success': True,
+    'message': "Cart service is healthy",
+    'data': {"status": "healthy", "service": "cart"}
+})
+
+
+def with_cart_lock(f):
+    """
+    Serialize các thao tác ghi lên cùng một cart (theo user hoặc guest session)
+    
+    Request đồng thời (nhiều tab, AJAX) chờ lock tối đa ~1s rồi nhận 409.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        current_user = get_current_user_optional()
+        owner = f"u:{current_user.id}" if current_user else f"s:{get_session_id()}"
+        try:
+            with cache_lock(f"cart_lock:{owner}"):
+                return f(*args, **kwargs)
+        except LockTimeout:
+            return _CART_BUSY()
+    return decorated
 
 
 @cart_router.route('/', methods=['GET'])
@@ -21,26 +93,17 @@ def get_cart():
     Authentication: Optional (supports guest carts)
     Session: Uses session ID for guest users
     """
-    try:
-        cart_service = CartService()
-        current_user = get_current_user_optional()
-        session_id = get_session_id()
-        user_id = current_user.id if current_user else None
-        
-        cart_data = cart_service.get_cart(user_id=user_id, session_id=session_id)
-        
-        return success_response(
-            data=cart_data,
-            message="Cart retrieved successfully"
-        )
-        
-    except ValidationException as e:
-        return error_response(str(e), 400)
-    except Exception as e:
-        return error_response("Internal server error", 500)
+    current_user = get_current_user_optional()
+    session_id = get_session_id()
+    user_id = current_user.id if current_user else None
+    
+    cart_data = cart_service.get_cart(user_id=user_id, session_id=session_id)
+    
+    return _CART_RETRIEVED(cart_data)
 
 
 @cart_router.route('/items', methods=['POST'])
+@with_cart_lock
 def add_item_to_cart():
     """
     Add item to cart
@@ -50,39 +113,28 @@ def add_item_to_cart():
     Idempotent: Returns current state if course already in cart
     Conflict: Returns 409 if duplicate detected
     """
-    try:
-        data = request.get_json()
-        if not data or 'course_id' not in data:
-            return error_response("course_id is required", 400)
-        
-        course_id = data.get('course_id')
-        if not isinstance(course_id, int) or course_id <= 0:
-            return error_response("Invalid course_id", 400)
-        
-        cart_service = CartService()
-        current_user = get_current_user_optional()
-        session_id = get_session_id()
-        user_id = current_user.id if current_user else None
-        
-        cart_data = cart_service.add_item_to_cart(
-            course_id=course_id,
-            user_id=user_id,
-            session_id=session_id
-        )
-        
-        return success_response(
-            data=cart_data,
-            message="Item added to cart successfully"
-        )
-        
-    except ValidationException as e:
-        status_code = getattr(e, 'status_code', 400)
-        return error_response(str(e), status_code)
-    except Exception as e:
-        return error_response("Internal server error", 500)
+    data = fast_json()
+    course_id = data.get('course_id') if isinstance(data, dict) else None
+    if course_id is None:
+        return _COURSE_ID_REQUIRED()
+    if not isinstance(course_id, int) or course_id <= 0:
+        return _INVALID_COURSE_ID()
+    
+    current_user = get_current_user_optional()
+    session_id = get_session_id()
+    user_id = current_user.id if current_user else None
+    
+    cart_data = cart_service.add_item_to_cart(
+        course_id=course_id,
+        user_id=user_id,
+        session_id=session_id
+    )
+    
+    return _ITEM_ADDED(cart_data)
 
 
 @cart_router.route('/items/<int:item_id>', methods=['DELETE'])
+@with_cart_lock
 def remove_item_from_cart(item_id):
     """
     Remove item from cart
@@ -91,33 +143,24 @@ def remove_item_from_cart(item_id):
     Returns: Updated cart information
     Authentication: Optional (supports guest carts)
     """
-    try:
-        if item_id <= 0:
-            return error_response("Invalid item ID", 400)
-        
-        cart_service = CartService()
-        current_user = get_current_user_optional()
-        session_id = get_session_id()
-        user_id = current_user.id if current_user else None
-        
-        cart_data = cart_service.remove_item_from_cart(
-            item_id=item_id,
-            user_id=user_id,
-            session_id=session_id
-        )
-        
-        return success_response(
-            data=cart_data,
-            message="Item removed from cart successfully"
-        )
-        
-    except ValidationException as e:
-        return error_response(str(e), 400)
-    except Exception as e:
-        return error_response("Internal server error", 500)
+    if item_id <= 0:
+        return _INVALID_ITEM_ID()
+    
+    current_user = get_current_user_optional()
+    session_id = get_session_id()
+    user_id = current_user.id if current_user else None
+    
+    cart_data = cart_service.remove_item_from_cart(
+        item_id=item_id,
+        user_id=user_id,
+        session_id=session_id
+    )
+    
+    return _ITEM_REMOVED(cart_data)
 
 
 @cart_router.route('/apply-coupon', methods=['POST'])
+@with_cart_lock
 def apply_coupon():
     """
     Apply coupon to cart
@@ -126,38 +169,30 @@ def apply_coupon():
     Returns: Cart with coupon applied and calculation breakdown
     Calculations: Includes initial total, tax/fee (stub), and final amount
     """
-    try:
-        data = request.get_json()
-        if not data or 'coupon_code' not in data:
-            return error_response("coupon_code is required", 400)
-        
-        coupon_code = data.get('coupon_code', '').strip()
-        if not coupon_code:
-            return error_response("coupon_code cannot be empty", 400)
-        
-        cart_service = CartService()
-        current_user = get_current_user_optional()
-        session_id = get_session_id()
-        user_id = current_user.id if current_user else None
-        
-        cart_data = cart_service.apply_coupon(
-            coupon_code=coupon_code,
-            user_id=user_id,
-            session_id=session_id
-        )
-        
-        return success_response(
-            data=cart_data,
-            message="Coupon applied successfully"
-        )
-        
-    except ValidationException as e:
-        return error_response(str(e), 400)
-    except Exception as e:
-        return error_response("Internal server error", 500)
+    data = fast_json()
+    coupon_code = data.get('coupon_code') if isinstance(data, dict) else None
+    if coupon_code is None:
+        return _COUPON_CODE_REQUIRED()
+    
+    coupon_code = coupon_code.strip() if isinstance(coupon_code, str) else ''
+    if not coupon_code:
+        return _COUPON_CODE_EMPTY()
+    
+    current_user = get_current_user_optional()
+    session_id = get_session_id()
+    user_id = current_user.id if current_user else None
+    
+    cart_data = cart_service.apply_coupon(
+        coupon_code=coupon_code,
+        user_id=user_id,
+        session_id=session_id
+    )
+    
+    return _COUPON_APPLIED(cart_data)
 
 
 @cart_router.route('/coupon', methods=['DELETE'])
+@with_cart_lock
 def remove_coupon():
     """
     Remove coupon from cart
@@ -165,29 +200,20 @@ def remove_coupon():
     Returns: Updated cart information without coupon
     Authentication: Optional (supports guest carts)
     """
-    try:
-        cart_service = CartService()
-        current_user = get_current_user_optional()
-        session_id = get_session_id()
-        user_id = current_user.id if current_user else None
-        
-        cart_data = cart_service.remove_coupon(
-            user_id=user_id,
-            session_id=session_id
-        )
-        
-        return success_response(
-            data=cart_data,
-            message="Coupon removed successfully"
-        )
-        
-    except ValidationException as e:
-        return error_response(str(e), 400)
-    except Exception as e:
-        return error_response("Internal server error", 500)
+    current_user = get_current_user_optional()
+    session_id = get_session_id()
+    user_id = current_user.id if current_user else None
+    
+    cart_data = cart_service.remove_coupon(
+        user_id=user_id,
+        session_id=session_id
+    )
+    
+    return _COUPON_REMOVED(cart_data)
 
 
 @cart_router.route('/merge', methods=['POST'])
+@with_cart_lock
 def merge_guest_cart():
     """
     Merge guest cart on login
@@ -196,34 +222,24 @@ def merge_guest_cart():
     Authentication: Required (user must be logged in)
     Usage: Called automatically during login process
     """
-    try:
-        current_user = get_current_user_optional()
-        if not current_user:
-            return error_response("Authentication required", 401)
-        
-        session_id = get_session_id()
-        if not session_id:
-            return error_response("Session ID required", 400)
-        
-        cart_service = CartService()
-        
-        cart_data = cart_service.merge_guest_cart_on_login(
-            user_id=current_user.id,
-            session_id=session_id
-        )
-        
-        return success_response(
-            data=cart_data,
-            message="Guest cart merged successfully"
-        )
-        
-    except ValidationException as e:
-        return error_response(str(e), 400)
-    except Exception as e:
-        return error_response("Internal server error", 500)
+    current_user = get_current_user_optional()
+    if not current_user:
+        return _AUTH_REQUIRED()
+    
+    session_id = get_session_id()
+    if not session_id:
+        return _SESSION_ID_REQUIRED()
+    
+    cart_data = cart_service.merge_guest_cart_on_login(
+        user_id=current_user.id,
+        session_id=session_id
+    )
+    
+    return _CART_MERGED(cart_data)
 
 
 @cart_router.route('/clear', methods=['DELETE'])
+@with_cart_lock
 def clear_cart():
     """
     Clear all items from cart
@@ -231,29 +247,21 @@ def clear_cart():
     Returns: Empty cart information
     Authentication: Optional (supports guest carts)
     """
-    try:
-        cart_service = CartService()
-        current_user = get_current_user_optional()
-        session_id = get_session_id()
-        user_id = current_user.id if current_user else None
-        
-        cart_data = cart_service.clear_cart(
-            user_id=user_id,
-            session_id=session_id
-        )
-        
-        return success_response(
-            data=cart_data,
-            message="Cart cleared successfully"
-        )
-        
-    except ValidationException as e:
-        return error_response(str(e), 400)
-    except Exception as e:
-        return error_response("Internal server error", 500)
+    current_user = get_current_user_optional()
+    session_id = get_session_id()
+    user_id = current_user.id if current_user else None
+    
+    cart_data = cart_service.clear_cart(
+        user_id=user_id,
+        session_id=session_id
+    )
+    
+    return _CART_CLEARED(cart_data)
 
 
 @cart_router.route('/coupons', methods=['GET'])
+@cache.cached(timeout=60, query_string=True, response_filter=is_ok_response)
+@validate_query(_COUPON_LIST_QUERY)
 def get_available_coupons():
     """
     Get available public coupons
@@ -261,24 +269,11 @@ def get_available_coupons():
     limit: Maximum number of coupons to return (default: 10)
     Returns: List of available coupons with details
     Authentication: Not required
+    Cache: 60s theo query string (coupon public, mỗi limit một key)
     """
-    try:
-        limit = request.args.get('limit', 10, type=int)
-        if limit <= 0 or limit > 50:
-            return error_response("Limit must be between 1 and 50", 400)
-        
-        cart_service = CartService()
-        coupons = cart_service.get_available_coupons(limit=limit)
-        
-        return success_response(
-            data={"coupons": coupons},
-            message="Available coupons retrieved successfully"
-        )
-        
-    except ValidationException as e:
-        return error_response(str(e), 400)
-    except Exception as e:
-        return error_response("Internal server error", 500)
+    coupons = cart_service.get_available_coupons(limit=g.query['limit'])
+    
+    return _COUPONS_RETRIEVED({"coupons": coupons})
 
 
 @cart_router.route('/health', methods=['GET'])
@@ -286,13 +281,29 @@ def cart_health_check():
     """
     Cart service health check
     
-    Returns: Service status
+    Returns: Service status (body serialize sẵn lúc import)
     Authentication: Not required
     """
-    try:
-        return success_response(
-            data={"status": "healthy", "service": "cart"},
-            message="Cart service is healthy"
-        )
-    except Exception as e:
-        return error_response("Cart service unhealthy", 500)
\ No newline at end of file
+    return _CART_HEALTHY()
+
+
+# Error handlers: một đường dispatch cho mọi view thay vì try/except từng route
+@cart_router.errorhandler(ValidationException)
+def handle_validation_error(error):
+    """Handle validation exceptions từ CartService"""
+    return error_response(str(error), getattr(error, 'status_code', 400))
+
+
+@cart_router.errorhandler(BusinessLogicException)
+def handle_business_logic_error(error):
+    """Handle business rule violations"""
+    return error_response(error.message, error.status_code)
+
+
+@cart_router.errorhandler(Exception)
+def handle_unexpected_error(error):
+    """Lỗi không lường trước trả 500; HTTPException (405, 413...) giữ nguyên"""
+    if isinstance(error, HTTPException):
+        return error
+    current_app.logger.exception("Unexpected cart error")
+    return _INTERNAL_ERROR()
@@ -3,240 +3,324 @@ Course Router
 API endpoints for course catalog browsing and management
 """
 
-from flask import Blueprint, request, jsonify
+from functools import wraps
+
+from flask import Blueprint, current_app, request, jsonify, g
 from flask_jwt_extended import jwt_required
 from app.services.course_service import CourseService
 from app.services.progress_service import ProgressService
-from app.utils.response import success_response, error_response
+from app import cache
+from app.utils.response import (
+    success_response, error_response, etag_response, conditional_response,
+    stream_list_response, is_ok_response, prebuilt_response, prebuilt_error_response,
+    validation_error_response
+)
 from app.utils.auth import get_current_user
-from app.exceptions.validation_exception import ValidationException
+from app.utils.pagination import InvalidPaginationError, ListParams
+from app.utils.request import validate_query
+from app.validators.course import LimitQuerySchema
+from app.exceptions.base import ValidationException
 
 course_router = Blueprint('courses', __name__)
 
+# Schema query params dùng chung, tạo một lần
+_TOP_LIST_QUERY = LimitQuerySchema(default_limit=10, max_limit=20)
+_SIMILAR_QUERY = LimitQuerySchema(default_limit=6, max_limit=12)
+
+# Ngôn ngữ hỗ trợ (hardcoded theo requirements)
+SUPPORTED_LANGUAGES = (
+    {"code": "vi", "name": "Vietnamese"},
+    {"code": "en", "name": "English"},
+    {"code": "zh", "name": "Chinese"},
+)
+
+# Response cố định, serialize sẵn một lần
+_LANGUAGES_RESPONSE = prebuilt_response({
+    'success': True,
+    'message': "Languages retrieved successfully",
+    'data': SUPPORTED_LANGUAGES
+}, etag=True)
+_HEALTH_RESPONSE = prebuilt_response({
+    'success': True,
+    'message': "Course service is running",
+    'data': {"status": "healthy"}
+})
+_INTERNAL_ERROR = prebuilt_error_response("Internal server error", 500)
+
+# Giá trị query param được hiểu là True
+_TRUTHY = frozenset(('true', '1', 'yes', 'on'))
+
+# Query param của catalog → filter key mà CourseService._process_filters nhận
+_CATALOG_FILTER_PARAMS = (
+    ('category_id', 'category_id'),
+    ('min_price', 'min_price'),
+    ('max_price', 'max_price'),
+    ('difficulty', 'difficulty_level'),
+    ('rating', 'min_rating'),
+    ('instructor_id', 'instructor_id'),
+    ('language', 'language'),
+    ('search', 'search'),
+)
+
+# Endpoint read-only ít thay đổi: gắn ETag theo body và trả 304 khi If-None-Match khớp
+_BODY_ETAG_ENDPOINTS = frozenset((
+    'courses.get_catalog_filters',
+    'courses.get_popular_courses',
+    'courses.get_top_rated_courses',
+    'courses.get_free_courses',
+    'courses.get_languages',
+))
+
+
+@course_router.after_request
+def _add_body_etag(response):
+    """Weak ETag từ hash body cho các endpoint trong _BODY_ETAG_ENDPOINTS"""
+    if (request.endpoint not in _BODY_ETAG_ENDPOINTS or request.method != 'GET'
+            or response.status_code != 200 or response.is_streamed):
+        return response
+    if not response.get_etag()[0]:
+        response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+
+def _invalid_pagination_response():
+    """page/per_page không phải số nguyên → 400 thay vì 500"""
+    return validation_error_response('Invalid pagination parameters', field='pagination')
+
+
+def course_endpoint(f):
+    """
+    Map exception của CourseService/ProgressService sang response chuẩn
+    
+    - ValidationException → 404 khi "Không tìm thấy", ngược lại 400
+    - InvalidPaginationError (page/per_page/cursor sai) → 400 validation error
+    - Exception khác → log + 500
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        try:
+            return f(*args, **kwargs)
+        except ValidationException as e:
+            message = str(e)
+            return error_response(message, 404 if "Không tìm thấy" in message else 400)
+        except InvalidPaginationError:
+            return _invalid_pagination_response()
+        except Exception:
+            current_app.logger.exception(f"Unexpected error in {f.__name__}")
+            return _INTERNAL_ERROR()
+    return decorated
+
 @course_router.route('/catalog', methods=['GET'])
+@course_endpoint
 def get_course_catalog():
     """
     Get paginated course catalog with filtering and sorting
     
     Query Parameters:
-    - page: Page number (default: 1)
+    - cursor: Cursor từ pagination.next_cursor; truyền rỗng (?cursor=) cho trang đầu
+      (preferred, sort newest/oldest/popularity)
+    - page: Page number (default: 1), dùng khi không có cursor
     - per_page: Items per page (default: 12, max: 50)
-    - category: Filter by category
+    - category / category_id: Filter by category ID
     - min_price: Minimum price filter
     - max_price: Maximum price filter
+    - is_free: Only free courses (true/1/yes/on)
     - difficulty: Filter by difficulty level
     - rating: Minimum rating filter
+    - instructor_id, language, search: Additional filters
     - sort_by: Sort field (popularity, price, rating, newest)
     - sort_order: Sort order (asc, desc)
     """
-    try:
-        # Get query parameters
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 12)), 50)
-        
-        filters = {
-            'category': request.args.get('category'),
-            'min_price': request.args.get('min_price'),
-            'max_price': request.args.get('max_price'),
-            'difficulty': request.args.get('difficulty'),
-            'rating': request.args.get('rating')
-        }
-        
-        sort_by = request.args.get('sort_by', 'popularity')
-        sort_order = request.args.get('sort_order', 'desc')
-        
-        # Get courses from service
-        result = CourseService.get_course_catalog(
-            page=page,
-            per_page=per_page,
-            filters=filters,
-            sort_by=sort_by
-        )
-        
-        return success_response(result, "Course catalog retrieved successfully")
-        
-    except ValidationException as e:
-        return error_response(str(e))
-    except Exception as e:
-        return error_response("Internal server error")
+    # Get query parameters
+    params = ListParams.from_args(request.args, sort_by='popularity')
+    
+    # Chỉ đưa vào filters các param có mặt trong request
+    args = request.args
+    filters = {key: args[param] for param, key in _CATALOG_FILTER_PARAMS if args.get(param)}
+    category = args.get('category')
+    if category and category.isdigit():
+        filters.setdefault('category_id', category)
+    if args.get('is_free', '').lower() in _TRUTHY:
+        filters['is_free'] = True
+    
+    # Get courses from service
+    result = CourseService.get_course_catalog(
+        page=params.page,
+        per_page=params.per_page,
+        filters=filters,
+        sort_by=params.sort_by,
+        cursor=params.cursor
+    )
+    
+    etag_seed = result.pop('etag_seed')
+    return etag_response(result, "Course catalog retrieved successfully", etag_seed)
 
 @course_router.route('/catalog/filters', methods=['GET'])
+@cache.cached(timeout=300, response_filter=is_ok_response)
+@course_endpoint
 def get_catalog_filters():
     """Get available filter options for course catalog"""
-    try:
-        filters = CourseService.get_catalog_filters()
-        return success_response(filters, "Catalog filters retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    filters = CourseService.get_catalog_filters()
+    return success_response(filters, "Catalog filters retrieved successfully")
 
 @course_router.route('/popular', methods=['GET'])
+@cache.cached(timeout=300, query_string=True, response_filter=is_ok_response)
+@validate_query(_TOP_LIST_QUERY)
+@course_endpoint
 def get_popular_courses():
     """Get popular courses"""
-    try:
-        limit = min(int(request.args.get('limit', 10)), 20)
-        courses = CourseService.get_popular_courses(limit)
-        return success_response(courses, "Popular courses retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    courses = CourseService.get_popular_courses(g.query['limit'])
+    return success_response(courses, "Popular courses retrieved successfully")
 
 @course_router.route('/top-rated', methods=['GET'])
+@cache.cached(timeout=300, query_string=True, response_filter=is_ok_response)
+@validate_query(_TOP_LIST_QUERY)
+@course_endpoint
 def get_top_rated_courses():
     """Get top-rated courses"""
-    try:
-        limit = min(int(request.args.get('limit', 10)), 20)
-        courses = CourseService.get_top_rated_courses(limit)
-        return success_response(courses, "Top-rated courses retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    courses = CourseService.get_top_rated_courses(g.query['limit'])
+    return success_response(courses, "Top-rated courses retrieved successfully")
 
 @course_router.route('/free', methods=['GET'])
+@cache.cached(timeout=300, query_string=True, response_filter=is_ok_response)
+@course_endpoint
 def get_free_courses():
     """Get free courses"""
-    try:
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 12)), 50)
-        
-        result = CourseService.get_free_courses(per_page)
-        return success_response(result, "Free courses retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    params = ListParams.from_args(request.args)
+    
+    result = CourseService.get_free_courses(params.page, params.per_page, cursor=params.cursor)
+    return success_response(result, "Free courses retrieved successfully")
 
 @course_router.route('/search', methods=['GET'])
+@course_endpoint
 def search_courses():
     """Search courses by keyword"""
-    try:
-        query = request.args.get('q', '').strip()
-        if not query:
-            return error_response("Search query is required")
-        
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 12)), 50)
-        
-        result = CourseService.search_courses(query, page, per_page)
-        return success_response(result, "Search results retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    query = request.args.get('q', '').strip()
+    if not query:
+        return error_response("Search query is required")
+    if len(query) > CourseService.SEARCH_TERM_MAX_LENGTH:
+        return error_response("Search query is too long")
+    
+    params = ListParams.from_args(request.args)
+    
+    result = CourseService.search_courses(query, params.page, params.per_page)
+    return stream_list_response(result, ('data', 'courses'), "Search results retrieved successfully")
+
+@cache.memoize(timeout=600)
+def _shaped_categories(version):
+    """
+    Categories theo format của GET /categories
+    
+    Memoize theo version (MAX(updated_at), COUNT) nên tự đổi key khi category thay đổi.
+    """
+    categories = CourseService.get_categories()['data']
+    return [
+        {
+            'id': category['id'],
+            'name': category['name'],
+            'slug': category['slug'],
+            'description': category.get('description', '')
+        }
+        for category in categories
+    ]
+
+@cache.memoize(timeout=600)
+def _categories_with_count(version):
+    """Categories kèm số course, memoize theo version"""
+    return CourseService.get_categories_with_course_count()['data']
 
 @course_router.route('/categories', methods=['GET'])
+@course_endpoint
 def get_categories():
-    """Get all course categories"""
-    try:
-        categories_response = CourseService.get_categories()
-        categories = categories_response['data']  # Extract actual categories list
-        
-        # Format response to match requirements
-        formatted_categories = []
-        for category in categories:
-            formatted_categories.append({
-                'id': category['id'],
-                'name': category['name'],
-                'slug': category['slug'],
-                'description': category.get('description', '')
-            })
-        
-        return success_response(formatted_categories, "Categories retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    """Get all course categories (ETag/Last-Modified, 304 khi không đổi)"""
+    etag_seed, last_modified = CourseService.get_categories_version()
+    return conditional_response(
+        etag_seed, lambda: _shaped_categories(etag_seed), "Categories retrieved successfully",
+        last_modified=last_modified
+    )
 
 @course_router.route('/categories/with-count', methods=['GET'])
+@course_endpoint
 def get_categories_with_count():
-    """Get categories with course count"""
-    try:
-        categories_response = CourseService.get_categories_with_course_count()
-        categories = categories_response['data']  # Extract actual categories list
-        return success_response(categories, "Categories with count retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    """Get categories with course count (ETag/Last-Modified, 304 khi không đổi)"""
+    etag_seed, last_modified = CourseService.get_categories_version(include_course_counts=True)
+    return conditional_response(
+        etag_seed,
+        lambda: _categories_with_count(etag_seed),
+        "Categories with count retrieved successfully",
+        last_modified=last_modified
+    )
 
 @course_router.route('/categories/<slug>/courses', methods=['GET'])
+@cache.cached(timeout=120, query_string=True, response_filter=is_ok_response)
+@course_endpoint
 def get_courses_by_category_slug(slug):
     """
     Get courses by category slug with pagination
     
     Query Parameters:
+    - cursor: Cursor từ pagination.next_cursor; '' cho trang đầu (sort newest/oldest/popularity)
     - page: Page number (default: 1)
     - per_page: Items per page (default: 12, max: 50)
     - sort_by: Sort field (newest, oldest, popularity, price_low, price_high, rating, title)
     """
-    try:
-        # Get query parameters
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 12)), 50)
-        sort_by = request.args.get('sort_by', 'newest')
-        
-        # Get courses from service
-        result = CourseService.get_courses_by_category_slug(
-            slug=slug,
-            page=page,
-            per_page=per_page,
-            sort_by=sort_by
-        )
-        
-        return success_response(result, "Courses retrieved successfully")
-        
-    except ValidationException as e:
-        return error_response(str(e), 404 if "Không tìm thấy danh mục" in str(e) else 400)
-    except Exception as e:
-        return error_response("Internal server error")
+    # Get query parameters
+    params = ListParams.from_args(request.args, sort_by='newest')
+    
+    # Get courses from service
+    result = CourseService.get_courses_by_category_slug(
+        slug=slug,
+        page=params.page,
+        per_page=params.per_page,
+        sort_by=params.sort_by,
+        cursor=params.cursor
+    )
+    
+    return success_response(result, "Courses retrieved successfully")
 
 @course_router.route('/<slug>', methods=['GET'])
+@course_endpoint
 def get_course_by_slug(slug):
     """Get course details by slug"""
-    try:
-        course = CourseService.get_course_by_slug(slug)
-        if not course:
-            return error_response("Course not found")
-        
-        return success_response(course, "Course details retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    course = CourseService.get_course_by_slug(slug)
+    if not course:
+        return error_response("Course not found")
+    
+    etag_seed = course.pop('etag_seed')
+    return etag_response(course, "Course details retrieved successfully", etag_seed)
 
 @course_router.route('/<int:course_id>/reviews', methods=['GET'])
+@course_endpoint
 def get_course_reviews(course_id):
     """Get reviews for a specific course"""
-    try:
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 10)), 20)
-        
-        result = CourseService.get_course_reviews(course_id, page, per_page)
-        return success_response(result, "Course reviews retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    params = ListParams.from_args(request.args, per_page=10, max_per_page=20)
+    
+    result = CourseService.get_course_reviews(course_id, params.page, params.per_page)
+    return success_response(result, "Course reviews retrieved successfully")
 
 @course_router.route('/<int:course_id>/similar', methods=['GET'])
+@validate_query(_SIMILAR_QUERY)
+@course_endpoint
 def get_similar_courses(course_id):
     """Get similar courses"""
-    try:
-        limit = min(int(request.args.get('limit', 6)), 12)
-        courses = CourseService.get_similar_courses(course_id, limit)
-        return success_response(courses, "Similar courses retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    courses = CourseService.get_similar_courses(course_id, g.query['limit'])
+    return success_response(courses, "Similar courses retrieved successfully")
 
 @course_router.route('/languages', methods=['GET'])
 def get_languages():
-    """Get supported languages"""
-    try:
-        # Return hardcoded language list as per requirements
-        languages = [
-            {"code": "vi", "name": "Vietnamese"},
-            {"code": "en", "name": "English"},
-            {"code": "zh", "name": "Chinese"}
-        ]
-        
-        return success_response(languages, "Languages retrieved successfully")
-    except Exception as e:
-        return error_response("Internal server error")
+    """Get supported languages (body serialize sẵn lúc import)"""
+    return _LANGUAGES_RESPONSE()
 
 @course_router.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return success_response({"status": "healthy"}, "Course service is running")
+    return _HEALTH_RESPONSE()
 
 # === LESSON AND PROGRESS ENDPOINTS ===
 
 @course_router.route('/<course_slug>/lessons', methods=['GET'])
 @jwt_required()
+@course_endpoint
 def get_course_lessons(course_slug):
     """
     Get course with all lessons and user progress
@@ -247,18 +331,13 @@ def get_course_lessons(course_slug):
     Returns:
         Course data with modules, lessons, and progress information
     """
-    try:
-        user = get_current_user()
-        result = ProgressService.get_course_lessons_with_progress(user, course_slug)
-        return success_response(result['data'], "Course lessons retrieved successfully")
-        
-    except ValidationException as e:
-        return error_response(str(e), 404 if "Không tìm thấy" in str(e) else 400)
-    except Exception as e:
-        return error_response("Internal server error")
+    user = get_current_user()
+    result = ProgressService.get_course_lessons_with_progress(user, course_slug)
+    return success_response(result['data'], "Course lessons retrieved successfully")
 
 @course_router.route('/<course_slug>/lessons/<int:lesson_id>', methods=['GET'])
 @jwt_required()
+@course_endpoint
 def get_lesson_details(course_slug, lesson_id):
     """
     Get specific lesson details with content and progress
@@ -270,18 +349,13 @@ def get_lesson_details(course_slug, lesson_id):
     Returns:
         Detailed lesson data with content and user progress
     """
-    try:
-        user = get_current_user()
-        result = ProgressService.get_lesson_details_with_progress(user, course_slug, lesson_id)
-        return success_response(result['data'], "Lesson details retrieved successfully")
-        
-    except ValidationException as e:
-        return error_response(str(e), 404 if "Không tìm thấy" in str(e) else 400)
-    except Exception as e:
-        return error_response("Internal server error")
+    user = get_current_user()
+    result = ProgressService.get_lesson_details_with_progress(user, course_slug, lesson_id)
+    return success_response(result['data'], "Lesson details retrieved successfully")
 
 @course_router.route('/<course_slug>/lessons/<int:lesson_id>/complete', methods=['POST'])
 @jwt_required()
+@course_endpoint
 def mark_lesson_complete(course_slug, lesson_id):
     """
     Mark a lesson as completed
@@ -293,18 +367,13 @@ def mark_lesson_complete(course_slug, lesson_id):
     Returns:
         Updated lesson progress data
     """
-    try:
-        user = get_current_user()
-        result = ProgressService.mark_lesson_complete(user, course_slug, lesson_id)
-        return success_response(result['data'], "Lesson marked as completed")
-        
-    except ValidationException as e:
-        return error_response(str(e), 404 if "Không tìm thấy" in str(e) else 400)
-    except Exception as e:
-        return error_response("Internal server error")
+    user = get_current_user()
+    result = ProgressService.mark_lesson_complete(user, course_slug, lesson_id)
+    return success_response(result['data'], "Lesson marked as completed")
 
 @course_router.route('/<course_slug>/lessons/<int:lesson_id>/progress', methods=['POST'])
 @jwt_required()
+@course_endpoint
 def track_lesson_progress(course_slug, lesson_id):
     """
     Track lesson progress (watch time and completion percentage)
@@ -322,26 +391,20 @@ def track_lesson_progress(course_slug, lesson_id):
     Returns:
         Updated lesson progress data
     """
-    try:
-        user = get_current_user()
-        
-        # Get request data
-        data = request.get_json() or {}
-        watch_time = data.get('watch_time')
-        completion_percentage = data.get('completion_percentage')
-        
-        # Validate at least one parameter is provided
-        if watch_time is None and completion_percentage is None:
-            return error_response("Either watch_time or completion_percentage must be provided")
-        
-        result = ProgressService.track_lesson_progress(
-            user, course_slug, lesson_id, 
-            watch_time=watch_time, 
-            completion_percentage=completion_percentage
-        )
-        return success_response(result['data'], "Lesson progress updated successfully")
-        
-    except ValidationException as e:
-        return error_response(str(e), 404 if "Không tìm thấy" in str(e) else 400)
-    except Exception as e:
-        return error_response("Internal server error")
\ No newline at end of file
+    user = get_current_user()
+    
+    # Get request data
+    data = request.get_json() or {}
+    watch_time = data.get('watch_time')
+    completion_percentage = data.get('completion_percentage')
+    
+    # Validate at least one parameter is provided
+    if watch_time is None and completion_percentage is None:
+        return error_response("Either watch_time or completion_percentage must be provided")
+    
+    result = ProgressService.track_lesson_progress(
+        user, course_slug, lesson_id, 
+        watch_time=watch_time, 
+        completion_percentage=completion_percentage
+    )
+    return success_response(result['data'], "Lesson progress updated successfully")
\ No newline at end of file
@@ -4,12 +4,18 @@ Implements all enrollment and payment related endpoints
 """
 
 import logging
+
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.services import app_service
 from app.services.enrollment_service import EnrollmentService
 from app.validators.enrollment import EnrollmentValidator
 from app.exceptions.validation_exception import ValidationException
-from app.utils.response import success_response, error_response
+from app.utils.response import (
+    success_response, error_response, prebuilt_response, prebuilt_error_response, ndjson_response
+)
+from app.utils.auth import current_user_id
+from app.utils.errors import api_handler
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -17,304 +23,241 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 enrollment_router = Blueprint('enrollments', __name__)
 
-# Initialize service
-enrollment_service = EnrollmentService()
+# Service instance theo app (lazy, override được trong test)
+enrollment_service = app_service('enrollment_service', EnrollmentService)
+
+_HEALTH_RESPONSE = prebuilt_response({'status': 'Enrollment service is running', 'version': '1.0.0'})
+
+# Giá trị ?stream= bật NDJSON streaming cho my-courses
+_STREAM_FLAGS = frozenset(('1', 'true', 'yes'))
+
+# Body của error handler cố định, serialize sẵn (401 có thể dồn dập khi token hết hạn)
+_NOT_FOUND = prebuilt_error_response('Enrollment not found', 404, error_code='ENROLLMENT_NOT_FOUND')
+_FORBIDDEN = prebuilt_error_response("You don't have permission to access this resource", 403,
+                                     error_code='INSUFFICIENT_PERMISSIONS')
+_UNAUTHORIZED = prebuilt_error_response('Access token is missing or invalid', 401, error_code='AUTH_REQUIRED')
+_ENROLLMENTS_FAILED = prebuilt_error_response('Failed to retrieve enrollments', 500)
+
+
+def enrollment_endpoint(failure_message: str, failure_status: int = 422):
+    """
+    api_handler cho EnrollmentService
+    
+    - ValidationException → failure_status với details = e.errors
+    - Exception khác → log + 500
+    
+    Args:
+        failure_message: Message khi service báo lỗi validate
+        failure_status: HTTP status cho lỗi validate
+    """
+    def validation_failed(e):
+        logger.warning("Enrollment validation error: %s", e.errors)
+        return error_response(failure_message, failure_status, details=e.errors)
+    
+    return api_handler('Internal server error', validation_response=validation_failed,
+                       validation_exception=ValidationException)
 
 
 @enrollment_router.route('/health')
 def health():
     """Health check endpoint"""
-    return {'status': 'Enrollment service is running', 'version': '1.0.0'}
+    return _HEALTH_RESPONSE()
 
 
 
 
 @enrollment_router.route('/register', methods=['POST'])
 @jwt_required()
+@enrollment_endpoint('Validation failed')
 def register_for_course():
     """
     POST /api/enrollments/register
     Initialize the course registration process
     """
-    try:
-        # Get current user
-        user_id = get_jwt_identity()
-        if not user_id:
-            return error_response('Authentication required', 401)
-        
-        # Get request data
-        data = request.get_json()
-        if not data:
-            return error_response('Request body is required', 400)
-        
-        # Validate request data
-        validated_data = EnrollmentValidator.validate_registration_request(data)
-        
-        # Process registration
-        result = enrollment_service.register_for_course(
-            user_id=int(user_id),
-            course_id=validated_data['course_id'],
-            full_name=validated_data['full_name'],
-            email=validated_data['email'],
-            discount_code=validated_data.get('discount_code')
-        )
-        
-        logger.info(f"Course registration successful for user {user_id}")
-        return success_response('Registration started successfully', result)
-        
-    except ValidationException as e:
-        details = getattr(e, "errors", {"error": [str(e)]})
-        logger.warning(f"Validation error in registration: {details}")
-        return error_response('Validation failed', 422, details=details)
-    except Exception as e:
-        logger.error(f"Unexpected error in registration: {str(e)}")
-        return error_response('Internal server error', 500)
+    user_id = current_user_id()
+    
+    # Get request data
+    data = request.get_json()
+    if not data:
+        return error_response('Request body is required', 400)
+    
+    # Validate request data
+    validated_data = EnrollmentValidator.validate_registration_request(data)
+    
+    # Process registration
+    result = enrollment_service.register_for_course(
+        user_id=user_id,
+        course_id=validated_data['course_id'],
+        full_name=validated_data['full_name'],
+        email=validated_data['email'],
+        discount_code=validated_data.get('discount_code')
+    )
+    
+    logger.info("Course registration successful for user %s", user_id)
+    return success_response('Registration started successfully', result)
 
 
 @enrollment_router.route('/payment', methods=['POST'])
 @jwt_required()
+@enrollment_endpoint('Payment failed')
 def process_payment():
     """
     POST /api/enrollments/payment
     Process payment for course enrollment
     """
-    try:
-        # Get current user
-        user_id = get_jwt_identity()
-        if not user_id:
-            return error_response('Authentication required', 401)
-        
-        # Get request data
-        data = request.get_json()
-        if not data:
-            return error_response('Request body is required', 400)
-        
-        # Validate request data
-        validated_data = EnrollmentValidator.validate_payment_request(data)
-        
-        # Process payment
-        result = enrollment_service.process_payment(
-            enrollment_id=validated_data['enrollment_id'],
-            payment_method=validated_data['payment_method'],
-            payment_details=validated_data['payment_details']
-        )
-        
-        logger.info(f"Payment processed successfully for user {user_id}")
-        return success_response('Payment processed successfully', result)
-        
-    except ValidationException as e:
-        details = getattr(e, "errors", {"error": [str(e)]})
-        logger.warning(f"Validation error in payment: {details}")
-        return error_response('Payment failed', 422, details=details)
-    except Exception as e:
-        logger.error(f"Unexpected error in payment: {str(e)}")
-        return error_response('Internal server error', 500)
+    user_id = current_user_id()
+    
+    # Get request data
+    data = request.get_json()
+    if not data:
+        return error_response('Request body is required', 400)
+    
+    # Validate request data
+    validated_data = EnrollmentValidator.validate_payment_request(data)
+    
+    # Process payment
+    result = enrollment_service.process_payment(
+        enrollment_id=validated_data['enrollment_id'],
+        payment_method=validated_data['payment_method'],
+        payment_details=validated_data['payment_details']
+    )
+    
+    logger.info("Payment processed successfully for user %s", user_id)
+    return success_response('Payment processed successfully', result)
 
 
-@enrollment_router.route('/<enrollment_id>/activate', methods=['POST'])
+@enrollment_router.route('/<uuid:enrollment_id>/activate', methods=['POST'])
 @jwt_required()
+@enrollment_endpoint('Activation failed')
 def activate_course_access(enrollment_id):
     """
     POST /api/enrollments/{enrollmentId}/activate
     Activate course access after successful enrollment/payment
     """
-    try:
-        # Get current user
-        user_id = get_jwt_identity()
-        if not user_id:
-            return error_response('Authentication required', 401)
-        
-        # Validate enrollment ID
-        validated_enrollment_id = EnrollmentValidator.validate_enrollment_id(enrollment_id)
-        
-        # Activate course access
-        result = enrollment_service.activate_course_access(validated_enrollment_id)
-        
-        if result['success']:
-            logger.info(f"Course access activated for enrollment {enrollment_id}")
-            return success_response('Course access activated', result)
-        else:
-            logger.info(f"Course activation in progress for enrollment {enrollment_id}")
-            return success_response('Activation in progress', result)
-        
-    except ValidationException as e:
-        details = getattr(e, "errors", {"error": [str(e)]})
-        logger.warning(f"Validation error in activation: {details}")
-        return error_response('Activation failed', 422, details=details)
-    except Exception as e:
-        logger.error(f"Unexpected error in activation: {str(e)}")
-        return error_response('Internal server error', 500)
+    # Activate course access
+    result = enrollment_service.activate_course_access(enrollment_id)
+    
+    if result['success']:
+        logger.info("Course access activated for enrollment %s", enrollment_id)
+        return success_response('Course access activated', result)
+    else:
+        logger.info("Course activation in progress for enrollment %s", enrollment_id)
+        return success_response('Activation in progress', result)
 
 
-@enrollment_router.route('/<enrollment_id>', methods=['GET'])
+@enrollment_router.route('/<uuid:enrollment_id>', methods=['GET'])
 @jwt_required()
+@enrollment_endpoint('Not found', 404)
 def get_enrollment_status(enrollment_id):
     """
     GET /api/enrollments/{enrollmentId}
     Retrieve enrollment status by ID
     """
-    try:
-        # Get current user
-        user_id = get_jwt_identity()
-        if not user_id:
-            return error_response('Authentication required', 401)
-        
-        # Validate enrollment ID
-        validated_enrollment_id = EnrollmentValidator.validate_enrollment_id(enrollment_id)
-        
-        # Get enrollment status
-        result = enrollment_service.get_enrollment_status(validated_enrollment_id)
-        
-        logger.info(f"Enrollment status retrieved for {enrollment_id}")
-        return success_response('Enrollment status retrieved', result)
-        
-    except ValidationException as e:
-        details = getattr(e, "errors", {"error": [str(e)]})
-        logger.warning(f"Validation error getting enrollment status: {details}")
-        return error_response('Not found', 404, details=details)
-    except Exception as e:
-        logger.error(f"Unexpected error getting enrollment status: {str(e)}")
-        return error_response('Internal server error', 500)
+    # Get enrollment status
+    result = enrollment_service.get_enrollment_status(enrollment_id)
+    
+    logger.info("Enrollment status retrieved for %s", enrollment_id)
+    return success_response('Enrollment status retrieved', result)
 
 
 @enrollment_router.route('/my-courses', methods=['GET'])
 @jwt_required()
+@enrollment_endpoint('Validation failed')
 def get_my_courses():
     """
     GET /api/enrollments/my-courses
     Retrieve all course enrollments for the authenticated user
+    
+    Query: status, page, limit; cursor (keyset, '' cho trang đầu) thay cho page;
+    stream=1 trả toàn bộ enrollments dạng NDJSON (application/x-ndjson)
     """
+    user_id = current_user_id()
+    
+    # Get query parameters
+    status_filter = request.args.get('status')
+    page = request.args.get('page', '1')
+    limit = request.args.get('limit', '10')
+    cursor = request.args.get('cursor')
+    
+    # Validate parameters
+    try:
+        if status_filter:
+            status_filter = EnrollmentValidator.validate_status_filter(status_filter)
+        page, limit = EnrollmentValidator.validate_pagination_params(page, limit)
+    except ValidationException as ve:
+        logger.warning("Parameter validation failed: %s", ve.errors)
+        return error_response('Invalid parameters', 400, details=ve.errors)
+    
+    if request.args.get('stream') in _STREAM_FLAGS:
+        return ndjson_response(enrollment_service.iter_user_enrollments(user_id, status_filter))
+    
+    # Get user enrollments
     try:
-        # Get current user
-        user_id = get_jwt_identity()
-        if not user_id:
-            return error_response('Authentication required', 401)
-        
-        # Validate and convert user_id
-        try:
-            user_id = int(user_id)
-        except (ValueError, TypeError) as e:
-            logger.error(f"Invalid user_id from JWT: {user_id}, error: {str(e)}")
-            return error_response('Invalid authentication token', 401)
-        
-        # Get query parameters
-        status_filter = request.args.get('status')
-        page = request.args.get('page', '1')
-        limit = request.args.get('limit', '10')
-        
-        # Validate parameters
-        try:
-            if status_filter:
-                status_filter = EnrollmentValidator.validate_status_filter(status_filter)
-            page, limit = EnrollmentValidator.validate_pagination_params(page, limit)
-        except ValidationException as ve:
-            logger.warning(f"Parameter validation failed: {ve.errors}")
-            return error_response('Invalid parameters', 400, details=ve.errors)
-        
-        # Get user enrollments
-        try:
-            result = enrollment_service.get_user_enrollments(
-                user_id=user_id,
-                status_filter=status_filter,
-                page=page,
-                limit=limit
-            )
-        except ValidationException as ve:
-            logger.warning(f"Service validation error: {ve.errors}")
-            return error_response('Failed to retrieve enrollments', 422, details=ve.errors)
-        except Exception as e:
-            logger.error(f"Service error getting user enrollments: {str(e)}", exc_info=True)
-            return error_response('Failed to retrieve enrollments', 500)
-        
-        # Return response with proper format
-        response_data = {
-            'enrollments': result['data'],
-            'pagination': result.get('pagination')
-        }
-        
-        logger.info(f"User enrollments retrieved successfully for user {user_id}")
-        return success_response(response_data, 'User enrollments retrieved')
-        
-    except ValidationException as e:
-        details = getattr(e, "errors", {"error": [str(e)]})
-        logger.warning(f"Validation error getting user enrollments: {details}")
-        return error_response('Validation failed', 422, details=details)
+        result = enrollment_service.get_user_enrollments(
+            user_id=user_id,
+            status_filter=status_filter,
+            page=page,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValidationException as ve:
+        logger.warning("Service validation error: %s", ve.errors)
+        return error_response('Failed to retrieve enrollments', 422, details=ve.errors)
     except Exception as e:
-        logger.error(f"Unexpected error getting user enrollments: {str(e)}", exc_info=True)
-        return error_response('Internal server error', 500)
+        logger.error("Service error getting user enrollments: %s", e, exc_info=True)
+        return _ENROLLMENTS_FAILED()
+    
+    # Return response with proper format
+    response_data = {
+        'enrollments': result['data'],
+        'pagination': result.get('pagination')
+    }
+    
+    logger.info("User enrollments retrieved successfully for user %s", user_id)
+    return success_response(response_data, 'User enrollments retrieved')
 
 
-@enrollment_router.route('/check-access/<course_id>', methods=['GET'])
+@enrollment_router.route('/check-access/<int:course_id>', methods=['GET'])
 @jwt_required()
+@enrollment_endpoint('Validation failed')
 def check_course_access(course_id):
     """
     GET /api/enrollments/check-access/{courseId}
     Check if the authenticated user has access to a specific course
     """
-    try:
-        # Get current user
-        user_id = get_jwt_identity()
-        if not user_id:
-            return error_response('Authentication required', 401)
-        
-        # Validate course ID
-        validated_course_id = EnrollmentValidator.validate_course_id(course_id)
-        
-        # Check course access
-        result = enrollment_service.check_course_access(
-            user_id=int(user_id),
-            course_id=validated_course_id
-        )
-        
-        if result['hasAccess']:
-            logger.info(f"Course access confirmed for user {user_id}, course {course_id}")
-            return success_response('Course access checked', result)
-        else:
-            logger.info(f"Course access denied for user {user_id}, course {course_id}")
-            return success_response('No access to course', result)
-        
-    except ValidationException as e:
-        details = getattr(e, "errors", {"error": [str(e)]})
-        logger.warning(f"Validation error checking course access: {details}")
-        return error_response('Validation failed', 422, details=details)
-    except Exception as e:
-        logger.error(f"Unexpected error checking course access: {str(e)}")
-        return error_response('Internal server error', 500)
+    user_id = current_user_id()
+    
+    # Check course access
+    result = enrollment_service.check_course_access(
+        user_id=user_id,
+        course_id=course_id
+    )
+    
+    if result['hasAccess']:
+        logger.info("Course access confirmed for user %s, course %s", user_id, course_id)
+        return success_response('Course access checked', result)
+    else:
+        logger.info("Course access denied for user %s, course %s", user_id, course_id)
+        return success_response('No access to course', result)
 
 
-@enrollment_router.route('/<enrollment_id>/retry-activation', methods=['POST'])
+@enrollment_router.route('/<uuid:enrollment_id>/retry-activation', methods=['POST'])
 @jwt_required()
+@enrollment_endpoint('Retry failed')
 def retry_activation(enrollment_id):
     """
     POST /api/enrollments/{enrollmentId}/retry-activation
     Retry course activation when the initial process failed
     """
-    try:
-        # Get current user
-        user_id = get_jwt_identity()
-        if not user_id:
-            return error_response('Authentication required', 401)
-        
-        # Validate enrollment ID
-        validated_enrollment_id = EnrollmentValidator.validate_enrollment_id(enrollment_id)
-        
-        # Retry activation
-        result = enrollment_service.retry_activation(validated_enrollment_id)
-        
-        if result['success']:
-            logger.info(f"Retry activation completed for enrollment {enrollment_id}")
-            return success_response('Retry activation completed', result)
-        else:
-            logger.info(f"Retry activation failed for enrollment {enrollment_id}")
-            return success_response('Retry activation failed', result)
-        
-    except ValidationException as e:
-        details = getattr(e, "errors", {"error": [str(e)]})
-        logger.warning(f"Validation error in retry activation: {details}")
-        return error_response('Retry failed', 422, details=details)
-    except Exception as e:
-        logger.error(f"Unexpected error in retry activation: {str(e)}")
-        return error_response('Internal server error', 500)
+    # Retry activation
+    result = enrollment_service.retry_activation(enrollment_id)
+    
+    if result['success']:
+        logger.info("Retry activation completed for enrollment %s", enrollment_id)
+        return success_response('Retry activation completed', result)
+    else:
+        logger.info("Retry activation failed for enrollment %s", enrollment_id)
+        return success_response('Retry activation failed', result)
 
 
 # Error handlers
@@ -328,18 +271,16 @@ def handle_validation_error(error):
 @enrollment_router.errorhandler(404)
 def handle_not_found(error):
     """Handle 404 errors"""
-    return error_response('Enrollment not found', 404, error_code='ENROLLMENT_NOT_FOUND')
+    return _NOT_FOUND()
 
 
 @enrollment_router.errorhandler(403)
 def handle_forbidden(error):
     """Handle 403 errors"""
-    return error_response("You don't have permission to access this resource", 403, 
-                         error_code='INSUFFICIENT_PERMISSIONS')
+    return _FORBIDDEN()
 
 
 @enrollment_router.errorhandler(401)
 def handle_unauthorized(error):
     """Handle 401 errors"""
-    return error_response('Access token is missing or invalid', 401, 
-                         error_code='AUTH_REQUIRED')
+    return _UNAUTHORIZED()
@@ -3,600 +3,557 @@ Instructor Router
 API endpoints for instructor course management
 """
 
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-
-from app.services.instructor_service import InstructorService
-from app.utils.response import success_response, error_response, validation_error_response, created_response
-from app.utils.auth import instructor_required
-from app.exceptions.base import ValidationException, AuthenticationException, BusinessLogicException
+from typing import List, Literal, Optional
+
+from flask import Blueprint, request
+
+from app.services.instructor_service import InstructorService, COURSE_ORDERINGS
+from app.utils.response import (
+    error_response, validation_error_response, body_required_response, etag_response, make_responder,
+    prebuilt_error_response
+)
+from app.utils.auth import current_user_id, instructor_required
+from app.utils.auth_cache import cached_jwt_required
+from app.utils.pagination import ListParams
+from app.utils.request import fast_json, load_json_model
+from app.utils.errors import api_handler
 from app.validators.course import CourseCreateSchema, CourseUpdateSchema
-from marshmallow import Schema, fields, validate, ValidationError
+from marshmallow import ValidationError
+from pydantic import BaseModel, ConfigDict, Field
 
 instructor_router = Blueprint('instructor', __name__)
 
+# Giá trị status filter hợp lệ của danh sách course
+_COURSE_STATUS_FILTERS = frozenset(('draft', 'published', 'all'))
+
+# Giới hạn độ dài nội dung lesson (content_data)
+LESSON_CONTENT_MAX_LENGTH = 10000
+
+# Số lesson tối đa trong một request tạo hàng loạt
+LESSON_BATCH_MAX_SIZE = 100
+
+# Giới hạn body (bytes) theo Content-Length. content_data 10k ký tự có thể
+# thành ~60KB khi JSON escape \uXXXX, cộng các field còn lại.
+MAX_BODY_SIZE = 80 * 1024
+MAX_BATCH_BODY_SIZE = LESSON_BATCH_MAX_SIZE * MAX_BODY_SIZE
+
+
+# Inline validation models for modules and lessons (pydantic v2: parse + validate
+# raw JSON body trong một lượt). Field của model Update mặc định None nhưng chỉ
+# field client gửi được dùng (exclude_unset); null tường minh vẫn bị từ chối.
+LessonContentType = Literal['video', 'text', 'document', 'quiz', 'assignment']
 
-# Inline validation schemas for modules and lessons
-class ModuleCreateSchema(Schema):
-    """Marshmallow schema for module creation"""
+
+class ModuleCreateModel(BaseModel):
+    """Request body for module creation"""
+    model_config = ConfigDict(extra='forbid')
     
-    title = fields.Str(required=True, validate=validate.Length(min=1, max=255))
-    description = fields.Str(load_default=None, validate=validate.Length(max=1000))
-    order = fields.Int(load_default=1, validate=validate.Range(min=1))
+    title: str = Field(min_length=1, max_length=255)
+    description: Optional[str] = Field(default=None, max_length=1000)
+    order: int = Field(default=1, ge=1)
 
 
-class ModuleUpdateSchema(Schema):
-    """Marshmallow schema for module updates"""
+class ModuleUpdateModel(BaseModel):
+    """Request body for module updates"""
+    model_config = ConfigDict(extra='forbid')
     
-    title = fields.Str(validate=validate.Length(min=1, max=255))
-    description = fields.Str(validate=validate.Length(max=1000))
-    order = fields.Int(validate=validate.Range(min=1))
+    title: str = Field(default=None, min_length=1, max_length=255)
+    description: str = Field(default=None, max_length=1000)
+    order: int = Field(default=None, ge=1)
 
 
-class LessonCreateSchema(Schema):
-    """Marshmallow schema for lesson creation"""
+class LessonCreateModel(BaseModel):
+    """Request body for lesson creation"""
+    model_config = ConfigDict(extra='forbid')
     
-    title = fields.Str(required=True, validate=validate.Length(min=1, max=255))
-    description = fields.Str(load_default=None, validate=validate.Length(max=1000))
-    content_type = fields.Str(required=True, validate=validate.OneOf(['video', 'text', 'document', 'quiz', 'assignment']))
-    duration_minutes = fields.Int(load_default=0, validate=validate.Range(min=0, max=10080))  # Max 1 week
-    order = fields.Int(load_default=1, validate=validate.Range(min=1))
-    is_preview = fields.Bool(load_default=False)
-    is_published = fields.Bool(load_default=False)
+    title: str = Field(min_length=1, max_length=255)
+    description: Optional[str] = Field(default=None, max_length=1000)
+    content_type: LessonContentType
+    duration_minutes: int = Field(default=0, ge=0, le=10080)  # Max 1 week
+    order: int = Field(default=1, ge=1)
+    is_preview: bool = False
+    is_published: bool = False
     
     # Content data - will be saved to Content table
-    video_url = fields.Str(load_default=None, validate=validate.Length(max=500))
-    content_data = fields.Str(load_default=None, validate=validate.Length(max=10000))
+    video_url: Optional[str] = Field(default=None, max_length=500)
+    content_data: Optional[str] = Field(default=None, max_length=LESSON_CONTENT_MAX_LENGTH)
 
 
-class LessonUpdateSchema(Schema):
-    """Marshmallow schema for lesson updates"""
+class LessonUpdateModel(BaseModel):
+    """Request body for lesson updates"""
+    model_config = ConfigDict(extra='forbid')
     
-    title = fields.Str(validate=validate.Length(min=1, max=255))
-    description = fields.Str(validate=validate.Length(max=1000))
-    content_type = fields.Str(validate=validate.OneOf(['video', 'text', 'document', 'quiz', 'assignment']))
-    duration_minutes = fields.Int(validate=validate.Range(min=0, max=10080))
-    order = fields.Int(validate=validate.Range(min=1))
-    is_preview = fields.Bool()
-    is_published = fields.Bool()
+    title: str = Field(default=None, min_length=1, max_length=255)
+    description: str = Field(default=None, max_length=1000)
+    content_type: LessonContentType = None
+    duration_minutes: int = Field(default=None, ge=0, le=10080)
+    order: int = Field(default=None, ge=1)
+    is_preview: bool = None
+    is_published: bool = None
     
     # Content data - will be saved to Content table
-    video_url = fields.Str(validate=validate.Length(max=500))
-    content_data = fields.Str(validate=validate.Length(max=10000))
+    video_url: str = Field(default=None, max_length=500)
+    content_data: str = Field(default=None, max_length=LESSON_CONTENT_MAX_LENGTH)
+
+
+class LessonBatchCreateModel(BaseModel):
+    """Request body for batch lesson creation"""
+    model_config = ConfigDict(extra='forbid')
+    
+    lessons: List[LessonCreateModel] = Field(min_length=1, max_length=LESSON_BATCH_MAX_SIZE)
+
+
+# Schema instances dùng chung (stateless khi load)
+_COURSE_CREATE_SCHEMA = CourseCreateSchema()
+_COURSE_UPDATE_SCHEMA = CourseUpdateSchema()
+
+# Success responder theo route, message serialize sẵn
+_COURSE_CREATED = make_responder('Course created successfully', 201)
+_COURSE_UPDATED = make_responder('Course updated successfully')
+_COURSE_PUBLISHED = make_responder('Course published successfully')
+_COURSE_UNPUBLISHED = make_responder('Course unpublished successfully')
+_COURSE_DELETED = make_responder('Course deleted successfully')
+_MODULE_CREATED = make_responder('Module created successfully', 201)
+_MODULE_UPDATED = make_responder('Module updated successfully')
+_MODULE_DELETED = make_responder('Module deleted successfully')
+_LESSON_CREATED = make_responder('Lesson created successfully', 201)
+_LESSONS_CREATED = make_responder('Lessons created successfully', 201)
+_LESSON_UPDATED = make_responder('Lesson updated successfully')
+_LESSON_DELETED = make_responder('Lesson deleted successfully')
+
+_TOO_LARGE = prebuilt_error_response('Request entity too large', 413)
+
+
+@instructor_router.before_request
+def _reject_oversized_body():
+    """Từ chối body quá lớn trước khi đọc / parse (và trước cả verify JWT)"""
+    limit = MAX_BATCH_BODY_SIZE if request.endpoint == 'instructor.create_lessons_batch' else MAX_BODY_SIZE
+    if (request.content_length or 0) > limit:
+        return _TOO_LARGE()
+
+
+# ValidationException → response, theo từng nhóm endpoint (dùng với api_handler)
+def _bad_request(e):
+    return error_response(e.message, 400)
+
+
+def _not_found(e):
+    return error_response(e.message, 404)
+
+
+def _validation_failed(e):
+    return validation_error_response('Validation failed', e.details)
+
+
+# ETag cho GET: mọi thay đổi qua PUT/POST/DELETE đều bump updated_at của row.
+# stats (enrollments, lessons) có thể đổi mà không bump updated_at nên cũng đưa vào.
+# max_age=0: client luôn revalidate, chỉ nhận 304 khi không có gì thay đổi.
+def _rows_etag_seed(rows):
+    return tuple((row['id'], row['updated_at'], str(row.get('stats'))) for row in rows)
 
 
 @instructor_router.route('/courses', methods=['GET'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to retrieve courses', business_status=403, validation_response=_bad_request)
 def get_instructor_courses():
     """
     Get instructor's courses with pagination and filtering
     
     Query Parameters:
-    - page: Page number (default: 1)
+    - cursor: Cursor từ pagination.next_cursor; truyền rỗng (?cursor=) cho trang đầu
+    - page: Page number (default: 1), deprecated, dùng cursor thay thế
     - per_page: Items per page (default: 10)
     - status: "draft" | "published" | "all" (default: "all")
     - sort_by: "created_at" | "updated_at" | "title" (default: "updated_at")
     - sort_order: "asc" | "desc" (default: "desc")
     """
+    instructor_id = current_user_id()
+    
     try:
-        instructor_id = int(get_jwt_identity())
-        
         # Get query parameters
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 10)), 50)
+        params = ListParams.from_args(request.args, per_page=10, sort_by='updated_at')
         status = request.args.get('status', 'all')
-        sort_by = request.args.get('sort_by', 'updated_at')
-        sort_order = request.args.get('sort_order', 'desc')
         
         # Validate parameters
-        if status not in ['draft', 'published', 'all']:
+        if status not in _COURSE_STATUS_FILTERS:
             status = 'all'
-        if sort_by not in ['created_at', 'updated_at', 'title']:
-            sort_by = 'updated_at'
-        if sort_order not in ['asc', 'desc']:
-            sort_order = 'desc'
-            
+        # sort_by/sort_order ngoài allowlist (COURSE_ORDERINGS) rơi về updated_at / desc
+        sort_by = params.sort_by if (params.sort_by, 'desc') in COURSE_ORDERINGS else 'updated_at'
+        sort_order = params.sort_order if params.sort_order in ('asc', 'desc') else 'desc'
+        
         # Get courses from service
         result = InstructorService.get_instructor_courses(
             instructor_id=instructor_id,
-            page=page,
-            per_page=per_page,
+            page=params.page,
+            per_page=params.per_page,
             status=status,
             sort_by=sort_by,
-            sort_order=sort_order
-        )
-        
-        return success_response(
-            message='Courses retrieved successfully',
-            data=result
+            sort_order=sort_order,
+            cursor=params.cursor
         )
-        
-    except ValidationException as e:
-        return error_response(e.message, 400)
-    except Exception as e:
-        return error_response('Failed to retrieve courses', 500)
+    except ValueError:
+        # page/per_page không phải số hoặc cursor không hợp lệ
+        return validation_error_response('Invalid pagination parameters', field='pagination')
+    
+    # Query string (status/sort/page/cursor) + pagination + từng row
+    etag_seed = (
+        request.query_string,
+        str(result['pagination']),
+        _rows_etag_seed(result['courses'])
+    )
+    response = etag_response(result, 'Courses retrieved successfully', etag_seed, max_age=0)
+    # Phân trang theo page (OFFSET) vẫn hỗ trợ nhưng không khuyến khích
+    if params.cursor is None and 'page' in request.args:
+        response.headers['Deprecation'] = 'true'
+    return response
 
 
 @instructor_router.route('/courses', methods=['POST'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to create course', business_status=403, validation_response=_validation_failed)
 def create_course():
     """
     Create new course for instructor
     """
+    instructor_id = current_user_id()
+    
+    # Parse JSON body bằng orjson (body rỗng / JSON lỗi → None)
+    data = fast_json()
+    if not data:
+        return body_required_response()
+    
+    # Validate input using schema
     try:
-        instructor_id = int(get_jwt_identity())
-        
-        # Get JSON data
-        data = request.get_json()
-        if not data:
-            return validation_error_response('No data provided', {'general': ['Request body is required']})
-        
-        # Validate input using schema
-        schema = CourseCreateSchema()
-        try:
-            validated_data = schema.load(data)
-        except ValidationError as err:
-            return validation_error_response('Validation failed', err.messages)
-        
-        # Create course using service
-        course = InstructorService.create_course(
-            instructor_id=instructor_id,
-            **validated_data
-        )
-        
-        return created_response(
-            message='Course created successfully',
-            data=course
-        )
-        
-    except ValidationException as e:
-        return validation_error_response('Validation failed', e.details if hasattr(e, 'details') else {'general': [e.message]})
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to create course', 500)
+        validated_data = _COURSE_CREATE_SCHEMA.load(data)
+    except ValidationError as err:
+        return validation_error_response('Validation failed', err.messages)
+    
+    # Create course using service
+    course = InstructorService.create_course(
+        instructor_id=instructor_id,
+        **validated_data
+    )
+    
+    return _COURSE_CREATED(course)
 
 
 @instructor_router.route('/courses/<int:course_id>', methods=['GET'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to retrieve course', business_status=403, validation_response=_not_found)
 def get_course_details(course_id):
     """
     Get single course details for instructor
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        course = InstructorService.get_instructor_course_details(
-            instructor_id=instructor_id,
-            course_id=course_id
-        )
-        
-        return success_response(
-            message='Course retrieved successfully',
-            data=course
-        )
-        
-    except ValidationException as e:
-        return error_response(e.message, 404)
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to retrieve course', 500)
+    instructor_id = current_user_id()
+    
+    course = InstructorService.get_instructor_course_details(
+        instructor_id=instructor_id,
+        course_id=course_id
+    )
+    
+    return etag_response(
+        course, 'Course retrieved successfully', _rows_etag_seed((course,)), max_age=0
+    )
 
 
 @instructor_router.route('/courses/<int:course_id>', methods=['PUT'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to update course', business_status=403, validation_response=_validation_failed)
 def update_course(course_id):
     """
     Update course for instructor
     """
+    instructor_id = current_user_id()
+    
+    # Parse JSON body bằng orjson (body rỗng / JSON lỗi → None)
+    data = fast_json()
+    if not data:
+        return body_required_response()
+    
+    # Validate input using schema
     try:
-        instructor_id = int(get_jwt_identity())
-        
-        # Get JSON data
-        data = request.get_json()
-        if not data:
-            return validation_error_response('No data provided', {'general': ['Request body is required']})
-        
-        # Validate input using schema
-        schema = CourseUpdateSchema()
-        try:
-            validated_data = schema.load(data)
-        except ValidationError as err:
-            return validation_error_response('Validation failed', err.messages)
-        
-        # Update course using service
-        course = InstructorService.update_course(
-            instructor_id=instructor_id,
-            course_id=course_id,
-            **validated_data
-        )
-        
-        return success_response(
-            message='Course updated successfully',
-            data=course
-        )
-        
-    except ValidationException as e:
-        return validation_error_response('Validation failed', e.details if hasattr(e, 'details') else {'general': [e.message]})
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to update course', 500)
+        validated_data = _COURSE_UPDATE_SCHEMA.load(data)
+    except ValidationError as err:
+        return validation_error_response('Validation failed', err.messages)
+    
+    # Update course using service
+    course = InstructorService.update_course(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        **validated_data
+    )
+    
+    return _COURSE_UPDATED(course)
 
 
 @instructor_router.route('/courses/<int:course_id>/publish', methods=['POST'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to publish course', business_status=403, validation_response=_not_found)
 def publish_course(course_id):
     """
     Publish course
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        result = InstructorService.publish_course(
-            instructor_id=instructor_id,
-            course_id=course_id
-        )
-        
-        return success_response(
-            message='Course published successfully',
-            data=result
-        )
-        
-    except ValidationException as e:
-        return error_response(e.message, 404)
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to publish course', 500)
+    instructor_id = current_user_id()
+    
+    result = InstructorService.publish_course(
+        instructor_id=instructor_id,
+        course_id=course_id
+    )
+    
+    return _COURSE_PUBLISHED(result)
 
 
 @instructor_router.route('/courses/<int:course_id>/unpublish', methods=['POST'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to unpublish course', business_status=403, validation_response=_not_found)
 def unpublish_course(course_id):
     """
     Unpublish course
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        result = InstructorService.unpublish_course(
-            instructor_id=instructor_id,
-            course_id=course_id
-        )
-        
-        return success_response(
-            message='Course unpublished successfully',
-            data=result
-        )
-        
-    except ValidationException as e:
-        return error_response(e.message, 404)
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to unpublish course', 500)
+    instructor_id = current_user_id()
+    
+    result = InstructorService.unpublish_course(
+        instructor_id=instructor_id,
+        course_id=course_id
+    )
+    
+    return _COURSE_UNPUBLISHED(result)
 
 
 @instructor_router.route('/courses/<int:course_id>', methods=['DELETE'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to delete course', business_status=403, validation_response=_not_found)
 def delete_course(course_id):
     """
     Delete course (optional endpoint)
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        InstructorService.delete_course(
-            instructor_id=instructor_id,
-            course_id=course_id
-        )
-        
-        return success_response(
-            message='Course deleted successfully'
-        )
-        
-    except ValidationException as e:
-        return error_response(e.message, 404)
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to delete course', 500)
+    instructor_id = current_user_id()
+    
+    InstructorService.delete_course(
+        instructor_id=instructor_id,
+        course_id=course_id
+    )
+    
+    return _COURSE_DELETED()
 
 
 # Module Management Endpoints
 
 @instructor_router.route('/courses/<int:course_id>/modules', methods=['GET'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to retrieve modules', business_status=403, validation_response=_not_found)
 def get_course_modules(course_id):
     """
     Get all modules for a specific course
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        modules = InstructorService.get_course_modules(
-            instructor_id=instructor_id,
-            course_id=course_id
-        )
-        
-        return success_response(
-            message='Modules retrieved successfully',
-            data=modules
-        )
-        
-    except ValidationException as e:
-        return error_response(e.message, 404)
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to retrieve modules', 500)
+    instructor_id = current_user_id()
+    
+    modules = InstructorService.get_course_modules(
+        instructor_id=instructor_id,
+        course_id=course_id
+    )
+    
+    return etag_response(
+        modules, 'Modules retrieved successfully', _rows_etag_seed(modules), max_age=0
+    )
 
 
 @instructor_router.route('/courses/<int:course_id>/modules', methods=['POST'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to create module', business_status=403, validation_response=_validation_failed)
 def create_module(course_id):
     """
     Create a new module for a course
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        # Get JSON data
-        data = request.get_json()
-        if not data:
-            return validation_error_response('No data provided', {'general': ['Request body is required']})
-        
-        # Validate input using schema
-        schema = ModuleCreateSchema()
-        try:
-            validated_data = schema.load(data)
-        except ValidationError as err:
-            return validation_error_response('Validation failed', err.messages)
-        
-        # Create module using service
-        module = InstructorService.create_module(
-            instructor_id=instructor_id,
-            course_id=course_id,
-            **validated_data
-        )
-        
-        return created_response(
-            message='Module created successfully',
-            data=module
-        )
-        
-    except ValidationException as e:
-        return validation_error_response('Validation failed', e.details if hasattr(e, 'details') else {'general': [e.message]})
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to create module', 500)
+    instructor_id = current_user_id()
+    
+    # Parse + validate JSON body
+    validated_data, error = load_json_model(ModuleCreateModel)
+    if error:
+        return error
+    
+    # Create module using service
+    module = InstructorService.create_module(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        **validated_data
+    )
+    
+    return _MODULE_CREATED(module)
 
 
 @instructor_router.route('/courses/<int:course_id>/modules/<int:module_id>', methods=['PUT'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to update module', business_status=403, validation_response=_validation_failed)
 def update_module(course_id, module_id):
     """
     Update a module
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        # Get JSON data
-        data = request.get_json()
-        if not data:
-            return validation_error_response('No data provided', {'general': ['Request body is required']})
-        
-        # Validate input using schema
-        schema = ModuleUpdateSchema()
-        try:
-            validated_data = schema.load(data)
-        except ValidationError as err:
-            return validation_error_response('Validation failed', err.messages)
-        
-        # Update module using service
-        module = InstructorService.update_module(
-            instructor_id=instructor_id,
-            course_id=course_id,
-            module_id=module_id,
-            **validated_data
-        )
-        
-        return success_response(
-            message='Module updated successfully',
-            data=module
-        )
-        
-    except ValidationException as e:
-        return validation_error_response('Validation failed', e.details if hasattr(e, 'details') else {'general': [e.message]})
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to update module', 500)
+    instructor_id = current_user_id()
+    
+    # Parse + validate JSON body
+    validated_data, error = load_json_model(ModuleUpdateModel, exclude_unset=True)
+    if error:
+        return error
+    
+    # Update module using service
+    module = InstructorService.update_module(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        module_id=module_id,
+        **validated_data
+    )
+    
+    return _MODULE_UPDATED(module)
 
 
 @instructor_router.route('/courses/<int:course_id>/modules/<int:module_id>', methods=['DELETE'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to delete module', business_status=403, validation_response=_not_found)
 def delete_module(course_id, module_id):
     """
     Delete a module
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        InstructorService.delete_module(
-            instructor_id=instructor_id,
-            course_id=course_id,
-            module_id=module_id
-        )
-        
-        return success_response(
-            message='Module deleted successfully'
-        )
-        
-    except ValidationException as e:
-        return error_response(e.message, 404)
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to delete module', 500)
+    instructor_id = current_user_id()
+    
+    InstructorService.delete_module(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        module_id=module_id
+    )
+    
+    return _MODULE_DELETED()
 
 
 # Lesson Management Endpoints
 
 @instructor_router.route('/courses/<int:course_id>/modules/<int:module_id>/lessons', methods=['GET'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to retrieve lessons', business_status=403, validation_response=_not_found)
 def get_module_lessons(course_id, module_id):
     """
     Get all lessons for a specific module
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        lessons = InstructorService.get_module_lessons(
-            instructor_id=instructor_id,
-            course_id=course_id,
-            module_id=module_id
-        )
-        
-        return success_response(
-            message='Lessons retrieved successfully',
-            data=lessons
-        )
-        
-    except ValidationException as e:
-        return error_response(e.message, 404)
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to retrieve lessons', 500)
+    instructor_id = current_user_id()
+    
+    lessons = InstructorService.get_module_lessons(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        module_id=module_id
+    )
+    
+    return etag_response(
+        lessons, 'Lessons retrieved successfully', _rows_etag_seed(lessons), max_age=0
+    )
 
 
 @instructor_router.route('/courses/<int:course_id>/modules/<int:module_id>/lessons', methods=['POST'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to create lesson', business_status=403, validation_response=_validation_failed)
 def create_lesson(course_id, module_id):
     """
     Create a new lesson for a module
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        # Get JSON data
-        data = request.get_json()
-        if not data:
-            return validation_error_response('No data provided', {'general': ['Request body is required']})
-        
-        # Validate input using schema
-        schema = LessonCreateSchema()
-        try:
-            validated_data = schema.load(data)
-        except ValidationError as err:
-            return validation_error_response('Validation failed', err.messages)
-        
-        # Create lesson using service
-        lesson = InstructorService.create_lesson(
-            instructor_id=instructor_id,
-            course_id=course_id,
-            module_id=module_id,
-            **validated_data
-        )
-        
-        return created_response(
-            message='Lesson created successfully',
-            data=lesson
-        )
-        
-    except ValidationException as e:
-        return validation_error_response('Validation failed', e.details if hasattr(e, 'details') else {'general': [e.message]})
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to create lesson', 500)
+    instructor_id = current_user_id()
+    
+    # Parse + validate JSON body
+    validated_data, error = load_json_model(LessonCreateModel)
+    if error:
+        return error
+    
+    # Create lesson using service
+    lesson = InstructorService.create_lesson(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        module_id=module_id,
+        **validated_data
+    )
+    
+    return _LESSON_CREATED(lesson)
+
+
+@instructor_router.route('/courses/<int:course_id>/modules/<int:module_id>/lessons:batch', methods=['POST'])
+@cached_jwt_required
+@instructor_required
+@api_handler('Failed to create lessons', business_status=403, validation_response=_validation_failed)
+def create_lessons_batch(course_id, module_id):
+    """
+    Create many lessons for a module in one request
+    
+    Body: {"lessons": [<lesson>, ...]} (mỗi lesson giống body của create_lesson)
+    """
+    instructor_id = current_user_id()
+    
+    # Parse + validate cả mảng trong một lượt; lesson không gửi order được xếp tiếp theo
+    validated_data, error = load_json_model(LessonBatchCreateModel, exclude_unset=True)
+    if error:
+        return error
+    
+    result = InstructorService.create_lessons_batch(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        module_id=module_id,
+        lessons=validated_data['lessons']
+    )
+    
+    return _LESSONS_CREATED(result)
 
 
 @instructor_router.route('/courses/<int:course_id>/modules/<int:module_id>/lessons/<int:lesson_id>', methods=['PUT'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to update lesson', business_status=403, validation_response=_validation_failed)
 def update_lesson(course_id, module_id, lesson_id):
     """
     Update a lesson
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        # Get JSON data
-        data = request.get_json()
-        if not data:
-            return validation_error_response('No data provided', {'general': ['Request body is required']})
-        
-        # Validate input using schema
-        schema = LessonUpdateSchema()
-        try:
-            validated_data = schema.load(data)
-        except ValidationError as err:
-            return validation_error_response('Validation failed', err.messages)
-        
-        # Update lesson using service
-        lesson = InstructorService.update_lesson(
-            instructor_id=instructor_id,
-            course_id=course_id,
-            module_id=module_id,
-            lesson_id=lesson_id,
-            **validated_data
-        )
-        
-        return success_response(
-            message='Lesson updated successfully',
-            data=lesson
-        )
-        
-    except ValidationException as e:
-        return validation_error_response('Validation failed', e.details if hasattr(e, 'details') else {'general': [e.message]})
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to update lesson', 500)
+    instructor_id = current_user_id()
+    
+    # Parse + validate JSON body
+    validated_data, error = load_json_model(LessonUpdateModel, exclude_unset=True)
+    if error:
+        return error
+    
+    # Update lesson using service
+    lesson = InstructorService.update_lesson(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        module_id=module_id,
+        lesson_id=lesson_id,
+        **validated_data
+    )
+    
+    return _LESSON_UPDATED(lesson)
 
 
 @instructor_router.route('/courses/<int:course_id>/modules/<int:module_id>/lessons/<int:lesson_id>', methods=['DELETE'])
-@jwt_required()
+@cached_jwt_required
 @instructor_required
+@api_handler('Failed to delete lesson', business_status=403, validation_response=_not_found)
 def delete_lesson(course_id, module_id, lesson_id):
     """
     Delete a lesson
     """
-    try:
-        instructor_id = int(get_jwt_identity())
-        
-        InstructorService.delete_lesson(
-            instructor_id=instructor_id,
-            course_id=course_id,
-            module_id=module_id,
-            lesson_id=lesson_id
-        )
-        
-        return success_response(
-            message='Lesson deleted successfully'
-        )
-        
-    except ValidationException as e:
-        return error_response(e.message, 404)
-    except BusinessLogicException as e:
-        return error_response(e.message, 403)
-    except Exception as e:
-        return error_response('Failed to delete lesson', 500)
+    instructor_id = current_user_id()
+    
+    InstructorService.delete_lesson(
+        instructor_id=instructor_id,
+        course_id=course_id,
+        module_id=module_id,
+        lesson_id=lesson_id
+    )
+    
+    return _LESSON_DELETED()
@@ -4,9 +4,12 @@ Will be implemented in Sprint 3: Enrollment & Payment
 """
 
 from flask import Blueprint
+from app.utils.response import prebuilt_response
 
 payment_router = Blueprint('payments', __name__)
 
+_HEALTH_RESPONSE = prebuilt_response({'status': 'Payments blueprint ready for Sprint 3'})
+
 @payment_router.route('/health')
 def health():
-    return {'status': 'Payments blueprint ready for Sprint 3'}
+    return _HEALTH_RESPONSE()
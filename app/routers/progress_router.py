@@ -4,9 +4,12 @@ Will be implemented in Sprint 4: Progress Tracking
 """
 
 from flask import Blueprint
+from app.utils.response import prebuilt_response
 
 progress_router = Blueprint('progress', __name__)
 
+_HEALTH_RESPONSE = prebuilt_response({'status': 'Progress blueprint ready for Sprint 4'})
+
 @progress_router.route('/health')
 def health():
-    return {'status': 'Progress blueprint ready for Sprint 4'}
+    return _HEALTH_RESPONSE()
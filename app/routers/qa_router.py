@@ -4,9 +4,12 @@ Will be implemented in Sprint 6: Q&A System
 """
 
 from flask import Blueprint
+from app.utils.response import prebuilt_response
 
 qa_router = Blueprint('qa', __name__)
 
+_HEALTH_RESPONSE = prebuilt_response({'status': 'Q&A blueprint ready for Sprint 6'})
+
 @qa_router.route('/health')
 def health():
-    return {'status': 'Q&A blueprint ready for Sprint 6'}
+    return _HEALTH_RESPONSE()
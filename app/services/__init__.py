@@ -1,4 +1,35 @@
 """
 Services package
 Chứa business logic và các service classes
-"""
\ No newline at end of file
+"""
+
+from typing import Callable, TypeVar
+
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+T = TypeVar('T')
+
+
+def app_service(name: str, factory: Callable[[], T]) -> T:
+    """
+    Service instance gắn với Flask app hiện tại (lưu trong app.extensions)
+    
+    Instance được tạo lazy ở lần dùng đầu tiên trong mỗi app/worker thay vì
+    lúc import module, và test có thể override qua app.extensions[name].
+    
+    Args:
+        name: Key trong app.extensions
+        factory: Callable tạo service instance
+        
+    Returns:
+        LocalProxy trỏ tới service instance của app hiện tại
+    """
+    def _get_service():
+        extensions = current_app.extensions
+        service = extensions.get(name)
+        if service is None:
+            service = extensions[name] = factory()
+        return service
+    
+    return LocalProxy(_get_service)
@@ -14,6 +14,7 @@ from werkzeug.security import check_password_hash
 
 from app import db
 from app.models.user import User, UserRole
+from app.services.user_service import invalidate_cached_user
 from app.exceptions.base import (
     ValidationException, 
     AuthenticationException, 
@@ -46,7 +47,7 @@ class AuthService:
         """
         try:
             # Check if email already exists
-            existing_user = User.query.filter_by(email=email).first()
+            existing_user = User.query.filter_by(email=User.normalize_email(email)).first()
             if existing_user:
                 raise ValidationException("Email already registered", {"email": ["Email already exists"]})
             
@@ -94,7 +95,7 @@ class AuthService:
             AuthenticationException: Nếu login thất bại
             BusinessLogicException: Nếu account bị lock
         """
-        user = User.query.filter_by(email=email).first()
+        user = User.query.filter_by(email=User.normalize_email(email)).first()
         
         if not user:
             raise AuthenticationException("Invalid email or password")
@@ -132,6 +133,7 @@ class AuthService:
         refresh_token = create_refresh_token(identity=str(user.id))
         
         db.session.commit()
+        invalidate_cached_user(user.id)
         
         return {
             'access_token': access_token,
@@ -180,6 +182,7 @@ class AuthService:
         user.confirmation_token_expires = None
         
         db.session.commit()
+        invalidate_cached_user(user.id)
         return True
     
     @staticmethod
@@ -196,7 +199,7 @@ class AuthService:
         Raises:
             ValidationException: Nếu user không tồn tại hoặc đã confirmed
         """
-        user = User.query.filter_by(email=email).first()
+        user = User.query.filter_by(email=User.normalize_email(email)).first()
         
         if not user:
             raise ValidationException("User not found")
@@ -3,16 +3,52 @@ Course Service
 Business logic for course catalog browsing and management
 """
 
+import threading
 from decimal import Decimal
+from cachetools import TTLCache
+from flask import current_app
+from app import cache
 from app.dao.course_dao import CourseDAO, CategoryDAO
 from app.models.course import DifficultyLevel, CourseStatus
 from app.exceptions.base import ValidationException
+from app.utils.locks import single_flight
+from app.utils.pagination import InvalidPaginationError
 from app import db
 
+# Cache process-local cho search_courses: (term, page, per_page) → result.
+# Từ khóa phổ biến lặp lại nhiều, TTL ngắn + xóa khi course thay đổi.
+_SEARCH_CACHE = TTLCache(maxsize=2048, ttl=30)
+_SEARCH_CACHE_LOCK = threading.RLock()
+
+
+def invalidate_search_cache() -> None:
+    """Xóa toàn bộ kết quả search đã cache (course publish/update/delete)"""
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE.clear()
+
+
+def invalidate_catalog_cache() -> None:
+    """
+    Xóa cache catalog + search khi course publish/update/delete
+    
+    Các view cache theo query string (popular, free, category...) tự hết hạn theo TTL.
+    """
+    invalidate_search_cache()
+    cache.delete_memoized(CourseService.get_course_catalog)
+
+
 class CourseService:
     
+    # Giới hạn độ dài từ khóa tìm kiếm (ILIKE '%...%' trên nhiều cột)
+    SEARCH_TERM_MAX_LENGTH = 128
+    
+    # sort_by hợp lệ cho catalog / category listing
+    VALID_SORTS = frozenset(('newest', 'oldest', 'popularity', 'price_low', 'price_high', 'rating', 'title'))
+    
     @staticmethod
-    def get_course_catalog(page=1, per_page=12, filters=None, sort_by='newest'):
+    @single_flight
+    @cache.memoize(timeout=60)
+    def get_course_catalog(page=1, per_page=12, filters=None, sort_by='newest', cursor=None):
         """
         Get course catalog with filtering, sorting, and pagination
         
@@ -21,6 +57,8 @@ class CourseService:
             per_page (int): Number of courses per page (max 50)
             filters (dict): Filter criteria
             sort_by (str): Sort criteria
+            cursor (str): Cursor pagination (ưu tiên hơn page cho sort
+                newest/oldest/popularity); '' để lấy trang đầu, bỏ qua page
         
         Returns:
             dict: Course catalog data with pagination info
@@ -34,10 +72,35 @@ class CourseService:
             processed_filters = CourseService._process_filters(filters or {})
             
             # Validate sort parameter
-            valid_sorts = ['newest', 'oldest', 'popularity', 'price_low', 'price_high', 'rating', 'title']
-            if sort_by not in valid_sorts:
+            if sort_by not in CourseService.VALID_SORTS:
                 sort_by = 'newest'
             
+            # Keyset pagination: cursor rỗng ('') là trang đầu của chế độ cursor
+            if cursor is not None:
+                if sort_by not in CourseDAO.KEYSET_SORTS:
+                    raise InvalidPaginationError(f"cursor không hỗ trợ sort_by '{sort_by}'")
+                result = CourseDAO.get_published_courses_after(
+                    cursor=cursor,
+                    per_page=per_page,
+                    filters=processed_filters,
+                    sort_by=sort_by
+                )
+                return {
+                    'success': True,
+                    'data': {
+                        'courses': [CourseService._format_course_for_catalog(course)
+                                    for course in result['courses']],
+                        'pagination': {
+                            'per_page': result['per_page'],
+                            'has_next': result['has_next'],
+                            'next_cursor': result['next_cursor']
+                        },
+                        'filters_applied': processed_filters,
+                        'sort_by': sort_by
+                    },
+                    'etag_seed': CourseService._catalog_etag_seed(result['courses'], result['next_cursor'])
+                }
+            
             # Get courses from DAO
             result = CourseDAO.get_published_courses(
                 page=page,
@@ -67,12 +130,21 @@ class CourseService:
                     },
                     'filters_applied': processed_filters,
                     'sort_by': sort_by
-                }
+                },
+                'etag_seed': CourseService._catalog_etag_seed(result['courses'], result['total'])
             }
             
+        except InvalidPaginationError:
+            raise
         except Exception as e:
             raise ValidationException({"error": [f"Lỗi khi lấy danh mục khóa học: {str(e)}"]})
     
+    @staticmethod
+    def _catalog_etag_seed(courses, total=None):
+        """Version của một trang catalog: max updated_at + số row (+ total)"""
+        latest = max((course.updated_at for course in courses if course.updated_at), default=None)
+        return (latest, len(courses), total)
+    
     @staticmethod
     def _process_filters(filters):
         """Process and validate filter parameters"""
@@ -148,7 +220,7 @@ class CourseService:
         # Search filter
         if filters.get('search'):
             search_term = str(filters['search']).strip()
-            if len(search_term) >= 2:  # Minimum search length
+            if 2 <= len(search_term) <= CourseService.SEARCH_TERM_MAX_LENGTH:
                 processed['search'] = search_term
         
         # Language filter
@@ -205,7 +277,8 @@ class CourseService:
             
             return {
                 'success': True,
-                'data': CourseService._format_course_details(course)
+                'data': CourseService._format_course_details(course),
+                'etag_seed': (course.id, course.updated_at)
             }
             
         except ValidationException:
@@ -258,6 +331,26 @@ class CourseService:
             'updated_at': course.updated_at.isoformat()
         }
     
+    @staticmethod
+    def get_categories_version(include_course_counts=False):
+        """
+        Version của danh sách category cho conditional GET
+        
+        Args:
+            include_course_counts (bool): Tính cả thay đổi của course đã publish
+                (cho /categories/with-count)
+        
+        Returns:
+            tuple: (etag_seed, last_modified)
+        """
+        category_updated, category_count = CategoryDAO.get_active_categories_version()
+        if not include_course_counts:
+            return (category_updated, category_count), category_updated
+        
+        course_updated, course_count = CourseDAO.get_published_version()
+        last_modified = max(filter(None, (category_updated, course_updated)), default=None)
+        return (category_updated, category_count, course_updated, course_count), last_modified
+    
     @staticmethod
     def get_categories():
         """Get all active categories"""
@@ -308,8 +401,8 @@ class CourseService:
             raise ValidationException({"error": [f"Lỗi khi lấy danh mục với số lượng khóa học: {str(e)}"]})
     
     @staticmethod
-    def get_courses_by_category_slug(slug, page=1, per_page=12, sort_by='newest'):
-        """Get courses by category slug with pagination"""
+    def get_courses_by_category_slug(slug, page=1, per_page=12, sort_by='newest', cursor=None):
+        """Get courses by category slug with pagination (cursor như get_course_catalog)"""
         try:
             # First, get the category by slug
             category = CategoryDAO.get_category_by_slug(slug)
@@ -321,25 +414,44 @@ class CourseService:
             per_page = min(50, max(1, int(per_page)))
             
             # Validate sort parameter
-            valid_sorts = ['newest', 'oldest', 'popularity', 'price_low', 'price_high', 'rating', 'title']
-            if sort_by not in valid_sorts:
+            if sort_by not in CourseService.VALID_SORTS:
                 sort_by = 'newest'
             
             # Create filters for this category
             filters = {'category_id': category.id}
             
-            # Get courses from DAO
-            result = CourseDAO.get_published_courses(
-                page=page,
-                per_page=per_page,
-                filters=filters,
-                sort_by=sort_by
-            )
-            
-            # Format course data for response
-            formatted_courses = []
-            for course in result['courses']:
-                formatted_courses.append(CourseService._format_course_for_catalog(course))
+            if cursor is not None:
+                if sort_by not in CourseDAO.KEYSET_SORTS:
+                    raise InvalidPaginationError(f"cursor không hỗ trợ sort_by '{sort_by}'")
+                result = CourseDAO.get_published_courses_after(
+                    cursor=cursor,
+                    per_page=per_page,
+                    filters=filters,
+                    sort_by=sort_by
+                )
+                pagination = {
+                    'per_page': result['per_page'],
+                    'has_next': result['has_next'],
+                    'next_cursor': result['next_cursor']
+                }
+            else:
+                # Get courses from DAO
+                result = CourseDAO.get_published_courses(
+                    page=page,
+                    per_page=per_page,
+                    filters=filters,
+                    sort_by=sort_by
+                )
+                pagination = {
+                    'total': result['total'],
+                    'pages': result['pages'],
+                    'current_page': result['current_page'],
+                    'per_page': result['per_page'],
+                    'has_next': result['has_next'],
+                    'has_prev': result['has_prev'],
+                    'next_page': result['next_page'],
+                    'prev_page': result['prev_page']
+                }
             
             return {
                 'success': True,
@@ -351,23 +463,16 @@ class CourseService:
                         'description': category.description,
                         'icon': category.icon
                     },
-                    'courses': formatted_courses,
-                    'pagination': {
-                        'total': result['total'],
-                        'pages': result['pages'],
-                        'current_page': result['current_page'],
-                        'per_page': result['per_page'],
-                        'has_next': result['has_next'],
-                        'has_prev': result['has_prev'],
-                        'next_page': result['next_page'],
-                        'prev_page': result['prev_page']
-                    },
+                    'courses': [CourseService._format_course_for_catalog(course) for course in result['courses']],
+                    'pagination': pagination,
                     'sort_by': sort_by
                 }
             }
             
         except ValidationException:
             raise
+        except InvalidPaginationError:
+            raise
         except Exception as e:
             raise ValidationException({"error": [f"Lỗi khi lấy khóa học theo danh mục: {str(e)}"]})
     
@@ -389,6 +494,20 @@ class CourseService:
         except Exception as e:
             raise ValidationException({"error": [f"Lỗi khi lấy khóa học phổ biến: {str(e)}"]})
     
+    @staticmethod
+    def get_similar_courses(course_id, limit=6):
+        """Get published courses in the same category"""
+        try:
+            courses = CourseDAO.get_similar_courses(course_id, limit)
+            
+            return {
+                'success': True,
+                'data': [CourseService._format_course_for_catalog(course) for course in courses]
+            }
+            
+        except Exception as e:
+            raise ValidationException({"error": [f"Lỗi khi lấy khóa học tương tự: {str(e)}"]})
+    
     @staticmethod
     def get_top_rated_courses(limit=10):
         """Get top rated courses"""
@@ -408,13 +527,14 @@ class CourseService:
             raise ValidationException({"error": [f"Lỗi khi lấy khóa học đánh giá cao: {str(e)}"]})
     
     @staticmethod
-    def get_free_courses(page=1, per_page=12):
+    def get_free_courses(page=1, per_page=12, cursor=None):
         """
         Get free courses with pagination
         
         Args:
             page (int): Page number (1-based)
             per_page (int): Number of courses per page (max 50)
+            cursor (str): Cursor pagination (theo số học viên); '' cho trang đầu
         
         Returns:
             dict: Free courses data with pagination info
@@ -423,6 +543,25 @@ class CourseService:
             # Validate pagination parameters
             page = max(1, int(page))
             per_page = min(50, max(1, int(per_page)))
+            
+            if cursor is not None:
+                result = CourseDAO.get_published_courses_after(
+                    cursor=cursor,
+                    per_page=per_page,
+                    filters={'is_free': True},
+                    sort_by='popularity'
+                )
+                return {
+                    'success': True,
+                    'data': [CourseService._format_course_for_catalog(course) for course in result['courses']],
+                    'pagination': {
+                        'per_page': per_page,
+                        'count': len(result['courses']),
+                        'has_next': result['has_next'],
+                        'next_cursor': result['next_cursor']
+                    }
+                }
+            
             offset = (page - 1) * per_page
             
             courses = CourseDAO.get_free_courses(offset=offset, limit=per_page)
@@ -441,6 +580,8 @@ class CourseService:
                 }
             }
             
+        except InvalidPaginationError:
+            raise
         except Exception as e:
             raise ValidationException({"error": [f"Lỗi khi lấy khóa học miễn phí: {str(e)}"]})
     
@@ -450,17 +591,27 @@ class CourseService:
         try:
             if not search_term or len(search_term.strip()) < 2:
                 raise ValidationException({"search_term": ["Từ khóa tìm kiếm phải có ít nhất 2 ký tự"]})
+            if len(search_term.strip()) > CourseService.SEARCH_TERM_MAX_LENGTH:
+                raise ValidationException({"search_term": [f"Từ khóa tìm kiếm tối đa {CourseService.SEARCH_TERM_MAX_LENGTH} ký tự"]})
             
             page = max(1, int(page))
             per_page = min(50, max(1, int(per_page)))
             
+            use_cache = current_app.config.get('SEARCH_CACHE_ENABLED', True)
+            cache_key = (search_term.strip(), page, per_page)
+            if use_cache:
+                with _SEARCH_CACHE_LOCK:
+                    cached = _SEARCH_CACHE.get(cache_key)
+                if cached is not None:
+                    return cached
+            
             result = CourseDAO.search_courses(search_term.strip(), page, per_page)
             
             formatted_courses = []
             for course in result['courses']:
                 formatted_courses.append(CourseService._format_course_for_catalog(course))
             
-            return {
+            search_result = {
                 'success': True,
                 'data': {
                     'courses': formatted_courses,
@@ -475,6 +626,11 @@ class CourseService:
                     'search_term': result['search_term']
                 }
             }
+            if use_cache:
+                with _SEARCH_CACHE_LOCK:
+                    _SEARCH_CACHE[cache_key] = search_result
+            
+            return search_result
             
         except ValidationException:
             raise
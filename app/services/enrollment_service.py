@@ -4,7 +4,7 @@ Business logic for course enrollment and registration workflow
 """
 
 import logging
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.dao.enrollment_dao import EnrollmentDAO
@@ -16,6 +16,7 @@ from app.models.course import Course
 from app.models.user import User
 from app.models.coupon import Coupon
 from app.exceptions.validation_exception import ValidationException
+from app import cache
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,17 @@ class EnrollmentService:
         self.transaction_dao = TransactionDAO()
         self.user_dao = UserDAO()
     
+    @staticmethod
+    def __caching_id__(service) -> str:
+        # Flask-Caching gọi getattr(obj, '__caching_id__')(obj) → nhận instance làm tham số.
+        # Service không có state riêng: mọi instance/worker dùng chung cache key
+        return type(service).__name__
+    
+    def _invalidate_course_access(self, user_id: int, course_id: int) -> None:
+        """Xóa kết quả check_course_access đã memoize sau khi enrollment đổi trạng thái"""
+        # Truyền self tường minh: delete_memoized với bound method tính sai cache key
+        cache.delete_memoized(EnrollmentService.check_course_access, self, user_id, int(course_id))
+    
     def register_for_course(self, user_id: int, course_id: str, full_name: str,
                           email: str, discount_code: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -109,6 +121,8 @@ class EnrollmentService:
             if enrollment.payment_required:
                 response_data["payment_url"] = self._generate_payment_url(enrollment)
             
+            self._invalidate_course_access(user_id, enrollment.course_id)
+            
             logger.info(f"Course registration initiated for user {user_id}, course {course_id}")
             return response_data
             
@@ -189,6 +203,7 @@ class EnrollmentService:
                 
                 # Set payment details
                 self.payment_dao.set_payment_details(payment.id, payment_details)
+                self._invalidate_course_access(enrollment.user_id, enrollment.course_id)
                 
                 logger.info(f"Payment completed for enrollment {enrollment_id}")
                 
@@ -204,6 +219,7 @@ class EnrollmentService:
                 self.enrollment_dao.update_enrollment_status(
                     enrollment_id, EnrollmentStatus.PAYMENT_PENDING, PaymentStatus.FAILED
                 )
+                self._invalidate_course_access(enrollment.user_id, enrollment.course_id)
                 
                 logger.warning(f"Payment failed for enrollment {enrollment_id}: {error_details}")
                 
@@ -249,6 +265,7 @@ class EnrollmentService:
                 self.enrollment_dao.update_enrollment_status(
                     enrollment_id, EnrollmentStatus.ACTIVE
                 )
+                self._invalidate_course_access(enrollment.user_id, enrollment.course_id)
                 
                 # Get first lesson URL
                 first_lesson_url = self._get_first_lesson_url(enrollment.course_id)
@@ -268,6 +285,7 @@ class EnrollmentService:
                     enrollment_id, EnrollmentStatus.ACTIVATING
                 )
                 self.enrollment_dao.increment_activation_attempt(enrollment_id)
+                self._invalidate_course_access(enrollment.user_id, enrollment.course_id)
                 
                 # Get updated enrollment for retry info
                 updated_enrollment = self.enrollment_dao.get_by_id(enrollment_id)
@@ -351,7 +369,7 @@ class EnrollmentService:
             raise ValidationException({"error": ["Failed to retrieve enrollment status"]})
     
     def get_user_enrollments(self, user_id: int, status_filter: Optional[str] = None,
-                           page: int = 1, limit: int = 10) -> Dict[str, Any]:
+                           page: int = 1, limit: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
         """
         Get user's course enrollments
         
@@ -360,6 +378,8 @@ class EnrollmentService:
             status_filter: Optional status filter
             page: Page number
             limit: Items per page
+            cursor: Cursor pagination (next_cursor của trang trước; '' cho trang đầu),
+                khi có thì bỏ qua page
             
         Returns:
             Dict[str, Any]: User enrollments with pagination
@@ -380,6 +400,9 @@ class EnrollmentService:
             
             logger.info(f"Getting enrollments for user {user_id}, status: {status_filter}, page: {page}, limit: {limit}")
             
+            if cursor is not None:
+                return self._get_user_enrollments_after(user_id, status_filter, cursor, limit)
+            
             # Get enrollments from DAO with error handling
             try:
                 enrollments, total_count = self.enrollment_dao.get_user_enrollments(
@@ -399,16 +422,7 @@ class EnrollmentService:
                 total_count = 0
             
             # Convert to response format with error handling
-            enrollment_data = []
-            for enrollment in enrollments:
-                try:
-                    if enrollment is not None:
-                        data = enrollment.to_dict(include_course_info=True, include_progress=True)
-                        enrollment_data.append(data)
-                except Exception as e:
-                    logger.warning(f"Error converting enrollment {getattr(enrollment, 'id', 'unknown')} to dict: {str(e)}")
-                    # Skip this enrollment but continue with others
-                    continue
+            enrollment_data = self._serialize_enrollments(enrollments)
             
             # Calculate pagination info safely
             try:
@@ -437,10 +451,62 @@ class EnrollmentService:
             logger.error(f"Unexpected error getting user enrollments for user {user_id}: {str(e)}", exc_info=True)
             raise ValidationException({"error": ["Failed to retrieve enrollments"]})
     
-    def check_course_access(self, user_id: int, course_id: str) -> Dict[str, Any]:
+    def _get_user_enrollments_after(self, user_id: int, status_filter: Optional[str],
+                                    cursor: str, limit: int) -> Dict[str, Any]:
+        """Trang enrollments theo keyset (enrollment_date, id), không COUNT"""
+        try:
+            enrollments, next_cursor = self.enrollment_dao.get_user_enrollments_after(
+                user_id, status_filter, cursor, limit
+            )
+        except ValueError:
+            raise ValidationException({"cursor": ["Invalid cursor"]})
+        except SQLAlchemyError as e:
+            logger.error(f"Database error getting user enrollments for user {user_id}: {str(e)}")
+            raise ValidationException({"error": ["Database error retrieving enrollments"]})
+        
+        return {
+            "data": self._serialize_enrollments(enrollments),
+            "pagination": {
+                "per_page": limit,
+                "has_next": next_cursor is not None,
+                "next_cursor": next_cursor
+            }
+        }
+    
+    def iter_user_enrollments(self, user_id: int, status_filter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Tất cả enrollments của user dạng dict, sinh dần theo batch DB (cho NDJSON stream)
+        
+        Args:
+            user_id: User ID
+            status_filter: Optional status filter
+        """
+        for enrollment in self.enrollment_dao.iter_user_enrollments(user_id, status_filter):
+            try:
+                yield enrollment.to_dict(include_course_info=True, include_progress=True)
+            except Exception as e:
+                logger.warning(f"Error converting enrollment {getattr(enrollment, 'id', 'unknown')} to dict: {str(e)}")
+    
+    @staticmethod
+    def _serialize_enrollments(enrollments) -> List[Dict[str, Any]]:
+        """Enrollment → dict cho my-courses; bỏ qua enrollment lỗi thay vì fail cả trang"""
+        enrollment_data = []
+        for enrollment in enrollments:
+            try:
+                if enrollment is not None:
+                    enrollment_data.append(enrollment.to_dict(include_course_info=True, include_progress=True))
+            except Exception as e:
+                logger.warning(f"Error converting enrollment {getattr(enrollment, 'id', 'unknown')} to dict: {str(e)}")
+        return enrollment_data
+    
+    @cache.memoize(timeout=60)
+    def check_course_access(self, user_id: int, course_id: int) -> Dict[str, Any]:
         """
         Check if user has access to a course
         
+        Kết quả memoize 60s theo (user_id, course_id); course_id phải là int
+        để khớp key khi invalidate.
+        
         Args:
             user_id: User ID
             course_id: Course ID
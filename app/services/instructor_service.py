@@ -3,15 +3,42 @@ Instructor Service
 Business logic for instructor course management
 """
 
+import hashlib
 import re
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
-from sqlalchemy import desc, asc
-from app import db
-from app.models.user import User, UserRole
+from app import cache, db
 from app.models.course import Course, Category, CourseStatus, DifficultyLevel, Module, Lesson, Content, ContentType
 from app.dao.course_dao import CourseDAO, CategoryDAO
+from app.services.course_service import invalidate_catalog_cache
 from app.exceptions.base import ValidationException, BusinessLogicException
+from app.utils.pagination import paginate_with_window_count, keyset_page
+from app.utils.auth import load_user
+
+
+# (sort_by, sort_order) được phép → ORDER BY clause, build sẵn một lần lúc import
+COURSE_ORDERINGS = {
+    (sort_by, sort_order): getattr(getattr(Course, sort_by), sort_order)()
+    for sort_by in ('created_at', 'updated_at', 'title')
+    for sort_order in ('asc', 'desc')
+}
+
+# Danh sách course của instructor (dashboard poll) cache theo query, TTL ngắn
+COURSE_LIST_CACHE_TTL = 30
+
+
+def _course_list_version_key(instructor_id: int) -> str:
+    return 'instructor_courses:version:%s' % instructor_id
+
+
+def invalidate_instructor_course_list(instructor_id: int) -> None:
+    """
+    Bỏ mọi trang danh sách course đã cache của instructor (create/update/publish/delete)
+    
+    Đổi version thay vì xóa theo pattern: key cũ không còn được đọc và tự hết hạn theo TTL.
+    """
+    cache.set(_course_list_version_key(instructor_id), time.time_ns(), timeout=0)
 
 
 class InstructorService:
@@ -19,19 +46,49 @@ class InstructorService:
     
     @staticmethod
     def get_instructor_courses(instructor_id: int, page: int = 1, per_page: int = 10, 
-                             status: str = 'all', sort_by: str = 'updated_at', 
-                             sort_order: str = 'desc') -> Dict:
+                             status: str = 'all', sort_by: str = 'updated_at',
+                             sort_order: str = 'desc', cursor: Optional[str] = None) -> Dict:
         """
         Get courses for a specific instructor with pagination and filtering
+        
+        sort_by/sort_order: một cặp trong COURSE_ORDERINGS (default updated_at desc)
+        cursor: keyset pagination theo (sort_by, id), '' cho trang đầu; khi có
+            cursor thì bỏ qua page (OFFSET tốn chi phí tăng theo số trang)
+        
+        Kết quả cache COURSE_LIST_CACHE_TTL giây theo (instructor, tham số);
+        thay đổi course của instructor làm mới ngay qua invalidate_instructor_course_list.
+        
+        Raises:
+            ValueError: cursor không hợp lệ
         """
+        version = cache.get(_course_list_version_key(instructor_id)) or 0
+        params = repr((page, per_page, status, sort_by, sort_order, cursor)).encode('utf-8')
+        key = 'instructor_courses:%s:%s:%s' % (
+            instructor_id, version, hashlib.blake2b(params, digest_size=8).hexdigest()
+        )
+        
+        result = cache.get(key)
+        if result is None:
+            result = InstructorService._query_instructor_courses(
+                instructor_id, page, per_page, status, sort_by, sort_order, cursor
+            )
+            cache.set(key, result, timeout=COURSE_LIST_CACHE_TTL)
+        return result
+    
+    @staticmethod
+    def _query_instructor_courses(instructor_id: int, page: int, per_page: int, status: str,
+                                  sort_by: str, sort_order: str, cursor: Optional[str]) -> Dict:
+        """Query + format một trang danh sách course (không qua cache)"""
         try:
             # Validate instructor exists and has permission
-            instructor = User.query.get(instructor_id)
+            instructor = load_user(instructor_id)
             if not instructor or not instructor.can_create_courses():
                 raise BusinessLogicException("Instructor not found or not authorized")
             
-            # Build query
-            query = Course.query.filter_by(instructor_id=instructor_id)
+            # Build query (category dùng trong format → load một lần cho cả trang)
+            query = Course.query.options(
+                db.selectinload(Course.category)
+            ).filter_by(instructor_id=instructor_id)
             
             # Apply status filter
             if status != 'all':
@@ -40,38 +97,48 @@ class InstructorService:
                 elif status == 'published':
                     query = query.filter_by(status=CourseStatus.PUBLISHED)
             
+            if (sort_by, sort_order) not in COURSE_ORDERINGS:
+                sort_by, sort_order = 'updated_at', 'desc'
+            
+            # Keyset: WHERE (sort_col, id) < (...) ORDER BY sort_col, id LIMIT per_page + 1
+            if cursor is not None:
+                courses, next_cursor = keyset_page(
+                    query, getattr(Course, sort_by), Course.id, cursor, per_page,
+                    descending=(sort_order == 'desc')
+                )
+                return {
+                    'courses': [InstructorService._format_instructor_course(course) for course in courses],
+                    'pagination': {
+                        'per_page': per_page,
+                        'has_next': next_cursor is not None,
+                        'next_cursor': next_cursor
+                    }
+                }
+            
             # Apply sorting
-            sort_column = getattr(Course, sort_by, Course.updated_at)
-            if sort_order == 'asc':
-                query = query.order_by(asc(sort_column))
-            else:
-                query = query.order_by(desc(sort_column))
+            query = query.order_by(COURSE_ORDERINGS[(sort_by, sort_order)])
             
-            # Paginate
-            pagination = query.paginate(
-                page=page, 
-                per_page=per_page, 
-                error_out=False
-            )
+            # Paginate: LIMIT/OFFSET + COUNT(*) OVER () trong một câu SELECT
+            pagination = paginate_with_window_count(query, page, per_page)
             
             # Format courses
             courses = []
-            for course in pagination.items:
+            for course in pagination['items']:
                 courses.append(InstructorService._format_instructor_course(course))
             
             return {
                 'courses': courses,
                 'pagination': {
-                    'current_page': pagination.page,
-                    'per_page': pagination.per_page,
-                    'total': pagination.total,
-                    'total_pages': pagination.pages,
-                    'has_next': pagination.has_next,
-                    'has_prev': pagination.has_prev
+                    'current_page': page,
+                    'per_page': per_page,
+                    'total': pagination['total'],
+                    'total_pages': pagination['pages'],
+                    'has_next': pagination['has_next'],
+                    'has_prev': pagination['has_prev']
                 }
             }
             
-        except BusinessLogicException:
+        except (BusinessLogicException, ValueError):
             raise
         except Exception as e:
             raise BusinessLogicException(f"Failed to retrieve courses: {str(e)}")
@@ -83,7 +150,7 @@ class InstructorService:
         """
         try:
             # Validate instructor
-            instructor = User.query.get(instructor_id)
+            instructor = load_user(instructor_id)
             if not instructor or not instructor.can_create_courses():
                 raise BusinessLogicException("Instructor not found or not authorized to create courses")
             
@@ -125,6 +192,7 @@ class InstructorService:
             
             db.session.add(course)
             db.session.commit()
+            invalidate_instructor_course_list(instructor_id)
             
             return InstructorService._format_instructor_course_details(course)
             
@@ -179,6 +247,8 @@ class InstructorService:
             
             course.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_catalog_cache()
+            invalidate_instructor_course_list(instructor_id)
             
             return InstructorService._format_instructor_course_details(course)
             
@@ -211,6 +281,8 @@ class InstructorService:
             course.updated_at = datetime.utcnow()
             
             db.session.commit()
+            invalidate_catalog_cache()
+            invalidate_instructor_course_list(instructor_id)
             
             return {
                 'id': course.id,
@@ -244,6 +316,8 @@ class InstructorService:
             course.updated_at = datetime.utcnow()
             
             db.session.commit()
+            invalidate_catalog_cache()
+            invalidate_instructor_course_list(instructor_id)
             
             return {
                 'id': course.id,
@@ -273,6 +347,8 @@ class InstructorService:
             
             db.session.delete(course)
             db.session.commit()
+            invalidate_catalog_cache()
+            invalidate_instructor_course_list(instructor_id)
             
         except (ValidationException, BusinessLogicException):
             raise
@@ -500,8 +576,9 @@ class InstructorService:
             if not module:
                 raise ValidationException({"module": ["Module not found"]})
             
-            # Get lessons ordered by sort_order
-            lessons = Lesson.query.filter_by(module_id=module_id)\
+            # Get lessons ordered by sort_order; contents nạp 1 query (IN) thay vì 1 query/lesson
+            lessons = Lesson.query.options(db.selectinload(Lesson.contents))\
+                                .filter_by(module_id=module_id)\
                                 .order_by(Lesson.sort_order, Lesson.created_at)\
                                 .all()
             
@@ -581,6 +658,80 @@ class InstructorService:
             db.session.rollback()
             raise BusinessLogicException(f"Failed to create lesson: {str(e)}")
     
+    @staticmethod
+    def create_lessons_batch(instructor_id: int, course_id: int, module_id: int, lessons: List[Dict]) -> Dict:
+        """
+        Create many lessons for a module in one transaction
+        
+        Lesson không gửi order được xếp tiếp sau order lớn nhất hiện có,
+        theo thứ tự trong request. Content (video_url/content_data) được
+        insert sau khi có lesson id.
+        """
+        try:
+            # Verify course and module ownership (một lần cho cả batch)
+            course = Course.query.filter_by(id=course_id, instructor_id=instructor_id).first()
+            if not course:
+                raise ValidationException({"course": ["Course not found"]})
+            
+            module = Module.query.filter_by(id=module_id, course_id=course_id).first()
+            if not module:
+                raise ValidationException({"module": ["Module not found"]})
+            
+            next_order = (db.session.query(db.func.max(Lesson.sort_order))
+                          .filter_by(module_id=module_id).scalar() or 0) + 1
+            
+            lesson_rows = []
+            for item in lessons:
+                if 'order' in item:
+                    sort_order = item['order']
+                else:
+                    sort_order = next_order
+                    next_order += 1
+                
+                lesson_rows.append({
+                    'module_id': module_id,
+                    'title': item['title'],
+                    'content_type': ContentType(item['content_type']),
+                    'description': item.get('description'),
+                    'duration_minutes': item.get('duration_minutes', 0),
+                    'sort_order': sort_order,
+                    'is_preview': item.get('is_preview', False),
+                    'is_published': item.get('is_published', False)
+                })
+            
+            # return_defaults: lấy id của từng lesson để gắn content
+            db.session.bulk_insert_mappings(Lesson, lesson_rows, return_defaults=True)
+            
+            content_rows = []
+            for item, row in zip(lessons, lesson_rows):
+                video_url = item.get('video_url')
+                content_data = item.get('content_data')
+                if video_url or content_data:
+                    content_rows.append({
+                        'lesson_id': row['id'],
+                        'title': f"Content for {item['title']}",
+                        'content_data': content_data,
+                        'file_url': video_url if item['content_type'] == 'video' else None,
+                        'sort_order': 1
+                    })
+            
+            if content_rows:
+                db.session.bulk_insert_mappings(Content, content_rows)
+            
+            db.session.commit()
+            
+            return {
+                'module_id': module_id,
+                'lesson_ids': [row['id'] for row in lesson_rows],
+                'count': len(lesson_rows)
+            }
+            
+        except ValidationException:
+            raise
+        except Exception as e:
+            db.session.rollback()
+            raise BusinessLogicException(f"Failed to create lessons: {str(e)}")
+    
     @staticmethod
     def update_lesson(instructor_id: int, course_id: int, module_id: int, lesson_id: int, **kwargs) -> Dict:
         """
@@ -11,13 +11,37 @@ from typing import Optional, Dict, Any, List
 from werkzeug.datastructures import FileStorage
 from flask import current_app
 
-from app import db
+from app import db, cache
 from app.models.user import User
 from app.dao.user_dao import UserDAO
+from app.utils.auth import invalidate_user
 from app.utils.security import allowed_file, validate_image_file
 from app.exceptions.base import ValidationException, BusinessLogicException
 
 
+@cache.memoize(timeout=30)
+def get_cached_user_dict(user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Lấy user.to_dict() có cache ngắn hạn (30s) cho /me
+    
+    /refresh cần is_active mới nhất nên gọi bản không cache (.uncached).
+    
+    Args:
+        user_id: ID của user (int)
+    
+    Returns:
+        Dict thông tin user hoặc None nếu không tồn tại (None không được cache)
+    """
+    user = db.session.get(User, user_id)
+    return user.to_dict() if user else None
+
+
+def invalidate_cached_user(user_id) -> None:
+    """Xóa cache user sau khi profile thay đổi"""
+    cache.delete_memoized(get_cached_user_dict, int(user_id))
+    invalidate_user(user_id)
+
+
 class UserService:
     """Service class cho user operations"""
     
@@ -87,6 +111,7 @@ class UserService:
             
             # Update using DAO
             updated_user = self.user_dao.update_profile(user_id, update_data)
+            invalidate_cached_user(user_id)
             
             return self.get_user_profile(user_id)
             
@@ -148,6 +173,7 @@ class UserService:
             
             # Update user avatar using DAO
             self.user_dao.update_profile(user_id, {'avatar_filename': filename})
+            invalidate_cached_user(user_id)
             
             # Get updated user
             updated_user = self.user_dao.get_by_id(user_id)
@@ -201,6 +227,7 @@ class UserService:
             
             # Update user using DAO
             self.user_dao.update_profile(user_id, {'avatar_filename': None})
+            invalidate_cached_user(user_id)
             
             return {'message': 'Avatar deleted successfully'}
             
@@ -2,27 +2,176 @@
 Authentication utilities for Flask application
 """
 
+import threading
 import uuid
 from functools import wraps
 from typing import Optional
-from flask import request, session, jsonify
+from cachetools import TTLCache
+from flask import current_app, request, session, jsonify, g
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from app.models.user import User, UserRole
+from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+from app.models.user import User, INSTRUCTOR_ROLES
+from app.utils.auth_cache import verify_jwt_cached
+
+
+# Cache process-local: user_id → snapshot column values (hoặc _NOT_FOUND).
+# Chỉ lưu dict giá trị, không lưu ORM instance vì instance gắn với session.
+# invalidate_user chỉ xóa ở worker đang chạy; worker khác thấy thay đổi sau
+# tối đa USER_CACHE_TTL giây, nên TTL giữ ngắn (đủ gom các request dồn dập).
+USER_CACHE_TTL = 5
+_USER_CACHE = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL)
+_USER_CACHE_LOCK = threading.RLock()
+_NOT_FOUND = object()
+_USER_COLUMN_KEYS = tuple(column.key for column in User.__table__.columns)
+
+
+def _user_cache_enabled() -> bool:
+    return current_app.config.get('USER_CACHE_ENABLED', True)
+
+
+def _snapshot_user(user: User) -> dict:
+    """Lấy column values đã load của user (không trigger lazy load)"""
+    state = user.__dict__
+    return {key: state[key] for key in _USER_COLUMN_KEYS if key in state}
+
+
+def _user_from_snapshot(snapshot: dict) -> User:
+    """
+    Dựng lại User từ snapshot và gắn vào session hiện tại không cần SELECT
+    
+    merge(load=False) trả về instance đã có trong identity map nếu có.
+    """
+    user = User.__mapper__.class_manager.new_instance()
+    for key, value in snapshot.items():
+        set_committed_value(user, key, value)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def invalidate_user(user_id) -> None:
+    """
+    Xóa user khỏi process cache của worker hiện tại (login, đổi profile, đổi trạng thái...)
+    
+    Gọi sau commit(): gọi trước thì request khác có thể cache lại dữ liệu cũ.
+    """
+    with _USER_CACHE_LOCK:
+        _USER_CACHE.pop(int(user_id), None)
+
+
+def _fetch_user(user_id: int) -> Optional[User]:
+    """Load user qua process cache, fallback DB và cache cả kết quả không tồn tại"""
+    if not _user_cache_enabled():
+        return db.session.get(User, user_id)
+    
+    with _USER_CACHE_LOCK:
+        cached = _USER_CACHE.get(user_id)
+    if cached is _NOT_FOUND:
+        return None
+    if cached is not None:
+        return _user_from_snapshot(cached)
+    
+    user = db.session.get(User, user_id)
+    entry = _snapshot_user(user) if user is not None else _NOT_FOUND
+    with _USER_CACHE_LOCK:
+        _USER_CACHE[user_id] = entry
+    return user
+
+
+def load_user(user_id) -> Optional[User]:
+    """
+    Load user theo ID, cache trong request (g) và process cache (TTL USER_CACHE_TTL)
+    
+    Middleware, decorators và handlers cùng resolve current user trong
+    một request; chỉ query DB lần đầu, và bỏ qua SELECT khi process
+    cache còn snapshot của user.
+    
+    Args:
+        user_id: ID của user (int hoặc JWT identity string)
+        
+    Returns:
+        User instance hoặc None
+    """
+    user_id = int(user_id)
+    users = g.setdefault('_loaded_users', {})
+    if user_id not in users:
+        users[user_id] = _fetch_user(user_id)
+    return users[user_id]
+
+
+def get_user_access(user_id):
+    """
+    (role, is_active) của user đọc thẳng từ DB, bỏ qua process cache
+    
+    Dùng cho check phân quyền (instructor_required): role/is_active vừa đổi
+    phải có hiệu lực ngay ở mọi worker. Chỉ SELECT hai cột, không dựng ORM instance.
+    
+    Args:
+        user_id: ID của user (int hoặc JWT identity string)
+        
+    Returns:
+        Row (role, is_active) hoặc None nếu user không tồn tại
+    """
+    return db.session.execute(
+        select(User.role, User.is_active).where(User.id == int(user_id))
+    ).first()
+
+
+# Sentinel để phân biệt "chưa resolve" với kết quả None (anonymous) trong g
+_MISSING = object()
 
 
 def get_current_user_optional() -> Optional[User]:
     """
     Get current authenticated user (optional)
     
+    Kết quả (kể cả None cho anonymous) được memo trong g, nên JWT chỉ
+    decode một lần mỗi request.
+    
     Returns:
         User instance if authenticated, None otherwise
     """
+    user = g.get('_current_user_optional', _MISSING)
+    if user is _MISSING:
+        user = _resolve_current_user_optional()
+        g._current_user_optional = user
+    return user
+
+
+def has_jwt_credentials() -> bool:
+    """
+    Request có mang JWT hay không (chỉ peek header/cookie/query, không decode)
+    
+    Dùng để bỏ qua verify_jwt_in_request + load user cho request anonymous.
+    """
+    config = current_app.config
+    locations = config.get('JWT_TOKEN_LOCATION', ('headers',))
+    if isinstance(locations, str):
+        locations = (locations,)
+    
+    if 'headers' in locations and request.headers.get(config.get('JWT_HEADER_NAME', 'Authorization')):
+        return True
+    if 'cookies' in locations and request.cookies.get(config.get('JWT_ACCESS_COOKIE_NAME', 'access_token_cookie')):
+        return True
+    if 'query_string' in locations and request.args.get(config.get('JWT_QUERY_STRING_NAME', 'jwt')):
+        return True
+    # Token trong JSON body không peek được khi chưa parse body
+    return 'json' in locations
+
+
+def _resolve_current_user_optional() -> Optional[User]:
+    """Verify JWT (optional) và load user active"""
+    if not has_jwt_credentials():
+        return None
+    
     try:
         verify_jwt_in_request(optional=True)
         user_id = get_jwt_identity()
         
         if user_id:
-            user = User.query.get(int(user_id))
+            user = load_user(user_id)
             if user and user.is_active:
                 return user
         
@@ -31,6 +180,19 @@ def get_current_user_optional() -> Optional[User]:
         return None
 
 
+def current_user_id() -> int:
+    """
+    User id (int) của JWT đã verify trong request hiện tại
+    
+    Gọi sau @jwt_required(); giá trị được memo trong g để các handler/service
+    trong cùng request không phải tra claim và ép kiểu lại.
+    """
+    user_id = g.get('_current_user_id')
+    if user_id is None:
+        user_id = g._current_user_id = int(get_jwt_identity())
+    return user_id
+
+
 def get_current_user() -> User:
     """
     Get current authenticated user (required)
@@ -48,7 +210,7 @@ def get_current_user() -> User:
         if not user_id:
             raise Exception("Authentication required")
         
-        user = User.query.get(int(user_id))
+        user = load_user(user_id)
         if not user or not user.is_active:
             raise Exception("User not found or inactive")
         
@@ -64,6 +226,10 @@ def get_session_id() -> str:
     Returns:
         Session ID string
     """
+    session_id = g.get('_cart_session_id')
+    if session_id:
+        return session_id
+    
     # Try to get from session first
     session_id = session.get('cart_session_id')
     
@@ -76,6 +242,7 @@ def get_session_id() -> str:
         session_id = str(uuid.uuid4())
         session['cart_session_id'] = session_id
     
+    g._cart_session_id = session_id
     return session_id
 
 
@@ -99,19 +266,19 @@ def instructor_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         try:
-            # Verify JWT token first
-            verify_jwt_in_request()
-            user_id = get_jwt_identity()
+            # Verify JWT token first (bỏ qua nếu @jwt_required đã verify trong request)
+            verify_jwt_cached()
             
-            if not user_id:
+            if not get_jwt_identity():
                 return jsonify({
                     'success': False,
                     'error': 'Unauthorized',
                     'message': 'Authentication required'
                 }), 401
             
-            # Get user and check role
-            user = User.query.get(int(user_id))
+            # Check role/is_active trên DB, không dùng process cache (có thể cũ ở worker khác)
+            # current_user_id() memo id (int) trong g cho handler dùng lại
+            user = get_user_access(current_user_id())
             if not user or not user.is_active:
                 return jsonify({
                     'success': False,
@@ -119,7 +286,7 @@ def instructor_required(f):
                     'message': 'User not found or inactive'
                 }), 401
             
-            if user.role not in [UserRole.INSTRUCTOR, UserRole.ADMIN]:
+            if user.role not in INSTRUCTOR_ROLES:
                 return jsonify({
                     'success': False,
                     'error': 'Forbidden',
@@ -0,0 +1,111 @@
+"""
+Cache kết quả decode JWT theo token (process-local)
+
+Client polling cùng một access token không phải verify chữ ký + decode
+lại mỗi request: header/claims đã decode được giữ tới min(30s, exp).
+Các callback của flask_jwt_extended (blocklist, claims verification,
+user lookup) vẫn chạy ở mọi request.
+"""
+
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from cachetools import TLRUCache
+from flask import current_app, g, request
+from flask_jwt_extended import verify_jwt_in_request
+from flask_jwt_extended.internal_utils import (
+    custom_verification_for_token, verify_token_not_blocklisted, verify_token_type
+)
+from flask_jwt_extended.view_decorators import _load_user
+
+# Thời gian tối đa giữ một token đã verify (giây)
+TOKEN_CACHE_TTL = 30
+
+
+def _token_ttu(key, value, now):
+    """Entry hết hạn sau TOKEN_CACHE_TTL hoặc khi token hết hạn, tùy cái nào sớm hơn"""
+    return min(now + TOKEN_CACHE_TTL, value[1].get('exp', now))
+
+
+# sha256(Authorization header)[:16] → (jwt_header, jwt_data); timer là epoch để so với exp
+_TOKEN_CACHE = TLRUCache(maxsize=10_000, ttu=_token_ttu, timer=time.time)
+_TOKEN_CACHE_LOCK = threading.RLock()
+
+
+def _token_cache_key():
+    """
+    Key cache cho request hiện tại, None khi không dùng cache được
+
+    Chỉ cache khi JWT chỉ đọc từ header (mặc định) và request có header.
+    """
+    config = current_app.config
+    if not config.get('JWT_CACHE_ENABLED', True):
+        return None
+    if request.method in config.get('JWT_EXEMPT_METHODS', ('OPTIONS',)):
+        return None
+    locations = config.get('JWT_TOKEN_LOCATION', ('headers',))
+    if isinstance(locations, str):
+        locations = (locations,)
+    if tuple(locations) != ('headers',):
+        return None
+
+    auth_header = request.headers.get(config.get('JWT_HEADER_NAME', 'Authorization'))
+    if not auth_header:
+        return None
+    return hashlib.sha256(auth_header.encode('utf-8')).digest()[:16]
+
+
+def _accept_decoded_token(jwt_header, jwt_data):
+    """
+    Phần còn lại của verify_jwt_in_request() sau bước decode, cho token lấy từ cache
+
+    Chạy cùng các check/callback của thư viện rồi mới đặt g, nên blocklist và
+    user lookup có hiệu lực ngay cả khi token đã cache.
+    """
+    verify_token_type(jwt_data, refresh=False)
+    verify_token_not_blocklisted(jwt_header, jwt_data)
+    custom_verification_for_token(jwt_header, jwt_data)
+
+    g._jwt_extended_jwt_user = _load_user(jwt_header, jwt_data)
+    g._jwt_extended_jwt_header = jwt_header
+    g._jwt_extended_jwt = jwt_data
+    g._jwt_extended_jwt_location = 'headers'
+
+
+def verify_jwt_cached():
+    """
+    verify_jwt_in_request() (access token, bắt buộc) có cache theo token
+
+    Cache hit chỉ bỏ qua bước decode + verify chữ ký; g được đặt giống
+    flask_jwt_extended nên get_jwt_identity() / get_jwt() / get_current_user()
+    hoạt động như bình thường. Đã verify trong request này thì
+    không làm lại (jwt_required + instructor_required).
+    """
+    if g.get('_jwt_extended_jwt'):
+        return
+
+    key = _token_cache_key()
+    if key is not None:
+        with _TOKEN_CACHE_LOCK:
+            cached = _TOKEN_CACHE.get(key)
+        if cached is not None:
+            _accept_decoded_token(*cached)
+            return
+
+    result = verify_jwt_in_request()
+    if key is not None and result is not None:
+        jwt_header, jwt_data = result
+        if 'exp' in jwt_data:
+            with _TOKEN_CACHE_LOCK:
+                _TOKEN_CACHE[key] = (jwt_header, jwt_data)
+
+
+def cached_jwt_required(fn):
+    """Thay @jwt_required() cho các route chỉ dùng access token trong header"""
+    @wraps(fn)
+    def decorated(*args, **kwargs):
+        verify_jwt_cached()
+        return current_app.ensure_sync(fn)(*args, **kwargs)
+    return decorated
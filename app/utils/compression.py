@@ -0,0 +1,27 @@
+"""
+Hỗ trợ nén response (Flask-Compress)
+"""
+
+import re
+
+# Hậu tố Flask-Compress thêm vào ETag: "abc" → "abc:br" (W/"abc" → W/"abc:gzip")
+_CODING_SUFFIX = re.compile(r':(?:br|gzip|deflate)"')
+
+
+class ETagCodingMiddleware:
+    """
+    Bỏ hậu tố content-coding khỏi If-None-Match trước khi vào Flask
+    
+    ETag do view/after_request tính trên body chưa nén; client gửi lại ETag
+    đã nén ("abc:br") nên cần đưa về "abc" để etag_response / make_conditional
+    trả 304 như khi không nén.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and ':' in if_none_match:
+            environ['HTTP_IF_NONE_MATCH'] = _CODING_SUFFIX.sub('"', if_none_match)
+        return self.wsgi_app(environ, start_response)
@@ -0,0 +1,55 @@
+"""
+Error handling utilities cho route handlers
+Gom chuỗi try/except lặp lại ở các handler thành một decorator
+"""
+
+from functools import wraps
+from typing import Callable, Optional, Type, Union
+
+from flask import current_app
+
+from app.exceptions.base import ValidationException, BusinessLogicException
+from app.utils.response import error_response, validation_error_response, prebuilt_error_response
+
+
+def api_handler(fallback_message: str,
+                validation_field: str = 'general',
+                business_status: Union[int, Callable[[BusinessLogicException], int]] = 400,
+                validation_response: Optional[Callable[[Exception], tuple]] = None,
+                validation_exception: Type[Exception] = ValidationException):
+    """
+    Decorator map service exceptions sang API response chuẩn
+    
+    - ValidationException → 400 validation_error_response (hoặc validation_response)
+    - BusinessLogicException → business_status
+    - Exception khác → log + 500 với fallback_message (body serialize sẵn khi decorate)
+    
+    Handler vẫn có thể tự bắt exception khi cần response đặc thù.
+    
+    Args:
+        fallback_message: Message trả về khi lỗi không mong đợi
+        validation_field: Key cho field_errors khi exception không có field_errors
+        business_status: HTTP status (hoặc callable nhận exception) cho BusinessLogicException
+        validation_response: Callable nhận ValidationException trả response, thay cho mặc định
+        validation_exception: Class exception validate của service (mặc định
+            app.exceptions.base.ValidationException); class khác cần kèm validation_response
+    """
+    def decorator(f):
+        internal_error = prebuilt_error_response(fallback_message, 500)
+        
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                return f(*args, **kwargs)
+            except validation_exception as e:
+                if validation_response is not None:
+                    return validation_response(e)
+                return validation_error_response(e.message, e.field_errors or None, field=validation_field)
+            except BusinessLogicException as e:
+                status_code = business_status(e) if callable(business_status) else business_status
+                return error_response(e.message, status_code)
+            except Exception:
+                current_app.logger.exception(fallback_message)
+                return internal_error()
+        return decorated
+    return decorator
@@ -0,0 +1,64 @@
+"""
+WSGI middleware trả lời health probe (k8s liveness/readiness) trước khi vào Flask
+"""
+
+import hashlib
+from typing import Dict, Iterable, Tuple
+
+_PROBE_METHODS = frozenset(('GET', 'HEAD'))
+
+
+class HealthProbeMiddleware:
+    """
+    Trả body health đã serialize sẵn theo PATH_INFO
+
+    Không tạo request context, không qua URL matching / before_request /
+    view dispatch. Có ETag nên probe gửi If-None-Match nhận 304.
+    Path không phải health (hoặc method khác GET/HEAD) đi thẳng vào app.
+    """
+
+    def __init__(self, wsgi_app, probes: Dict[str, Tuple[bytes, str]]):
+        self.wsgi_app = wsgi_app
+        self.probes = {}
+        for path, (body, content_type) in probes.items():
+            etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+            headers = [
+                ('Content-Type', content_type),
+                ('Content-Length', str(len(body))),
+                ('ETag', etag),
+            ]
+            self.probes[path] = (body, headers, etag)
+
+    def __call__(self, environ, start_response) -> Iterable[bytes]:
+        probe = self.probes.get(environ.get('PATH_INFO'))
+        method = environ.get('REQUEST_METHOD')
+        if probe is None or method not in _PROBE_METHODS:
+            return self.wsgi_app(environ, start_response)
+
+        body, headers, etag = probe
+        if environ.get('HTTP_IF_NONE_MATCH') == etag:
+            start_response('304 Not Modified', [('ETag', etag)])
+            return [b'']
+
+        start_response('200 OK', headers)
+        return [b''] if method == 'HEAD' else [body]
+
+
+def install_health_probes(app, endpoints: Iterable[str]) -> None:
+    """
+    Render một lần các health view (route không tham số) và bọc app.wsgi_app
+
+    Gọi sau khi mọi blueprint đã đăng ký; health view phải trả nội dung cố định.
+    """
+    endpoints = frozenset(endpoints)
+    probes = {}
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint not in endpoints or rule.arguments:
+            continue
+        with app.test_request_context(rule.rule):
+            response = app.make_response(app.view_functions[rule.endpoint]())
+        if response.status_code == 200:
+            probes[rule.rule] = (response.get_data(), response.content_type)
+
+    if probes:
+        app.wsgi_app = HealthProbeMiddleware(app.wsgi_app, probes)
@@ -0,0 +1,55 @@
+"""
+JSON provider dùng orjson thay cho stdlib json
+Mọi jsonify / request.get_json trong app đi qua provider này
+"""
+
+import dataclasses
+import decimal
+from typing import Any, Union
+
+import orjson
+from flask import Response
+from flask.json.provider import JSONProvider
+
+
+def _default(obj: Any) -> Any:
+    """Fallback cho các type orjson không serialize native (giống DefaultJSONProvider)"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson
+    
+    - datetime/date/UUID/Enum được orjson serialize native (ISO 8601)
+    - Naive datetime (datetime.utcnow) được đánh dấu UTC
+    - Dict key không phải string (vd: int) được chấp nhận như stdlib json
+    """
+    
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.dumps_bytes(obj).decode('utf-8')
+    
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """Serialize thành UTF-8 bytes (output gốc của orjson)"""
+        return orjson.dumps(obj, default=_default, option=self.option)
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        jsonify() response: đưa thẳng bytes của orjson vào body,
+        bỏ qua bước decode str rồi encode lại UTF-8 của JSONProvider mặc định
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype='application/json')
@@ -0,0 +1,95 @@
+"""
+Lock utilities dựa trên cache backend (Redis khi có CACHE_REDIS_URL)
+và single-flight trong process
+"""
+
+import copy
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import wraps
+
+import orjson
+
+from app import cache
+
+# Các lời gọi single-flight đang chạy: (qualname, args đã serialize) → Future
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+class LockTimeout(Exception):
+    """Không lấy được lock sau số lần retry cho phép"""
+
+
+@contextmanager
+def cache_lock(key: str, timeout: int = 5, retries: int = 20, interval: float = 0.05):
+    """
+    Mutex ngắn hạn dùng cache.add (SET NX trên Redis)
+    
+    Lock tự hết hạn sau timeout giây nên process chết giữa chừng không
+    giữ lock mãi. Chỉ xóa lock nếu vẫn là token của mình.
+    
+    Args:
+        key: Cache key của lock
+        timeout: Thời gian sống tối đa của lock (giây)
+        retries: Số lần thử lấy lock
+        interval: Thời gian chờ giữa các lần thử (giây)
+        
+    Raises:
+        LockTimeout: Lock đang bị giữ sau khi hết retries
+    """
+    token = uuid.uuid4().hex
+    for attempt in range(retries):
+        if cache.add(key, token, timeout=timeout):
+            break
+        if attempt < retries - 1:
+            time.sleep(interval)
+    else:
+        raise LockTimeout(key)
+    
+    try:
+        yield
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def single_flight(f):
+    """
+    Decorator gộp các lời gọi trùng tham số đang chạy đồng thời trong process
+    
+    Chỉ thread đầu tiên thực thi f; các thread cùng key chờ Future của nó
+    (tránh thundering herd khi cache miss). Mỗi caller nhận một shallow copy
+    của kết quả nên có thể pop/gán key cấp ngoài cùng mà không ảnh hưởng nhau.
+    
+    Tham số phải serialize được bằng orjson (giá trị lạ dùng str()).
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = (f.__qualname__,
+               orjson.dumps([args, kwargs], option=orjson.OPT_SORT_KEYS, default=str))
+        
+        with _INFLIGHT_LOCK:
+            future = _INFLIGHT.get(key)
+            leader = future is None
+            if leader:
+                future = _INFLIGHT[key] = Future()
+        
+        if not leader:
+            return copy.copy(future.result())
+        
+        try:
+            result = f(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return copy.copy(result)
+        finally:
+            with _INFLIGHT_LOCK:
+                _INFLIGHT.pop(key, None)
+    return decorated
@@ -0,0 +1,60 @@
+"""
+Logging utilities: ghi log qua QueueHandler + QueueListener chạy nền
+
+Request thread chỉ enqueue LogRecord; format và write()/flush() ra stream
+do thread của QueueListener đảm nhận.
+"""
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+# Một QueueHandler gắn vào root logger cho cả process (create_app có thể gọi nhiều lần)
+_queue_handler = None
+_listener = None
+
+
+def _start_listener(target: logging.Handler) -> None:
+    """Tạo queue + listener mới và trỏ QueueHandler vào queue đó"""
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, target, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    """Flush các record còn trong queue khi process thoát"""
+    if _listener is not None:
+        _listener.stop()
+
+
+def setup_logging(app) -> None:
+    """
+    Cấu hình root logger theo LOG_LEVEL; bật queue logging khi LOG_QUEUE_ENABLED
+
+    Thread listener không tồn tại sau fork (gunicorn preload_app) nên
+    process con tạo listener riêng qua os.register_at_fork.
+    """
+    global _queue_handler
+
+    root = logging.getLogger()
+    root.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+
+    if not app.config.get('LOG_QUEUE_ENABLED') or _queue_handler is not None:
+        return
+
+    target = logging.StreamHandler()
+    target.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    _queue_handler = QueueHandler(queue.SimpleQueue())
+    root.addHandler(_queue_handler)
+    _start_listener(target)
+
+    atexit.register(_stop_listener)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=lambda: _start_listener(target))
@@ -0,0 +1,167 @@
+"""
+Pagination utilities cho DAO queries
+"""
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import func, tuple_
+
+
+class InvalidPaginationError(ValueError):
+    """page/per_page/cursor từ query string không hợp lệ"""
+
+
+@dataclass
+class ListParams:
+    """Query params chung của list endpoint, parse một lần mỗi request"""
+    
+    page: int = 1
+    per_page: int = 12
+    sort_by: Optional[str] = None
+    sort_order: str = 'desc'
+    cursor: Optional[str] = None
+    
+    @classmethod
+    def from_args(cls, args, per_page: int = 12, max_per_page: int = 50,
+                  sort_by: Optional[str] = None, sort_order: str = 'desc') -> 'ListParams':
+        """
+        Build từ request.args; page >= 1 và 1 <= per_page <= max_per_page
+        
+        Args:
+            args: request.args (MultiDict)
+            per_page: Giá trị mặc định của per_page
+            max_per_page: Giới hạn trên của per_page
+            sort_by: Giá trị mặc định của sort_by
+            sort_order: Giá trị mặc định của sort_order
+            
+        Raises:
+            InvalidPaginationError: page/per_page không phải số nguyên
+        """
+        raw = args.to_dict(flat=True)
+        try:
+            page = int(raw.get('page', 1))
+            per_page = int(raw.get('per_page', per_page))
+        except (TypeError, ValueError) as e:
+            raise InvalidPaginationError('Invalid pagination parameters') from e
+        return cls(
+            page=max(page, 1),
+            per_page=min(max(per_page, 1), max_per_page),
+            sort_by=raw.get('sort_by', sort_by),
+            sort_order=raw.get('sort_order', sort_order),
+            cursor=raw.get('cursor')
+        )
+
+
+def paginate_with_window_count(query, page: int, per_page: int) -> Dict[str, Any]:
+    """
+    Phân trang query với tổng số record lấy trong cùng một câu SELECT
+    
+    Dùng COUNT(*) OVER () thay cho cặp SELECT ... LIMIT + SELECT COUNT(*)
+    của query.paginate(). Chỉ khi trang yêu cầu vượt quá dữ liệu (không có
+    row nào trả về) mới cần một câu COUNT riêng.
+    
+    Args:
+        query: SQLAlchemy ORM query (đã filter/sort) trả về một entity
+        page: Trang hiện tại (1-based)
+        per_page: Số item mỗi trang
+        
+    Returns:
+        Dict gồm items, total, pages, has_next, has_prev, next_num, prev_num
+    """
+    rows = query.add_columns(func.count().over().label('total_count')) \
+        .limit(per_page).offset((page - 1) * per_page).all()
+    
+    items = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total_count
+    elif page == 1:
+        total = 0
+    else:
+        total = query.order_by(None).count()
+    
+    pages = (total + per_page - 1) // per_page if per_page else 0
+    has_next = page < pages
+    has_prev = page > 1
+    
+    return {
+        'items': items,
+        'total': total,
+        'pages': pages,
+        'has_next': has_next,
+        'has_prev': has_prev,
+        'next_num': page + 1 if has_next else None,
+        'prev_num': page - 1 if has_prev else None
+    }
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """
+    Encode (sort_value, id) của row cuối trang thành cursor opaque
+    
+    Datetime được lưu dạng ISO kèm tag để decode lại đúng kiểu.
+    """
+    if isinstance(sort_value, datetime):
+        payload = ['dt', sort_value.isoformat(), row_id]
+    else:
+        payload = ['v', sort_value, row_id]
+    return base64.urlsafe_b64encode(orjson.dumps(payload)).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    Decode cursor thành (sort_value, id)
+    
+    Raises:
+        InvalidPaginationError: Cursor không hợp lệ
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        tag, value, row_id = orjson.loads(base64.urlsafe_b64decode(padded))
+        if tag == 'dt':
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except (TypeError, ValueError) as e:
+        raise InvalidPaginationError('Invalid cursor') from e
+
+
+def keyset_page(query, sort_column, id_column, cursor: Optional[str], limit: int,
+                descending: bool = True) -> Tuple[List[Any], Optional[str]]:
+    """
+    Lấy một trang theo keyset (seek) thay vì OFFSET
+    
+    WHERE (sort_col, id) < (:value, :id) ORDER BY sort_col DESC, id DESC LIMIT n
+    dùng index để nhảy thẳng tới vị trí cursor, chi phí không tăng theo số trang.
+    
+    Args:
+        query: SQLAlchemy ORM query đã filter, chưa order_by
+        sort_column: Column sort chính (không nullable trong tập kết quả)
+        id_column: Primary key dùng làm tie-breaker
+        cursor: Cursor từ trang trước, None cho trang đầu
+        limit: Số item mỗi trang
+        descending: Chiều sort
+        
+    Returns:
+        (items, next_cursor); next_cursor là None khi hết dữ liệu
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        key = tuple_(sort_column, id_column)
+        query = query.filter(key < (value, row_id) if descending else key > (value, row_id))
+    
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    
+    # Lấy dư một row để biết còn trang sau hay không
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return items, next_cursor
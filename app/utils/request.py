@@ -0,0 +1,100 @@
+"""
+Request utilities cho việc đọc request data
+"""
+
+from functools import wraps
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import orjson
+from flask import g, request
+from marshmallow import Schema, ValidationError
+from pydantic import BaseModel, ValidationError as PydanticValidationError
+from werkzeug.routing import BaseConverter
+
+from app.utils.response import validation_error_response, body_required_response
+
+# Body coi như không gửi dữ liệu (giống `if not request.get_json()` trước đây)
+_EMPTY_JSON_BODIES = frozenset((b'', b'{}', b'null'))
+
+
+def fast_json() -> Any:
+    """
+    Parse JSON body bằng orjson
+    
+    Đọc raw body và parse trực tiếp, bỏ qua bước kiểm tra content-type
+    của request.get_json(). Body được giữ trong cache của request nên
+    các lần đọc sau vẫn dùng được.
+    
+    Returns:
+        Dữ liệu đã parse hoặc None nếu body rỗng / không phải JSON hợp lệ
+    """
+    raw = request.get_data()
+    if not raw:
+        return None
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def pydantic_error_messages(err: PydanticValidationError) -> Dict[str, List[str]]:
+    """Lỗi pydantic → {field: [messages]} cùng format với marshmallow err.messages"""
+    messages: Dict[str, List[str]] = {}
+    for error in err.errors(include_url=False, include_context=False, include_input=False):
+        field = '.'.join(str(part) for part in error['loc']) or '_schema'
+        messages.setdefault(field, []).append(error['msg'])
+    return messages
+
+
+def load_json_model(model: Type[BaseModel], exclude_unset: bool = False) -> Tuple[Optional[Dict], Optional[tuple]]:
+    """
+    Parse + validate raw body bằng pydantic model trong một lượt (model_validate_json)
+    
+    Args:
+        model: Pydantic model của request body
+        exclude_unset: Chỉ trả field client gửi lên (dùng cho update)
+    
+    Returns:
+        (data, None) khi hợp lệ, (None, error response) khi body rỗng/không hợp lệ
+    """
+    raw = request.get_data()
+    if raw.strip() in _EMPTY_JSON_BODIES:
+        return None, body_required_response()
+    try:
+        instance = model.model_validate_json(raw)
+    except PydanticValidationError as err:
+        return None, validation_error_response('Validation failed', pydantic_error_messages(err))
+    return instance.model_dump(exclude_unset=exclude_unset), None
+
+
+def validate_query(schema: Schema, message: str = 'Invalid query parameters'):
+    """
+    Decorator load request.args qua marshmallow schema một lần cho mỗi request
+    
+    Kết quả được đặt vào g.query; lỗi validate trả về 400 trước khi vào handler.
+    
+    Args:
+        schema: Schema instance (dùng chung ở module scope)
+        message: Thông báo lỗi chính khi validate thất bại
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                g.query = schema.load(request.args)
+            except ValidationError as err:
+                return validation_error_response(message, err.messages)
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+class UUIDStringConverter(BaseConverter):
+    """
+    URL converter cho ID dạng UUID (enrollments.id là String(36))
+    
+    Khác converter `uuid` mặc định của Werkzeug: giá trị giữ nguyên kiểu str
+    để truyền thẳng xuống DAO, không tạo uuid.UUID. ID sai định dạng bị
+    router từ chối (404) ngay lúc match URL.
+    """
+    regex = r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
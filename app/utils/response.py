@@ -2,8 +2,21 @@
 Response utilities cho API responses chuẩn
 """
 
-from flask import jsonify
-from typing import Any, Dict, Optional
+import hashlib
+from datetime import datetime, timezone
+
+import orjson
+from flask import current_app, request, stream_with_context
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+
+def _json_response(payload: Dict):
+    """
+    Response JSON từ bytes orjson của app.json (OrjsonProvider)
+    
+    Tương đương jsonify(payload) nhưng bỏ qua bước chuẩn hóa args/kwargs.
+    """
+    return current_app.response_class(current_app.json.dumps_bytes(payload), mimetype='application/json')
 
 
 def success_response(data: Any = None, message: str = None, status_code: int = 200) -> tuple:
@@ -28,7 +41,219 @@ def success_response(data: Any = None, message: str = None, status_code: int = 2
     if data is not None:
         response['data'] = data
     
-    return jsonify(response), status_code
+    return _json_response(response), status_code
+
+
+def prebuilt_response(payload: Dict, status_code: int = 200, etag: bool = False) -> Callable[[], tuple]:
+    """
+    Serialize payload cố định một lần lúc import
+    
+    Response object là mutable (after_request có thể sửa headers), nên mỗi
+    lần gọi trả về Response mới dựng từ bytes có sẵn thay vì dùng chung.
+    
+    Args:
+        payload: Dict response (chỉ chứa type JSON cơ bản)
+        status_code: HTTP status code
+        etag: Gắn ETag (hash body, tính một lần) để after_request trả 304
+    
+    Returns:
+        Callable không tham số trả về tuple (response, status_code)
+    """
+    body = orjson.dumps(payload)
+    body_etag = hashlib.blake2b(body, digest_size=8).hexdigest() if etag else None
+    
+    def build() -> tuple:
+        response = current_app.response_class(body, mimetype='application/json')
+        if body_etag:
+            response.set_etag(body_etag)
+        return response, status_code
+    return build
+
+
+def make_responder(message: str, status_code: int = 200) -> Callable[[Any], tuple]:
+    """
+    Success responder cho một route với message cố định
+    
+    Phần {"success":true,"message":...} được serialize sẵn; mỗi lần gọi chỉ
+    serialize data rồi ghép bytes. Output giống success_response(data, message).
+    
+    Args:
+        message: Thông báo thành công
+        status_code: HTTP status code
+    
+    Returns:
+        Callable nhận data, trả về tuple (response, status_code)
+    """
+    prefix = orjson.dumps({'success': True, 'message': message})[:-1]
+    empty_body = prefix + b'}'
+    
+    def respond(data: Any = None) -> tuple:
+        if data is None:
+            body = empty_body
+        else:
+            body = prefix + b',"data":' + current_app.json.dumps_bytes(data) + b'}'
+        return current_app.response_class(body, mimetype='application/json'), status_code
+    return respond
+
+
+# Placeholder đánh dấu vị trí list được stream trong body đã serialize
+_STREAM_MARKER = '\x00stream-items\x00'
+_STREAM_MARKER_BYTES = orjson.dumps(_STREAM_MARKER)
+
+
+def _swap_stream_list(obj: Dict, path: Sequence[str]):
+    """Copy nông các dict theo path, thay list ở cuối path bằng marker"""
+    key = path[0]
+    copy = dict(obj)
+    if len(path) == 1:
+        copy[key] = _STREAM_MARKER
+        return copy, obj[key]
+    copy[key], items = _swap_stream_list(obj[key], path[1:])
+    return copy, items
+
+
+def stream_list_response(data: Dict, path: Sequence[str], message: str = None,
+                         status_code: int = 200) -> tuple:
+    """
+    Success response như success_response nhưng stream list tại `path` theo từng item
+    
+    Phần bao ngoài được serialize một lần rồi tách tại vị trí list; các item
+    được serialize và gửi lần lượt (chunked), không dựng toàn bộ body trong
+    bộ nhớ. data gốc không bị sửa (an toàn với kết quả đang được cache).
+    
+    Args:
+        data: Dữ liệu trả về
+        path: Chuỗi key tới list cần stream, vd. ('data', 'courses')
+        message: Thông báo thành công
+        status_code: HTTP status code
+    
+    Returns:
+        Tuple (response, status_code)
+    """
+    envelope = {'success': True}
+    if message:
+        envelope['message'] = message
+    envelope['data'], items = _swap_stream_list(data, path)
+    
+    dumps = current_app.json.dumps_bytes
+    head, tail = dumps(envelope).split(_STREAM_MARKER_BYTES, 1)
+    
+    def generate():
+        yield head + b'['
+        separator = b''
+        for item in items:
+            yield separator + dumps(item)
+            separator = b','
+        yield b']' + tail
+    
+    response = current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+    return response, status_code
+
+
+def ndjson_response(rows: Iterable[Any], status_code: int = 200) -> tuple:
+    """
+    Stream rows dạng NDJSON (mỗi dòng một JSON object)
+    
+    rows có thể là generator đọc DB theo batch; mỗi row được serialize và gửi
+    ngay nên bộ nhớ không tăng theo số row.
+    
+    Args:
+        rows: Iterable các dict
+        status_code: HTTP status code
+    
+    Returns:
+        Tuple (response, status_code)
+    """
+    dumps = current_app.json.dumps_bytes
+    
+    def generate():
+        for row in rows:
+            yield dumps(row) + b'\n'
+    
+    response = current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+    return response, status_code
+
+
+def prebuilt_error_response(message: str, status_code: int = 400, error_code: str = None) -> Callable[[], tuple]:
+    """prebuilt_response với payload giống error_response(message, status_code, error_code)"""
+    payload = {'success': False, 'error': message}
+    if error_code:
+        payload['error_code'] = error_code
+    return prebuilt_response(payload, status_code)
+
+
+def _make_etag(etag_seed: Any) -> str:
+    """Hash version seed thành ETag ngắn"""
+    return hashlib.blake2b(str(etag_seed).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Client đã có bản hiện tại (If-None-Match, hoặc If-Modified-Since khi không gửi ETag)"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        # Header HTTP chỉ chính xác tới giây; last_modified lưu naive UTC
+        return request.if_modified_since >= last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    return False
+
+
+def _with_validators(response, etag: str, last_modified: Optional[datetime], max_age: int):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.cache_control.max_age = max_age
+    return response
+
+
+def etag_response(data: Any, message: str = None, etag_seed: Any = None, max_age: int = 30):
+    """
+    Success response cho GET idempotent kèm ETag
+    
+    Nếu If-None-Match khớp thì trả 304 rỗng, bỏ qua bước serialize JSON.
+    
+    Args:
+        data: Dữ liệu trả về
+        message: Thông báo thành công
+        etag_seed: Giá trị đại diện version dữ liệu (vd. max updated_at + số row)
+        max_age: Cache-Control max-age (giây)
+    
+    Returns:
+        Response
+    """
+    etag = _make_etag(etag_seed)
+    
+    if _not_modified(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response, _ = success_response(data, message)
+    return _with_validators(response, etag, None, max_age)
+
+
+def conditional_response(etag_seed: Any, build: Callable[[], Any], message: str = None,
+                         last_modified: Optional[datetime] = None, max_age: int = 30):
+    """
+    Như etag_response nhưng chỉ build data khi client chưa có bản hiện tại
+    
+    etag_seed nên lấy từ query rẻ (vd. SELECT MAX(updated_at), COUNT(*)),
+    để request poll lặp lại chỉ tốn query đó và trả 304.
+    
+    Args:
+        etag_seed: Version của dữ liệu
+        build: Callable trả về data (chỉ gọi khi cần body)
+        message: Thông báo thành công
+        last_modified: Thời điểm thay đổi cuối (naive UTC) cho Last-Modified
+        max_age: Cache-Control max-age (giây)
+    
+    Returns:
+        Response
+    """
+    etag = _make_etag(etag_seed)
+    
+    if _not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response, _ = success_response(build(), message)
+    return _with_validators(response, etag, last_modified, max_age)
 
 
 def error_response(
@@ -60,23 +285,24 @@ def error_response(
     if details:
         response['details'] = details
     
-    return jsonify(response), status_code
+    return _json_response(response), status_code
 
 
-def validation_error_response(message: str, field_errors: Dict = None) -> tuple:
+def validation_error_response(message: str, field_errors: Dict = None, field: str = 'general') -> tuple:
     """
     Tạo validation error response
     
     Args:
         message: Thông báo lỗi chính
-        field_errors: Lỗi cụ thể cho từng field
+        field_errors: Lỗi cụ thể cho từng field; None → {field: [message]}
+        field: Field nhận message khi không truyền field_errors
     
     Returns:
         Tuple (response, status_code)
     """
-    details = {}
-    if field_errors:
-        details['field_errors'] = field_errors
+    if field_errors is None:
+        field_errors = {field: [message]}
+    details = {'field_errors': field_errors} if field_errors else {}
     
     return error_response(
         message=message,
@@ -86,6 +312,15 @@ def validation_error_response(message: str, field_errors: Dict = None) -> tuple:
     )
 
 
+# Payload cố định cho request thiếu body, dùng chung giữa các handler
+_BODY_REQUIRED_ERRORS = {'general': ['Request body is required']}
+
+
+def body_required_response() -> tuple:
+    """Validation error response cho request không có JSON body"""
+    return validation_error_response('No data provided', _BODY_REQUIRED_ERRORS)
+
+
 def paginated_response(
     data: list, 
     page: int, 
@@ -125,6 +360,12 @@ def paginated_response(
     return success_response(data=response_data, message=message)
 
 
+def is_ok_response(rv) -> bool:
+    """response_filter cho cache.cached: chỉ cache response 200"""
+    status_code = rv[1] if isinstance(rv, tuple) else getattr(rv, 'status_code', 200)
+    return status_code == 200
+
+
 def created_response(data: Any = None, message: str = "Resource created successfully") -> tuple:
     """Tạo response cho resource được tạo thành công"""
     return success_response(data=data, message=message, status_code=201)
@@ -0,0 +1,37 @@
+"""
+Serialization helpers
+Sinh code serializer chuyên biệt cho model (to_dict) tại thời điểm import
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+def iso_or_none(value):
+    """Format datetime thành ISO string hoặc None"""
+    return value.isoformat() if value else None
+
+
+def build_dict_serializer(name: str, spec: Iterable[Tuple[str, str]],
+                          namespace: Optional[Dict[str, Any]] = None) -> Callable[[Any], dict]:
+    """
+    Build serializer function trả về dict literal
+    
+    Source của function được sinh một lần rồi exec, nên mỗi lần gọi chỉ
+    là một dict literal với các attribute read, không có vòng lặp hay branch.
+    
+    Args:
+        name: Tên function được sinh
+        spec: Danh sách (key, expression); expression dùng biến `obj`
+        namespace: Globals bổ sung cho expression (helper functions)
+        
+    Returns:
+        Callable nhận object và trả về dict
+    """
+    items = ',\n        '.join(f'{key!r}: {expr}' for key, expr in spec)
+    source = f'def {name}(obj):\n    return {{\n        {items}\n    }}\n'
+    
+    globals_ = {'iso_or_none': iso_or_none}
+    if namespace:
+        globals_.update(namespace)
+    exec(compile(source, f'<serializer {name}>', 'exec'), globals_)
+    return globals_[name]
@@ -2,11 +2,25 @@
 Authentication validators
 """
 
-from marshmallow import Schema, fields, ValidationError, validates, validates_schema
+from marshmallow import Schema, fields, ValidationError, validates, validates_schema, pre_load
 from app.models.user import User
 
 
-class UserRegistrationSchema(Schema):
+# Role được tự chọn khi đăng ký
+_REGISTRATION_ROLES = frozenset(('student', 'instructor'))
+
+
+class NormalizedEmailMixin:
+    """Normalize field email một lần trước khi load (strip + lowercase)"""
+    
+    @pre_load
+    def normalize_email(self, data, **kwargs):
+        if isinstance(data, dict) and isinstance(data.get('email'), str):
+            data = dict(data, email=User.normalize_email(data['email']))
+        return data
+
+
+class UserRegistrationSchema(NormalizedEmailMixin, Schema):
     """Schema validation cho user registration"""
     
     email = fields.Email(required=True, error_messages={'required': 'Email is required'})
@@ -16,7 +30,7 @@ class UserRegistrationSchema(Schema):
                            error_messages={'required': 'First name is required'})
     last_name = fields.Str(required=True, validate=lambda x: len(x.strip()) >= 2,
                           error_messages={'required': 'Last name is required'})
-    role = fields.Str(missing='student', validate=lambda x: x in ['student', 'instructor'])
+    role = fields.Str(missing='student', validate=lambda x: x in _REGISTRATION_ROLES)
     
     @validates('email')
     def validate_email_format(self, value):
@@ -40,7 +54,7 @@ class UserRegistrationSchema(Schema):
                 raise ValidationError('Email already registered', field_name='email')
 
 
-class UserLoginSchema(Schema):
+class UserLoginSchema(NormalizedEmailMixin, Schema):
     """Schema validation cho user login"""
     
     email = fields.Email(required=True)
@@ -48,13 +62,13 @@ class UserLoginSchema(Schema):
     remember_me = fields.Bool(missing=False)
 
 
-class EmailConfirmationSchema(Schema):
+class EmailConfirmationSchema(NormalizedEmailMixin, Schema):
     """Schema validation cho email confirmation"""
     
     email = fields.Email(required=True)
 
 
-class PasswordResetRequestSchema(Schema):
+class PasswordResetRequestSchema(NormalizedEmailMixin, Schema):
     """Schema validation cho password reset request"""
     
     email = fields.Email(required=True)
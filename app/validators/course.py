@@ -6,7 +6,7 @@ Implements comprehensive validation for course catalog browsing functionality.
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from enum import Enum
-from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+from marshmallow import Schema, fields, validate, validates_schema, post_load, ValidationError, EXCLUDE
 from app.models.course import DifficultyLevel as ModelDifficultyLevel, CourseStatus as ModelCourseStatus
 
 
@@ -283,4 +283,28 @@ class CourseUpdateSchema(Schema):
             if price > 0 and is_free:
                 raise ValidationError("Course cannot be free if price is greater than 0")
             if price == 0 and not is_free:
-                data['is_free'] = True
\ No newline at end of file
+                data['is_free'] = True
+
+
+class LimitQuerySchema(Schema):
+    """
+    Query param ?limit= của list endpoint ngắn (popular, top-rated, similar)
+    
+    limit không phải số nguyên dương → lỗi validate; vượt max thì bị kẹp về max.
+    """
+    
+    class Meta:
+        unknown = EXCLUDE
+    
+    limit = fields.Int(validate=validate.Range(min=1, error='Limit must be a positive integer'))
+    
+    def __init__(self, default_limit=10, max_limit=20, **kwargs):
+        super().__init__(**kwargs)
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+    
+    @post_load
+    def clamp_limit(self, data, **kwargs):
+        """Default + giới hạn trên của limit"""
+        data['limit'] = min(data.get('limit', self.default_limit), self.max_limit)
+        return data
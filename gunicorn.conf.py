@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration cho production
+Chạy: gunicorn -c gunicorn.conf.py wsgi:app (wsgi.py monkey patch gevent trước khi load app)
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Handlers chủ yếu chờ I/O (DB, SMTP, Stripe) → async worker, số worker theo CPU
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Load app một lần ở master rồi fork (service singletons, schemas dùng chung)
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
@@ -0,0 +1,32 @@
+"""Add indexes for confirmation token and activity sweeps on users
+
+Revision ID: 3c5d7e9f1a2b
+Revises: 8e1b32f255c2
+Create Date: 2026-10-17 09:12:41.582310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5d7e9f1a2b'
+down_revision = '8e1b32f255c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(
+            'idx_users_confirmation_token', ['confirmation_token'], unique=True,
+            postgresql_where=sa.text('confirmation_token IS NOT NULL'),
+            sqlite_where=sa.text('confirmation_token IS NOT NULL')
+        )
+        batch_op.create_index('idx_users_active_last_activity', ['is_active', 'last_activity_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('idx_users_active_last_activity')
+        batch_op.drop_index('idx_users_confirmation_token')
@@ -0,0 +1,32 @@
+"""Add indexes for the instructor course list
+
+Revision ID: 4d9b2e6a8c13
+Revises: c3e8a1f6b274
+Create Date: 2026-10-17 18:11:27.904155
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d9b2e6a8c13'
+down_revision = 'c3e8a1f6b274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.create_index('idx_courses_instructor_updated', ['instructor_id', 'updated_at'], unique=False)
+        batch_op.create_index('idx_courses_instructor_status_updated', ['instructor_id', 'status', 'updated_at'], unique=False)
+        batch_op.create_index('idx_courses_instructor_status_created', ['instructor_id', 'status', 'created_at'], unique=False)
+        batch_op.create_index('idx_courses_instructor_status_title', ['instructor_id', 'status', 'title'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('idx_courses_instructor_status_title')
+        batch_op.drop_index('idx_courses_instructor_status_created')
+        batch_op.drop_index('idx_courses_instructor_status_updated')
+        batch_op.drop_index('idx_courses_instructor_updated')
@@ -0,0 +1,33 @@
+"""Add FULLTEXT index for course search
+
+Revision ID: 5f2a9c4d7e31
+Revises: 3c5d7e9f1a2b
+Create Date: 2026-10-17 14:03:27.418905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2a9c4d7e31'
+down_revision = '3c5d7e9f1a2b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FULLTEXT chỉ có trên MySQL; dialect khác giữ search bằng ILIKE
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index(
+        'ft_courses_search', 'courses',
+        ['title', 'short_description', 'description', 'instructor_name'],
+        unique=False, mysql_prefix='FULLTEXT'
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_courses_search', table_name='courses')
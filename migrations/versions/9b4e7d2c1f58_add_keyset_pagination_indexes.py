@@ -0,0 +1,34 @@
+"""Add indexes for keyset pagination on courses and enrollments
+
+Revision ID: 9b4e7d2c1f58
+Revises: 5f2a9c4d7e31
+Create Date: 2026-10-17 15:21:09.774512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4e7d2c1f58'
+down_revision = '5f2a9c4d7e31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.create_index('idx_courses_published_at_id', ['published_at', 'id'], unique=False)
+        batch_op.create_index('idx_courses_enrollments_id', ['total_enrollments', 'id'], unique=False)
+
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.create_index('idx_enrollments_user_date_id', ['user_id', 'enrollment_date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.drop_index('idx_enrollments_user_date_id')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('idx_courses_enrollments_id')
+        batch_op.drop_index('idx_courses_published_at_id')
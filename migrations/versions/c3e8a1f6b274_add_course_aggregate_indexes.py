@@ -0,0 +1,30 @@
+"""Add covering indexes for course catalog aggregates
+
+Revision ID: c3e8a1f6b274
+Revises: 9b4e7d2c1f58
+Create Date: 2026-10-17 17:02:41.318206
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8a1f6b274'
+down_revision = '9b4e7d2c1f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.create_index('idx_courses_category_published', ['category_id', 'is_published', 'status'], unique=False)
+        batch_op.create_index('idx_courses_published_updated', ['is_published', 'status', 'updated_at'], unique=False)
+        batch_op.create_index('idx_courses_rating', ['average_rating', 'total_ratings'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('idx_courses_rating')
+        batch_op.drop_index('idx_courses_published_updated')
+        batch_op.drop_index('idx_courses_category_published')
@@ -0,0 +1,38 @@
+"""Add ordering indexes for modules, lessons and content
+
+Revision ID: e7a2c5b9d431
+Revises: 4d9b2e6a8c13
+Create Date: 2026-10-17 19:02:41.517308
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2c5b9d431'
+down_revision = '4d9b2e6a8c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('modules', schema=None) as batch_op:
+        batch_op.create_index('idx_modules_course_order', ['course_id', 'sort_order'], unique=False)
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.create_index('idx_lessons_module_order', ['module_id', 'sort_order'], unique=False)
+
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.create_index('idx_content_lesson_order', ['lesson_id', 'sort_order'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('content', schema=None) as batch_op:
+        batch_op.drop_index('idx_content_lesson_order')
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_index('idx_lessons_module_order')
+
+    with op.batch_alter_table('modules', schema=None) as batch_op:
+        batch_op.drop_index('idx_modules_course_order')
@@ -0,0 +1,143 @@
+"""
+Unit Tests for JWT verify cache
+Tests verify_jwt_cached / _TOKEN_CACHE (app.utils.auth_cache)
+
+Test Coverage:
+- Cache hit đặt identity/claims trong g như verify_jwt_in_request
+- Token đã quá exp không được trả từ cache
+- Refresh token bị từ chối
+- JWT_CACHE_ENABLED=False luôn verify lại
+- Cache hit vẫn chạy user_lookup_loader / token_in_blocklist_loader
+"""
+
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from flask_jwt_extended import (
+    JWTManager, create_access_token, create_refresh_token, decode_token, get_current_user, get_jwt,
+    get_jwt_identity
+)
+from flask_jwt_extended.exceptions import RevokedTokenError, WrongTokenError
+from jwt import ExpiredSignatureError
+
+from app import create_app
+from app.utils import auth_cache
+from app.utils.auth_cache import _TOKEN_CACHE, verify_jwt_cached
+
+
+class TestTokenCache:
+    """Test cache kết quả verify JWT theo token"""
+
+    def setup_method(self, method):
+        """Setup test environment before each test"""
+        self.app = create_app('testing')
+        # Testing tắt cache; bật lại để kiểm tra
+        self.app.config['JWT_CACHE_ENABLED'] = True
+        _TOKEN_CACHE.clear()
+
+        # Không giữ app context: mỗi request cần g riêng như request thật
+        with self.app.app_context():
+            self.access_token = create_access_token(identity='42', additional_claims={'role': 'student'})
+            self.refresh_token = create_refresh_token(identity='42')
+
+    def teardown_method(self, method):
+        """Cleanup after each test"""
+        _TOKEN_CACHE.clear()
+
+    def _verify(self, token):
+        """verify_jwt_cached trong một request mới, trả (identity, claims)"""
+        with self.app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+            verify_jwt_cached()
+            return get_jwt_identity(), get_jwt()
+
+    def _patch_verify(self):
+        return patch.object(auth_cache, 'verify_jwt_in_request', wraps=auth_cache.verify_jwt_in_request)
+
+    def test_cached_path_sets_identity(self):
+        """Request thứ hai dùng cache nhưng identity/claims giống lần verify đầu"""
+        with self._patch_verify() as verify:
+            first = self._verify(self.access_token)
+            second = self._verify(self.access_token)
+
+        assert verify.call_count == 1
+        assert len(_TOKEN_CACHE) == 1
+        assert second == first
+        assert second[0] == '42'
+        assert second[1]['role'] == 'student'
+
+    def test_expired_token_not_served_from_cache(self):
+        """Entry hết hạn cùng token: sau exp phải verify lại và bị từ chối"""
+        with self.app.app_context():
+            token = create_access_token(identity='42', expires_delta=timedelta(seconds=1))
+
+        identity, claims = self._verify(token)
+        assert identity == '42'
+        assert len(_TOKEN_CACHE) == 1
+
+        # exp tính theo giây nguyên; chờ qua exp
+        time.sleep(max(0.0, claims['exp'] - time.time()) + 0.2)
+
+        with self._patch_verify() as verify:
+            with pytest.raises(ExpiredSignatureError):
+                self._verify(token)
+        assert verify.call_count == 1
+
+    def test_refresh_token_rejected(self):
+        """Refresh token không dùng được cho route access token và không vào cache"""
+        with pytest.raises(WrongTokenError):
+            self._verify(self.refresh_token)
+        assert len(_TOKEN_CACHE) == 0
+
+        # Token access đã cache không làm refresh token lọt qua
+        self._verify(self.access_token)
+        with pytest.raises(WrongTokenError):
+            self._verify(self.refresh_token)
+
+    def test_cache_disabled_always_verifies(self):
+        """JWT_CACHE_ENABLED=False: mỗi request đều verify_jwt_in_request"""
+        self.app.config['JWT_CACHE_ENABLED'] = False
+
+        with self._patch_verify() as verify:
+            for _ in range(3):
+                identity, _claims = self._verify(self.access_token)
+                assert identity == '42'
+
+        assert verify.call_count == 3
+        assert len(_TOKEN_CACHE) == 0
+
+    def test_cached_path_runs_library_callbacks(self):
+        """Cache hit: get_current_user() dùng user_lookup_loader, token bị revoke bị chặn ngay"""
+        # JWTManager riêng cho app của test để callback không lọt sang test khác
+        manager = JWTManager(self.app)
+        revoked = set()
+        lookups = []
+
+        @manager.user_lookup_loader
+        def load_user(jwt_header, jwt_data):
+            lookups.append(jwt_data['sub'])
+            return {'id': jwt_data['sub']}
+
+        @manager.token_in_blocklist_loader
+        def is_revoked(jwt_header, jwt_data):
+            return jwt_data['jti'] in revoked
+
+        def verify_and_get_user():
+            with self.app.test_request_context(headers={'Authorization': f'Bearer {self.access_token}'}):
+                verify_jwt_cached()
+                return get_current_user()
+
+        with self._patch_verify() as verify:
+            assert verify_and_get_user() == {'id': '42'}
+            assert verify_and_get_user() == {'id': '42'}
+        assert verify.call_count == 1
+        assert lookups == ['42', '42']
+
+        # Revoke sau khi token đã nằm trong cache
+        with self.app.app_context():
+            revoked.add(decode_token(self.access_token)['jti'])
+        assert len(_TOKEN_CACHE) == 1
+
+        with pytest.raises(RevokedTokenError):
+            verify_and_get_user()
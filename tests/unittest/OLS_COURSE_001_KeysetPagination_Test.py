@@ -0,0 +1,168 @@
+"""
+Unit Tests for keyset (cursor) pagination
+Tests keyset_page / encode_cursor / decode_cursor (app.utils.pagination)
+
+Test Coverage:
+- Round-trip cursor với datetime, trùng giá trị cột sort (tie-breaker theo id)
+- has_next / next_cursor đúng tại biên limit
+- Cursor sai định dạng → 400 ở catalog API
+- Course có published_at NULL không làm hỏng trang cursor
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app import create_app, db
+from app.models.user import User
+from app.models.course import Course, CourseStatus
+from app.dao.course_dao import CourseDAO
+from app.utils.pagination import InvalidPaginationError, decode_cursor, encode_cursor, keyset_page
+
+
+class TestKeysetPagination:
+    """Test keyset pagination trên bảng courses"""
+
+    def setup_method(self, method):
+        """Setup test environment before each test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.instructor = User(
+            email="instructor@example.com",
+            password="password123",
+            first_name="Test",
+            last_name="Instructor"
+        )
+        db.session.add(self.instructor)
+        db.session.commit()
+
+    def teardown_method(self, method):
+        """Cleanup after each test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _create_courses(self, published_times):
+        """Tạo course published theo danh sách published_at, trả về list course"""
+        courses = []
+        for index, published_at in enumerate(published_times):
+            course = Course(
+                title=f"Course {index}",
+                description="Course for pagination testing",
+                price=Decimal('0.00'),
+                instructor_id=self.instructor.id,
+                category_id=1,
+                status=CourseStatus.PUBLISHED,
+                is_published=True,
+                is_free=True,
+                published_at=published_at
+            )
+            db.session.add(course)
+            courses.append(course)
+        db.session.commit()
+        return courses
+
+    def _page(self, cursor, limit, descending=True):
+        return keyset_page(Course.query, Course.published_at, Course.id, cursor, limit,
+                           descending=descending)
+
+    def test_cursor_round_trip_datetime(self):
+        """encode → decode giữ nguyên kiểu datetime và id"""
+        published_at = datetime(2024, 5, 1, 8, 30, 15, 123456)
+
+        assert decode_cursor(encode_cursor(published_at, 7)) == (published_at, 7)
+        assert decode_cursor(encode_cursor(120, 3)) == (120, 3)
+
+    @pytest.mark.parametrize('descending', [True, False])
+    def test_pages_with_ties_cover_all_rows_once(self, descending):
+        """Duyệt hết các trang: không trùng, không sót dù nhiều row cùng published_at"""
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        tie = base + timedelta(days=1)
+        self._create_courses([base, tie, tie, tie, base + timedelta(days=2), tie])
+
+        expected = sorted(Course.query.all(), key=lambda c: (c.published_at, c.id), reverse=descending)
+
+        seen = []
+        cursor = None
+        while True:
+            items, cursor = self._page(cursor, 2, descending=descending)
+            seen.extend(items)
+            if cursor is None:
+                break
+            # Cursor trỏ đúng row cuối trang vừa lấy
+            assert decode_cursor(cursor) == (items[-1].published_at, items[-1].id)
+
+        assert [c.id for c in seen] == [c.id for c in expected]
+
+    def test_has_next_at_limit_boundary(self):
+        """Đúng limit row → không có trang sau; limit + 1 row → có đúng một row ở trang sau"""
+        base = datetime(2024, 1, 1)
+        self._create_courses([base + timedelta(hours=i) for i in range(3)])
+
+        items, next_cursor = self._page(None, 3)
+        assert len(items) == 3
+        assert next_cursor is None
+
+        result = CourseDAO.get_published_courses_after(cursor=None, per_page=3)
+        assert result['has_next'] is False
+        assert result['next_cursor'] is None
+
+        self._create_courses([base - timedelta(days=1)])
+
+        result = CourseDAO.get_published_courses_after(cursor=None, per_page=3)
+        assert len(result['courses']) == 3
+        assert result['has_next'] is True
+
+        result = CourseDAO.get_published_courses_after(cursor=result['next_cursor'], per_page=3)
+        assert len(result['courses']) == 1
+        assert result['has_next'] is False
+        assert result['next_cursor'] is None
+
+    @pytest.mark.parametrize('cursor', ['not-a-cursor', '!!!', encode_cursor('x', 1)[:-4]])
+    def test_malformed_cursor_raises(self, cursor):
+        """Cursor sai định dạng báo InvalidPaginationError"""
+        with pytest.raises(InvalidPaginationError):
+            decode_cursor(cursor)
+
+    @pytest.mark.parametrize('url', [
+        '/api/courses/catalog?cursor=not-a-cursor',
+        '/api/courses/free?cursor=not-a-cursor',
+        '/api/courses/catalog?cursor=&sort_by=price_low',
+        '/api/courses/catalog?page=abc',
+    ])
+    def test_malformed_cursor_returns_400(self, url):
+        """Cursor/page sai → 400 validation error của pagination (không phải 500)"""
+        response = self.client.get(url)
+        assert response.status_code == 400
+
+        body = response.get_json()
+        assert body['success'] is False
+        assert body['error'] == 'Invalid pagination parameters'
+        assert body['error_code'] == 'VALIDATION_ERROR'
+        assert body['details']['field_errors'] == {'pagination': ['Invalid pagination parameters']}
+
+    @pytest.mark.parametrize('sort_by', ['newest', 'oldest'])
+    def test_courses_without_published_at_skipped(self, sort_by):
+        """Cột sort NULL không lọt vào trang cursor (không so sánh được theo keyset)"""
+        base = datetime(2024, 1, 1)
+        dated = self._create_courses([base, base + timedelta(days=1)])
+        self._create_courses([None])
+
+        result = CourseDAO.get_published_courses_after(cursor='', per_page=1, sort_by=sort_by)
+        seen = list(result['courses'])
+        while result['has_next']:
+            result = CourseDAO.get_published_courses_after(
+                cursor=result['next_cursor'], per_page=1, sort_by=sort_by
+            )
+            assert result['courses']
+            seen.extend(result['courses'])
+
+        expected = [dated[1].id, dated[0].id] if sort_by == 'newest' else [dated[0].id, dated[1].id]
+        assert [c.id for c in seen] == expected
@@ -0,0 +1,113 @@
+"""
+Unit Tests for Enrollment: course access check
+Tests register → check-access → activate → check-access (EnrollmentService)
+
+Test Coverage:
+- check-access trước khi đăng ký (NOT_ENROLLED)
+- Đăng ký khóa học miễn phí → có quyền truy cập ngay
+- Kích hoạt enrollment → check-access trả trạng thái mới
+- Kết quả check-access đã cache được làm mới sau mỗi thay đổi enrollment
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from app import create_app, db, cache
+from app.models.user import User
+from app.models.course import Course, CourseStatus
+from app.services.enrollment_service import EnrollmentService
+
+
+class TestCourseAccess:
+    """Test enrollment flow và cache của check-access"""
+
+    def setup_method(self, method):
+        """Setup test environment before each test"""
+        self.app = create_app('testing')
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        # Testing dùng NullCache; dùng SimpleCache để kiểm tra invalidate thật sự
+        cache.init_app(self.app, config={'CACHE_TYPE': 'SimpleCache'})
+        cache.clear()
+
+        db.create_all()
+        self._create_test_data()
+
+    def teardown_method(self, method):
+        """Cleanup after each test"""
+        cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _create_test_data(self):
+        """Create student + free course"""
+        self.student = User(
+            email="student@example.com",
+            password="password123",
+            first_name="Test",
+            last_name="Student"
+        )
+        db.session.add(self.student)
+        db.session.flush()
+
+        self.course = Course(
+            title="Free Course",
+            description="Free course for testing",
+            price=Decimal('0.00'),
+            instructor_id=self.student.id,
+            category_id=1,
+            status=CourseStatus.PUBLISHED,
+            is_published=True,
+            is_free=True
+        )
+        db.session.add(self.course)
+        db.session.commit()
+
+        self.service = EnrollmentService()
+
+    def _check_access(self):
+        return self.service.check_course_access(self.student.id, self.course.id)
+
+    def test_register_then_activate_updates_access(self):
+        """check-access phản ánh đăng ký và kích hoạt dù kết quả trước đó đã cache"""
+        # Chưa đăng ký: kết quả được cache
+        access = self._check_access()
+        assert access['hasAccess'] is False
+        assert access['reasonCode'] == 'NOT_ENROLLED'
+
+        # Đăng ký khóa học miễn phí: invalidate cache sau commit không được lỗi
+        result = self.service.register_for_course(
+            user_id=self.student.id,
+            course_id=str(self.course.id),
+            full_name='Test Student',
+            email='student@example.com'
+        )
+        assert result['access_immediate'] is True
+        enrollment_id = result['enrollment']['id']
+
+        access = self._check_access()
+        assert access['hasAccess'] is True
+        assert access['enrollmentStatus']['status'] == 'enrolled'
+
+        # Kích hoạt (bỏ yếu tố ngẫu nhiên của _perform_activation)
+        with patch.object(EnrollmentService, '_perform_activation', return_value=True):
+            result = self.service.activate_course_access(enrollment_id)
+        assert result['access_granted'] is True
+
+        access = self._check_access()
+        assert access['hasAccess'] is True
+        assert access['enrollmentStatus']['status'] == 'active'
+
+    def test_check_access_is_cached(self):
+        """Lần check-access thứ hai trong TTL không truy vấn lại DB"""
+        dao = self.service.enrollment_dao
+
+        with patch.object(dao, 'check_user_access', wraps=dao.check_user_access) as check_user_access:
+            first = self._check_access()
+            second = self._check_access()
+
+        assert first == second
+        assert check_user_access.call_count == 1
@@ -98,6 +98,21 @@ class TestUserLogin:
         response_data = json.loads(response.data)
         assert response_data['success'] is False
     
+    def test_login_email_case_insensitive(self, client, sample_user):
+        """Test login with email in different case"""
+        data = {
+            'email': '  Test@Example.COM',
+            'password': 'TestPassword123'
+        }
+        
+        response = client.post('/api/auth/login',
+                             data=json.dumps(data),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        response_data = json.loads(response.data)
+        assert response_data['success'] is True
+    
     def test_remember_me_login(self, client, sample_user):
         """Test login with remember me option"""
         data = {
@@ -0,0 +1,23 @@
+"""
+WSGI entry point cho production (gunicorn + gevent worker)
+Chạy: gunicorn -c gunicorn.conf.py wsgi:app
+
+monkey.patch_all() phải chạy trước khi import Flask/SQLAlchemy/PyMySQL: với
+preload_app, engine, pool và lock được tạo ngay lúc load app ở master, nên
+socket/threading phải là bản cooperative thì handler chờ DB mới nhường
+greenlet thay vì chặn cả worker.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import os  # noqa: E402
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from app import create_app  # noqa: E402
+
+app = create_app(os.environ.get('FLASK_ENV', 'production'))